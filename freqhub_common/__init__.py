@@ -0,0 +1,8 @@
+"""
+Shared runtime helpers for FreqHub strategies.
+
+The package is copied into every strategy image (see each strategy's
+`Dockerfile`) and is importable from any strategy as `freqhub_common`.
+Every feature in here is opt-in: a strategy that does not import it
+behaves exactly as before.
+"""
@@ -0,0 +1,397 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+from pandas import DataFrame
+
+try:
+    import numexpr
+except ImportError:  # Optional: conditions are evaluated with NumPy ufuncs instead
+    numexpr = None
+
+DEFAULT_BLOCK_SIZE = 16384
+
+COMPARISONS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+
+class _Context:
+    """
+    Inputs of one evaluation: the dataframe, the strategy whose parameters
+    are read, and full-length operands computed once (rolling means).
+    """
+
+    def __init__(self, dataframe: DataFrame, strategy):
+        self.dataframe = dataframe
+        self.strategy = strategy
+        self.length = len(dataframe)
+        self.arrays: Dict[object, np.ndarray] = {}
+        self.scalars: Dict[str, object] = {}
+
+
+def _window(values: np.ndarray, start: int, stop: int, length: int) -> np.ndarray:
+    """
+    values[start:stop] as a view, NaN-padded where the window is outside the frame.
+    """
+    if start >= 0 and stop <= length:
+        return values[start:stop]
+    window = np.full(stop - start, np.nan)
+    lo, hi = max(start, 0), min(stop, length)
+    if lo < hi:
+        window[lo - start:hi - start] = values[lo:hi]
+    return window
+
+
+class Operand:
+    """
+    A value per row (column, shifted or derived column) or a scalar
+    (parameter, literal). Comparing operands gives a `Condition`.
+    """
+
+    __hash__ = object.__hash__
+
+    def block(self, context: _Context, start: int, stop: int):
+        raise NotImplementedError
+
+    def shift(self, periods: int = 1) -> "Operand":
+        return Shifted(self, periods)
+
+    def rolling_mean(self, window: int) -> "Operand":
+        return RollingMean(self, window)
+
+    def _compare(self, op: str, other) -> "Compare":
+        return Compare(self, op, _operand(other))
+
+    def __lt__(self, other):
+        return self._compare("<", other)
+
+    def __le__(self, other):
+        return self._compare("<=", other)
+
+    def __gt__(self, other):
+        return self._compare(">", other)
+
+    def __ge__(self, other):
+        return self._compare(">=", other)
+
+    def __eq__(self, other):
+        return self._compare("==", other)
+
+    def __ne__(self, other):
+        return self._compare("!=", other)
+
+
+class Column(Operand):
+    def __init__(self, name: str):
+        self.name = name
+
+    def block(self, context, start, stop):
+        values = context.arrays.get(self.name)
+        if values is None:
+            values = context.arrays[self.name] = context.dataframe[self.name].to_numpy()
+        return _window(values, start, stop, context.length)
+
+    def __repr__(self):
+        return self.name
+
+
+class Param(Operand):
+    """
+    A strategy parameter's `.value`, read once per evaluation.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def block(self, context, start, stop):
+        if self.name not in context.scalars:
+            context.scalars[self.name] = getattr(context.strategy, self.name).value
+        return context.scalars[self.name]
+
+    def __repr__(self):
+        return self.name
+
+
+class Literal(Operand):
+    def __init__(self, value):
+        self.value = value
+
+    def block(self, context, start, stop):
+        return self.value
+
+    def __repr__(self):
+        return repr(self.value)
+
+
+class Shifted(Operand):
+    """
+    `operand.shift(periods)` like pandas: NaN for the first `periods` rows.
+    """
+
+    def __init__(self, operand: Operand, periods: int):
+        self.operand = operand
+        self.periods = int(periods)
+
+    def block(self, context, start, stop):
+        return self.operand.block(context, start - self.periods, stop - self.periods)
+
+    def __repr__(self):
+        return f"{self.operand!r}.shift({self.periods})"
+
+
+class Greatest(Operand):
+    """
+    Row-wise maximum skipping NaN, like pandas `df[[a, b]].max(axis=1)`.
+    """
+
+    reduce = staticmethod(np.fmax)
+    label = "max"
+
+    def __init__(self, *operands: Operand):
+        self.operands = [_operand(o) for o in operands]
+
+    def block(self, context, start, stop):
+        result = self.operands[0].block(context, start, stop)
+        for operand in self.operands[1:]:
+            result = self.reduce(result, operand.block(context, start, stop))
+        return result
+
+    def __repr__(self):
+        return f"{self.label}({', '.join(map(repr, self.operands))})"
+
+
+class Least(Greatest):
+    reduce = staticmethod(np.fmin)
+    label = "min"
+
+
+class RollingMean(Operand):
+    """
+    pandas' `rolling(window).mean()` of a column, computed once per evaluation.
+    """
+
+    def __init__(self, operand: Operand, window: int):
+        if not isinstance(operand, Column):
+            raise TypeError("rolling_mean() needs a column")
+        self.operand = operand
+        self.window = int(window)
+
+    def block(self, context, start, stop):
+        key = (self.operand.name, "rolling_mean", self.window)
+        values = context.arrays.get(key)
+        if values is None:
+            series = context.dataframe[self.operand.name].rolling(window=self.window).mean()
+            values = context.arrays[key] = series.to_numpy()
+        return _window(values, start, stop, context.length)
+
+    def __repr__(self):
+        return f"{self.operand!r}.rolling_mean({self.window})"
+
+
+def _operand(value) -> Operand:
+    return value if isinstance(value, Operand) else Literal(value)
+
+
+def col(name: str) -> Column:
+    return Column(name)
+
+
+def param(name: str) -> Param:
+    return Param(name)
+
+
+def greatest(*operands) -> Greatest:
+    return Greatest(*operands)
+
+
+def least(*operands) -> Least:
+    return Least(*operands)
+
+
+class Condition:
+    """
+    A boolean row mask. Combine with `&` and `|` (not `and`/`or`).
+    """
+
+    def __and__(self, other: "Condition") -> "AllOf":
+        return AllOf(self, other)
+
+    def __or__(self, other: "Condition") -> "AnyOf":
+        return AnyOf(self, other)
+
+    def __bool__(self):
+        raise TypeError("Conditions combine with & and |, not and/or or chained comparisons")
+
+
+class Compare(Condition):
+    def __init__(self, left: Operand, op: str, right: Operand):
+        self.left, self.op, self.right = left, op, right
+
+    def __repr__(self):
+        return f"{self.left!r} {self.op} {self.right!r}"
+
+
+class AllOf(Condition):
+    """
+    All children true; flattened so `a & b & c` is one node of three.
+    """
+
+    joiner = " & "
+
+    def __init__(self, *children: Condition):
+        self.children: List[Condition] = []
+        for child in children:
+            self.children.extend(child.children if type(child) is type(self) else [child])
+
+    def __repr__(self):
+        return "(" + self.joiner.join(map(repr, self.children)) + ")"
+
+
+class AnyOf(AllOf):
+    """
+    Any child true; flattened like AllOf.
+    """
+
+    joiner = " | "
+
+
+class CompiledCondition:
+    """
+    A condition tree evaluated block by block (`block_size` rows) into one
+    mask, without a full-length temporary per comparison or shift.
+
+    Every `&` stops evaluating its remaining children for a block once the
+    block is all false, every `|` once it is all true. With numexpr
+    installed, a node whose children are all comparisons runs as one fused
+    numexpr expression per block (`engine="numexpr"`, the default then);
+    otherwise each comparison is a NumPy ufunc writing into a scratch
+    buffer (`engine="numpy"`).
+
+    `report()` gives rows evaluated, rows true and rows skipped per
+    evaluated node (per comparison with the NumPy engine, per fused group
+    with numexpr) since creation or `reset()`.
+    """
+
+    def __init__(self, condition: Condition, engine: Optional[str] = None, block_size: int = DEFAULT_BLOCK_SIZE):
+        if engine is None:
+            engine = "numexpr" if numexpr is not None else "numpy"
+        if engine == "numexpr" and numexpr is None:
+            raise ValueError("engine 'numexpr' needs numexpr installed")
+        if engine not in ("numexpr", "numpy"):
+            raise ValueError(f"Unknown engine {engine!r}, expected 'numexpr' or 'numpy'")
+        self.condition = condition
+        self.engine = engine
+        self.block_size = max(int(block_size), 1)
+        self._fused: Dict[int, tuple] = {}
+        self._nodes: List[Condition] = []
+        self._index: Dict[int, int] = {}
+        self._compile(condition)
+        self.reset()
+
+    def _compile(self, node: Condition) -> None:
+        self._index[id(node)] = len(self._nodes)
+        self._nodes.append(node)
+        if isinstance(node, Compare):
+            return
+        if self.engine == "numexpr" and all(isinstance(child, Compare) for child in node.children):
+            operands, terms = [], []
+            for child in node.children:
+                names = []
+                for operand in (child.left, child.right):
+                    names.append(f"v{len(operands)}")
+                    operands.append(operand)
+                terms.append(f"({names[0]} {child.op} {names[1]})")
+            self._fused[id(node)] = (node.joiner.strip().join(terms), operands)
+            return
+        for child in node.children:
+            self._compile(child)
+
+    def reset(self) -> None:
+        self.stats = [{"rows": 0, "hits": 0, "skipped": 0} for _ in self._nodes]
+
+    def _evaluate(self, node: Condition, context: _Context, start: int, stop: int, out: np.ndarray, depth: int,
+                  scratch: List[np.ndarray]) -> None:
+        stats = self.stats[self._index[id(node)]]
+        if isinstance(node, Compare):
+            COMPARISONS[node.op](node.left.block(context, start, stop), node.right.block(context, start, stop), out=out)
+        elif id(node) in self._fused:
+            expression, operands = self._fused[id(node)]
+            local_dict = {f"v{i}": operand.block(context, start, stop) for i, operand in enumerate(operands)}
+            numexpr.evaluate(expression, local_dict=local_dict, out=out)
+        else:
+            conjunction = not isinstance(node, AnyOf)
+            combine = np.logical_and if conjunction else np.logical_or
+            if depth == len(scratch):
+                scratch.append(np.empty(self.block_size, dtype=bool))
+            child_out = scratch[depth][: stop - start]
+            self._evaluate(node.children[0], context, start, stop, out, depth + 1, scratch)
+            for position, child in enumerate(node.children[1:], start=1):
+                if (not out.any()) if conjunction else out.all():
+                    for skipped in node.children[position:]:
+                        self._skip(skipped, stop - start)
+                    break
+                self._evaluate(child, context, start, stop, child_out, depth + 1, scratch)
+                combine(out, child_out, out=out)
+        stats["rows"] += stop - start
+        stats["hits"] += int(np.count_nonzero(out))
+
+    def _skip(self, node: Condition, rows: int) -> None:
+        self.stats[self._index[id(node)]]["skipped"] += rows
+        if id(node) not in self._fused and not isinstance(node, Compare):
+            for child in node.children:
+                self._skip(child, rows)
+
+    def mask(self, dataframe: DataFrame, strategy=None) -> np.ndarray:
+        """
+        The condition's mask for `dataframe`, parameters read from `strategy`.
+        """
+        context = _Context(dataframe, strategy)
+        result = np.zeros(context.length, dtype=bool)
+        scratch: List[np.ndarray] = []
+        for start in range(0, context.length, self.block_size):
+            stop = min(start + self.block_size, context.length)
+            self._evaluate(self.condition, context, start, stop, result[start:stop], 0, scratch)
+        return result
+
+    def write(self, dataframe: DataFrame, column: str, strategy=None) -> DataFrame:
+        """
+        `dataframe.loc[<condition>, column] = 1`.
+        """
+        mask = self.mask(dataframe, strategy)
+        if column in dataframe.columns:
+            dataframe.loc[mask, column] = 1
+        else:
+            values = np.full(len(mask), np.nan)
+            values[mask] = 1.0
+            dataframe[column] = values
+        return dataframe
+
+    def report(self) -> List[dict]:
+        """
+        Per evaluated node, in tree order: its formula, nesting depth, rows
+        evaluated, rows true (hit rate) and rows skipped by short-circuiting.
+        """
+        rows = []
+
+        def visit(node: Condition, depth: int) -> None:
+            stats = self.stats[self._index[id(node)]]
+            evaluated = stats["rows"]
+            rows.append({
+                "condition": repr(node),
+                "depth": depth,
+                "rows": evaluated,
+                "hits": stats["hits"],
+                "hit_rate": stats["hits"] / evaluated if evaluated else 0.0,
+                "skipped": stats["skipped"],
+            })
+            if not isinstance(node, Compare) and id(node) not in self._fused:
+                for child in node.children:
+                    visit(child, depth + 1)
+
+        visit(self.condition, 0)
+        return rows
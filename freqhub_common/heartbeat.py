@@ -0,0 +1,248 @@
+"""
+Candle-processing heartbeat for container health checks.
+
+    python -m freqhub_common.heartbeat
+    python -m freqhub_common.heartbeat user_data/heartbeat.json --max-lag 120
+
+Run as a module, checks the heartbeat file (by default `$FREQHUB_HEARTBEAT_PATH`,
+the same file the strategy writes, or user_data/heartbeat.json) and exits with
+status 1 when the bot is behind. Only the standard library is imported at
+module level, so the check stays cheap enough for a Docker healthcheck.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LIVE_RUNMODES = ("live", "dry_run")
+FILE_NAME = "heartbeat.json"
+DEFAULT_PATH = Path("user_data") / FILE_NAME
+# Heartbeat file of both the strategy and the healthcheck (see heartbeat_path)
+PATH_ENV = "FREQHUB_HEARTBEAT_PATH"
+DEFAULT_LAG_RATIO = 0.25
+MIN_MAX_LAG = 60.0
+
+
+def default_max_lag(timeframe_seconds: float, ratio: float = DEFAULT_LAG_RATIO) -> float:
+    """
+    Lag allowed before a bot counts as behind: `ratio` of the timeframe
+    (Freqtrade warns when analysis takes more than 25% of it), but never
+    less than a minute, so 1m bots are not flagged by one slow loop.
+    """
+    return max(float(timeframe_seconds) * ratio, MIN_MAX_LAG)
+
+
+def heartbeat_path(configured: Optional[str] = None, user_data_dir: Optional[str] = None) -> Path:
+    """
+    The heartbeat file: `$FREQHUB_HEARTBEAT_PATH` when set, which the
+    healthcheck reads too; otherwise the configured `path`, or
+    heartbeat.json in the user data directory.
+    """
+    environment = os.environ.get(PATH_ENV)
+    if environment:
+        if configured and Path(configured) != Path(environment):
+            logger.warning("Heartbeat path %s ignored: %s is set to %s", configured, PATH_ENV, environment)
+        return Path(environment)
+    if configured:
+        return Path(configured)
+    return Path(user_data_dir or "user_data") / FILE_NAME
+
+
+class Heartbeat:
+    """
+    Publishes how far behind the bot's analysis is, as a JSON file.
+
+    `beat()` is meant to be called from `bot_loop_start`, which Freqtrade
+    runs after refreshing candles and before analyzing them. It reads the
+    analyzed dataframes the previous loop cached in the data provider, so
+    the strategy's analysis itself is not touched, and writes per pair the
+    last analyzed candle and how long after that candle closed it was
+    analyzed, plus how long the previous loop's analysis took. The file is
+    replaced atomically on every loop; `check()` (and `python -m
+    freqhub_common.heartbeat`) compares it to the clock.
+
+    Config (all optional, disabled by default):
+
+        "freqhub": {
+            "heartbeat": {
+                "enabled": true,
+                "path": "user_data/heartbeat.json",
+                "lag_ratio": 0.25,
+                "max_lag": 900
+            }
+        }
+
+    `max_lag` (seconds) overrides the threshold derived from the timeframe
+    with `lag_ratio`. `$FREQHUB_HEARTBEAT_PATH`, when set, overrides `path`,
+    so the healthcheck and the strategy agree on the file.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        timeframe: str,
+        timeframe_seconds: float,
+        max_lag: Optional[float] = None,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path)
+        self.timeframe = timeframe
+        self.timeframe_seconds = float(timeframe_seconds)
+        self.max_lag = float(max_lag) if max_lag else default_max_lag(self.timeframe_seconds)
+        self.enabled = bool(enabled)
+        self.clock = clock
+        self._loop_started: Optional[float] = None
+        self._analysis_seconds: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, config: dict, timeframe: str) -> "Heartbeat":
+        """
+        Build a heartbeat from the `freqhub.heartbeat` config section.
+        Always disabled outside of live/dry-run. A live/dry-run bot with the
+        heartbeat disabled removes the file an earlier run left, so the
+        healthcheck does not fail on its old timestamp.
+        """
+        from freqtrade.exchange import timeframe_to_seconds
+
+        settings = config.get("freqhub", {}).get("heartbeat", {})
+        runmode = config.get("runmode")
+        runmode = getattr(runmode, "value", runmode)
+        seconds = timeframe_to_seconds(timeframe)
+        path = heartbeat_path(settings.get("path"), config.get("user_data_dir"))
+
+        heartbeat = cls(
+            path,
+            timeframe,
+            seconds,
+            max_lag=settings.get("max_lag") or default_max_lag(seconds, settings.get("lag_ratio", DEFAULT_LAG_RATIO)),
+            enabled=settings.get("enabled", False) and runmode in LIVE_RUNMODES,
+        )
+        if not heartbeat.enabled and runmode in LIVE_RUNMODES:
+            heartbeat.clear()
+        return heartbeat
+
+    def clear(self) -> None:
+        """
+        Remove the heartbeat file, if any.
+        """
+        try:
+            self.path.unlink()
+            logger.info("Removed heartbeat %s (heartbeat disabled)", self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Could not remove heartbeat %s: %s", self.path, e)
+
+    def snapshot(self, strategy, now: float) -> dict:
+        """
+        Heartbeat contents for the candles the previous loop analyzed.
+        """
+        pairs = {}
+        latest = None
+        for pair in strategy.dp.current_whitelist():
+            dataframe, analyzed = strategy.dp.get_analyzed_dataframe(pair, self.timeframe)
+            if dataframe.empty:
+                continue
+            analyzed_at = analyzed.timestamp()
+            candle = dataframe["date"].iloc[-1]
+            closed = candle.timestamp() + self.timeframe_seconds
+            pairs[pair] = {
+                "candle": candle.isoformat(),
+                "candle_close": closed,
+                "analyzed": round(analyzed_at, 3),
+                "processing_lag": round(analyzed_at - closed, 3),
+            }
+            latest = analyzed_at if latest is None else max(latest, analyzed_at)
+
+        # Analysis of the previous loop: from its bot_loop_start to the last
+        # pair it analyzed. Loops without a new candle keep the last value.
+        if self._loop_started is not None and latest is not None and latest >= self._loop_started:
+            self._analysis_seconds = round(latest - self._loop_started, 3)
+
+        return {
+            "strategy": type(strategy).__name__,
+            "timeframe": self.timeframe,
+            "timeframe_seconds": self.timeframe_seconds,
+            "max_lag": self.max_lag,
+            "updated": round(now, 3),
+            "analysis_seconds": self._analysis_seconds,
+            "pairs": pairs,
+        }
+
+    def beat(self, strategy) -> None:
+        if not self.enabled:
+            return
+        now = self.clock()
+        payload = self.snapshot(strategy, now)
+        self._loop_started = now
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.path.with_name(f".{self.path.name}.{os.getpid()}")
+            temporary.write_text(json.dumps(payload, indent=1))
+            os.replace(temporary, self.path)
+        except OSError as e:
+            logger.warning("Could not write heartbeat %s: %s", self.path, e)
+
+
+def lag(payload: dict, now: float) -> Tuple[float, Optional[str]]:
+    """
+    Seconds the bot is behind at `now`, and the pair (None for the loop
+    itself) that is furthest behind. A pair is behind once the candle after
+    its last analyzed one has closed; the loop is behind once the file has
+    not been updated.
+    """
+    worst, culprit = max(now - payload["updated"], 0.0), None
+    step = payload["timeframe_seconds"]
+    for pair, state in payload["pairs"].items():
+        behind = now - (state["candle_close"] + step)
+        if behind > worst:
+            worst, culprit = behind, pair
+    return worst, culprit
+
+
+def check(payload: dict, now: float, max_lag: Optional[float] = None) -> Tuple[bool, str]:
+    limit = float(max_lag or payload["max_lag"])
+    behind, culprit = lag(payload, now)
+    analysis = payload.get("analysis_seconds")
+    status = (
+        f"{payload['strategy']} {payload['timeframe']}: {len(payload['pairs'])} pairs, "
+        f"lag {behind:.0f}s (max {limit:.0f}s{f', {culprit}' if culprit else ''}), "
+        f"analysis {'-' if analysis is None else f'{analysis:.2f}s'}"
+    )
+    return behind <= limit, status
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Fail when the bot's candle processing lags behind.")
+    parser.add_argument(
+        "path", nargs="?", help=f"Heartbeat file (default: ${PATH_ENV}, else {DEFAULT_PATH})"
+    )
+    parser.add_argument("--max-lag", type=float, help="Seconds of lag allowed (default: from the file)")
+    args = parser.parse_args(argv)
+
+    path = Path(args.path) if args.path else heartbeat_path()
+    try:
+        payload = json.loads(path.read_text())
+    except FileNotFoundError:
+        # Heartbeats are opt-in; without one there is nothing to check.
+        print(f"No heartbeat at {path}")
+        return 0
+    except (OSError, ValueError) as e:
+        print(f"Unreadable heartbeat {path}: {e}", file=sys.stderr)
+        return 1
+
+    healthy, status = check(payload, time.time(), args.max_lag)
+    print(status, file=sys.stdout if healthy else sys.stderr)
+    return 0 if healthy else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
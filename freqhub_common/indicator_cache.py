@@ -0,0 +1,287 @@
+import ast
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import textwrap
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import freqtrade
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.ipc as ipc
+import talib
+from pandas import DataFrame
+
+from freqtrade.strategy.parameters import BaseParameter
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 2
+DEFAULT_DIRECTORY = "user_data/data/indicator_cache"
+DEFAULT_MAX_SIZE_MB = 2048
+BACKTEST_RUNMODES = ("backtest", "hyperopt", "edge", "plot", "other")
+SUFFIX = ".arrow"
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    path: Path
+    size: int
+    last_used: float
+    meta: dict
+
+
+def _attributes(source: str) -> Tuple[Set[str], Set[str]]:
+    """
+    Names accessed as `self.<name>`, and as `<anything>.<name>`, in a
+    function's source. A function that builds a ParameterSnapshot
+    (`ParameterSnapshot.capture(...)`) reads every parameter by design, so
+    only its `self.<name>` accesses count.
+    """
+    tree = ast.parse(textwrap.dedent(source))
+    own, names = set(), set()
+    captures = False
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Attribute):
+            names.add(node.attr)
+            if isinstance(node.value, ast.Name) and node.value.id == "self":
+                own.add(node.attr)
+            elif node.attr == "capture" and isinstance(node.value, ast.Name) and node.value.id == "ParameterSnapshot":
+                captures = True
+    return own, own if captures else names
+
+
+@functools.lru_cache(maxsize=None)
+def helpers_digest() -> str:
+    """
+    Hash of every freqhub_common module's source. Indicator functions call
+    its helpers (structure, pullback, rolling, kernels, ...), which the
+    fingerprint of the strategy's methods does not cover.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def indicator_fingerprint(strategy, compute: Callable) -> Dict[str, object]:
+    """
+    Describe what an indicator function depends on: its source, the source
+    of every strategy method it calls (recursively), and the current value
+    of every hyperopt parameter it reads, through `self.<param>.value` or a
+    ParameterSnapshot (`params.<param>`; any attribute named like one of the
+    strategy's parameters counts, except in the method building the
+    snapshot).
+
+    Changing exit logic or any parameter not read here does not change the
+    fingerprint, so cached indicators stay valid.
+    """
+    sources: Dict[str, str] = {}
+    params: Dict[str, object] = {}
+    pending = [compute.__name__]
+    while pending:
+        name = pending.pop()
+        if name in sources:
+            continue
+        source = inspect.getsource(getattr(type(strategy), name))
+        sources[name] = source
+        own, names = _attributes(source)
+        for attr in sorted(names - own):
+            if isinstance(getattr(strategy, attr, None), BaseParameter):
+                params[attr] = getattr(strategy, attr).value
+        for attr in sorted(own):
+            value = getattr(strategy, attr, None)
+            if isinstance(value, BaseParameter):
+                params[attr] = value.value
+            elif inspect.ismethod(value) and attr not in sources:
+                pending.append(attr)
+            elif isinstance(value, (int, float, str, bool)):
+                params[attr] = value
+
+    return {"sources": sources, "params": params}
+
+
+class IndicatorCache:
+    """
+    Persistent, content-addressed cache of analyzed indicator frames.
+
+    Entries are keyed by a hash of the input candles, the source of the
+    indicator function (and the strategy methods it calls), the values of
+    the parameters it reads, the source of freqhub_common and the library
+    versions (TA-Lib included). Frames are stored as uncompressed Arrow files
+    and memory-mapped back on a hit: numeric columns (float NaNs are stored
+    as values, not nulls) become read-only pandas columns over the mapped
+    file without a copy, other columns (strings, datetimes) are converted.
+    Writes to a loaded frame copy the column first (copy-on-write). The
+    directory is bounded by `max_size_mb`; least recently used entries are
+    evicted first.
+
+    Only active in backtesting/hyperopt. Config:
+
+        "freqhub": {
+            "indicator_cache": {
+                "enabled": true,
+                "directory": "user_data/data/indicator_cache",
+                "max_size_mb": 2048
+            }
+        }
+    """
+
+    def __init__(self, directory, max_size_mb: float = DEFAULT_MAX_SIZE_MB):
+        self.directory = Path(directory)
+        self.max_bytes = int(float(max_size_mb) * 1024 * 1024)
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["IndicatorCache"]:
+        settings = config.get("freqhub", {}).get("indicator_cache", {})
+        runmode = config.get("runmode")
+        runmode = getattr(runmode, "value", runmode)
+        if not settings.get("enabled", False) or runmode not in BACKTEST_RUNMODES:
+            return None
+        return cls(
+            settings.get("directory", DEFAULT_DIRECTORY),
+            max_size_mb=settings.get("max_size_mb", DEFAULT_MAX_SIZE_MB),
+        )
+
+    def key(self, strategy, compute: Callable, dataframe: DataFrame, metadata: dict) -> str:
+        digest = hashlib.sha256()
+        header = {
+            "version": CACHE_VERSION,
+            "strategy": type(strategy).__name__,
+            "pair": metadata.get("pair"),
+            "timeframe": getattr(strategy, "timeframe", None),
+            "columns": [str(c) for c in dataframe.columns],
+            "libraries": [
+                freqtrade.__version__,
+                pd.__version__,
+                np.__version__,
+                talib.__version__,
+                getattr(talib, "__ta_version__", None),
+            ],
+            "helpers": helpers_digest(),
+            "fingerprint": indicator_fingerprint(strategy, compute),
+        }
+        digest.update(json.dumps(header, sort_keys=True, default=str).encode())
+        digest.update(pd.util.hash_pandas_object(dataframe, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}{SUFFIX}"
+
+    def get(self, key: str) -> Optional[DataFrame]:
+        path = self._path(key)
+        if not path.is_file():
+            return None
+        try:
+            table = feather.read_table(path, memory_map=True)
+        except Exception as e:
+            logger.warning("Dropping unreadable indicator cache entry %s: %s", path, e)
+            path.unlink(missing_ok=True)
+            return None
+        os.utime(path)
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+    def put(self, key: str, dataframe: DataFrame, meta: Optional[dict] = None) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        frame = dataframe.reset_index(drop=True)
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        for position, field in enumerate(table.schema):
+            # NaN stays a value: nulls would need a converted copy on load
+            if pa.types.is_floating(field.type) and table.column(position).null_count:
+                values = pa.array(frame.iloc[:, position].to_numpy(), type=field.type, from_pandas=False)
+                table = table.set_column(position, field, values)
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), b"freqhub": json.dumps(meta or {}).encode()}
+        )
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp")
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+        self.prune(self.max_bytes)
+
+    def compute(self, strategy, compute: Callable, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        """
+        Return `compute(dataframe, metadata)`, from the cache when possible.
+        """
+        key = self.key(strategy, compute, dataframe, metadata)
+        cached = self.get(key)
+        if cached is not None and len(cached) == len(dataframe):
+            self.stats["hits"] += 1
+            cached.index = dataframe.index
+            logger.debug("Indicator cache hit for %s (%s)", metadata.get("pair"), key[:12])
+            return cached
+
+        self.stats["misses"] += 1
+        result = compute(dataframe, metadata)
+        try:
+            self.put(
+                key,
+                result,
+                {
+                    "strategy": type(strategy).__name__,
+                    "pair": metadata.get("pair"),
+                    "rows": len(result),
+                    "first": str(result["date"].iloc[0]) if len(result) else None,
+                    "last": str(result["date"].iloc[-1]) if len(result) else None,
+                    "created": time.time(),
+                },
+            )
+        except Exception as e:
+            logger.warning("Could not write indicator cache entry: %s", e)
+        return result
+
+    def entries(self) -> List[CacheEntry]:
+        """
+        All entries, least recently used first.
+        """
+        entries = []
+        if not self.directory.is_dir():
+            return entries
+        for path in self.directory.glob(f"*/*{SUFFIX}"):
+            stat = path.stat()
+            meta = {}
+            try:
+                with ipc.open_file(path) as reader:
+                    raw = (reader.schema.metadata or {}).get(b"freqhub")
+                meta = json.loads(raw) if raw else {}
+            except Exception:
+                pass
+            entries.append(CacheEntry(path.stem, path, stat.st_size, stat.st_mtime, meta))
+        return sorted(entries, key=lambda e: e.last_used)
+
+    def size(self) -> int:
+        return sum(e.size for e in self.entries())
+
+    def prune(self, max_bytes: Optional[int] = None, older_than: Optional[float] = None) -> List[CacheEntry]:
+        """
+        Evict least recently used entries until the cache fits in `max_bytes`,
+        and any entry not used for `older_than` seconds. Returns evicted entries.
+        """
+        entries = self.entries()
+        total = sum(e.size for e in entries)
+        now = time.time()
+        evicted = []
+        for entry in entries:
+            too_big = max_bytes is not None and total > max_bytes
+            too_old = older_than is not None and now - entry.last_used > older_than
+            if not (too_big or too_old):
+                continue
+            entry.path.unlink(missing_ok=True)
+            total -= entry.size
+            evicted.append(entry)
+        self.stats["evictions"] += len(evicted)
+        return evicted
+
+    def clear(self) -> List[CacheEntry]:
+        return self.prune(max_bytes=0)
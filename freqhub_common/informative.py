@@ -0,0 +1,135 @@
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from freqtrade.exchange import timeframe_to_minutes
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ["date", "open", "high", "low", "close", "volume"]
+
+
+def _bucket_ratio(timeframe: str, informative_timeframe: str) -> Tuple[int, int]:
+    base_minutes = timeframe_to_minutes(timeframe)
+    informative_minutes = timeframe_to_minutes(informative_timeframe)
+    if informative_minutes <= base_minutes or informative_minutes % base_minutes:
+        raise ValueError(
+            f"Cannot resample {timeframe} into {informative_timeframe}: "
+            "the informative timeframe must be a multiple of the base timeframe."
+        )
+    return informative_minutes, informative_minutes // base_minutes
+
+
+def resample_ohlcv(dataframe: DataFrame, timeframe: str, informative_timeframe: str) -> DataFrame:
+    """
+    Build `informative_timeframe` candles from `timeframe` candles.
+
+    Candles are dated by their open time, like exchange candles, so the result
+    can be passed straight to `merge_informative_pair`. Only complete buckets
+    are returned: a partial first bucket (history starting mid-candle) and the
+    still-forming last bucket are dropped, exactly as Freqtrade drops the
+    incomplete candle it receives from the exchange.
+    """
+    informative_minutes, ratio = _bucket_ratio(timeframe, informative_timeframe)
+    if dataframe.empty:
+        return DataFrame(columns=OHLCV_COLUMNS)
+
+    buckets = dataframe["date"].dt.floor(f"{informative_minutes}min")
+    bucket_values = buckets.to_numpy()
+    starts = np.flatnonzero(np.r_[True, bucket_values[1:] != bucket_values[:-1]])
+    counts = np.diff(np.r_[starts, len(dataframe)])
+    ends = starts + counts - 1
+    complete = counts == ratio
+
+    high = dataframe["high"].to_numpy()
+    low = dataframe["low"].to_numpy()
+    volume = dataframe["volume"].to_numpy()
+
+    resampled = DataFrame(
+        {
+            "date": buckets.iloc[starts].to_numpy(),
+            "open": dataframe["open"].to_numpy()[starts],
+            "high": np.maximum.reduceat(high, starts),
+            "low": np.minimum.reduceat(low, starts),
+            "close": dataframe["close"].to_numpy()[ends],
+            "volume": np.add.reduceat(volume, starts),
+        }
+    )
+    return resampled.loc[complete].reset_index(drop=True)
+
+
+class InformativeProvider:
+    """
+    Source of informative (higher timeframe) candles for a strategy.
+
+    By default candles come from the DataProvider, which means Freqtrade
+    downloads and keeps a second OHLCV series per pair. With
+    `"freqhub": {"resample_informative": true}` the informative candles are
+    instead derived from the base timeframe candles already in memory, and
+    `informative_pairs()` returns nothing so the extra download is skipped.
+
+    Resampling is incremental per pair: only candles after the last complete
+    bucket are aggregated on each call. The result is identical to a full
+    `resample_ohlcv()` of the given dataframe.
+    """
+
+    def __init__(self, timeframe: str, informative_timeframe: str, resample: bool = False):
+        self.timeframe = timeframe
+        self.informative_timeframe = informative_timeframe
+        self.resample = bool(resample)
+        informative_minutes, self.ratio = _bucket_ratio(timeframe, informative_timeframe)
+        self._bucket = pd.Timedelta(minutes=informative_minutes)
+        self._cache: Dict[str, DataFrame] = {}
+
+    @classmethod
+    def from_config(cls, config: dict, timeframe: str, informative_timeframe: str) -> "InformativeProvider":
+        resample = config.get("freqhub", {}).get("resample_informative", False)
+        return cls(timeframe, informative_timeframe, resample=resample)
+
+    def informative_pairs(self, pairs: List[str]) -> List[Tuple[str, str]]:
+        if self.resample:
+            return []
+        return [(pair, self.informative_timeframe) for pair in pairs]
+
+    def get_pair_dataframe(self, dp, pair: str, dataframe: DataFrame) -> DataFrame:
+        """
+        Return informative candles for `pair`. `dataframe` holds the base
+        timeframe candles and is only read when resampling.
+        """
+        if not self.resample:
+            return dp.get_pair_dataframe(pair=pair, timeframe=self.informative_timeframe)
+        return self._resample_incremental(pair, dataframe)
+
+    def _resample_incremental(self, pair: str, dataframe: DataFrame) -> DataFrame:
+        if dataframe.empty:
+            return DataFrame(columns=OHLCV_COLUMNS)
+
+        first_date = dataframe["date"].iloc[0]
+        last_date = dataframe["date"].iloc[-1]
+        cached = self._cache.get(pair)
+
+        if cached is not None and not cached.empty:
+            next_start = cached["date"].iloc[-1] + self._bucket
+            if first_date <= next_start and last_date >= cached["date"].iloc[-1]:
+                tail = dataframe.loc[dataframe["date"] >= next_start, OHLCV_COLUMNS]
+                if not tail.empty:
+                    appended = resample_ohlcv(tail, self.timeframe, self.informative_timeframe)
+                    if not appended.empty:
+                        cached = pd.concat([cached, appended], ignore_index=True)
+            else:
+                cached = None
+        else:
+            cached = None
+
+        if cached is None:
+            cached = resample_ohlcv(dataframe[OHLCV_COLUMNS], self.timeframe, self.informative_timeframe)
+        else:
+            # Drop buckets that are no longer covered by the base candles.
+            cached = cached.loc[cached["date"] >= first_date].reset_index(drop=True)
+
+        self._cache[pair] = cached
+        # Strategies add indicator columns to the informative frame.
+        return cached.copy()
@@ -0,0 +1,261 @@
+import math
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # Optional: kernels run as their NumPy formulation instead
+    numba = None
+
+
+def _compile(loop):
+    try:
+        return numba.njit(cache=True, nogil=True)(loop)
+    except RuntimeError:  # No writable cache directory: compile once per process
+        return numba.njit(nogil=True)(loop)
+
+
+class Kernel:
+    """
+    A path-dependent loop in three forms that give identical results: the
+    loop itself in plain Python (`reference`, the definition), compiled with
+    Numba when numba is installed (`compiled`), and a NumPy formulation
+    without loops (`vectorized`). Calling the kernel runs the compiled loop
+    when there is one and the NumPy formulation otherwise.
+
+    Numba compiles on the first call (cached on disk where it can write,
+    so once per image) and releases the GIL, so parallel pair analysis
+    keeps running in parallel.
+    """
+
+    def __init__(self, loop, vectorized):
+        self.reference = loop
+        self.vectorized = vectorized
+        self.compiled = _compile(loop) if numba is not None else None
+
+    @property
+    def engine(self) -> str:
+        return "numba" if self.compiled is not None else "numpy"
+
+    def __call__(self, *args):
+        return (self.compiled or self.vectorized)(*args)
+
+
+def _floats(values) -> np.ndarray:
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _bounded_ffill_loop(values, limit):
+    out = np.empty(len(values))
+    last = math.nan
+    gap = 0
+    for i in range(len(values)):
+        if not math.isnan(values[i]):
+            last = values[i]
+            gap = 0
+            out[i] = last
+        else:
+            gap += 1
+            out[i] = last if limit < 0 or gap <= limit else math.nan
+    return out
+
+
+def _bounded_ffill_numpy(values, limit):
+    rows = np.arange(len(values))
+    last = np.maximum.accumulate(np.where(np.isnan(values), -1, rows))
+    filled = last >= 0
+    if limit >= 0:
+        filled &= rows - last <= limit
+    return np.where(filled, values[np.maximum(last, 0)], np.nan)
+
+
+_BOUNDED_FFILL = Kernel(_bounded_ffill_loop, _bounded_ffill_numpy)
+
+
+def bounded_ffill(values, limit: Optional[int] = None) -> np.ndarray:
+    """
+    pandas' `Series.ffill(limit=limit)` on a float array: NaN takes the
+    last value before it, at most `limit` rows after it (None: no limit).
+    """
+    return _BOUNDED_FFILL(_floats(values), -1 if limit is None else int(limit))
+
+
+def _fractals_loop(high, low, wing):
+    n = len(high)
+    fractal_high = np.full(n, math.nan)
+    fractal_low = np.full(n, math.nan)
+    for i in range(wing, n - wing):
+        is_high = True
+        is_low = True
+        for j in range(1, wing + 1):
+            # Comparisons with NaN are false, as in pandas.
+            if not (high[i] > high[i - j] and high[i] >= high[i + j]):
+                is_high = False
+            if not (low[i] < low[i - j] and low[i] <= low[i + j]):
+                is_low = False
+        if is_high:
+            fractal_high[i + wing] = high[i]
+        if is_low:
+            fractal_low[i + wing] = low[i]
+    return fractal_high, fractal_low
+
+
+def _fractals_numpy(high, low, wing):
+    n = len(high)
+    is_high = np.zeros(n, dtype=bool)
+    is_low = np.zeros(n, dtype=bool)
+    if n > 2 * wing:
+        middle = slice(wing, n - wing)
+        is_high[middle] = True
+        is_low[middle] = True
+        for j in range(1, wing + 1):
+            before, after = slice(wing - j, n - wing - j), slice(wing + j, n - wing + j)
+            is_high[middle] &= (high[middle] > high[before]) & (high[middle] >= high[after])
+            is_low[middle] &= (low[middle] < low[before]) & (low[middle] <= low[after])
+    fractal_high = np.full(n, np.nan)
+    fractal_low = np.full(n, np.nan)
+    if n > wing:
+        fractal_high[wing:] = np.where(is_high, high, np.nan)[: n - wing]
+        fractal_low[wing:] = np.where(is_low, low, np.nan)[: n - wing]
+    return fractal_high, fractal_low
+
+
+_FRACTALS = Kernel(_fractals_loop, _fractals_numpy)
+
+
+def fractals(high, low, wing: int = 2) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bill Williams fractals as they become known: a high above the `wing`
+    highs before it and not below the `wing` highs after it (a low the
+    other way round), placed on the candle that confirms it, `wing` rows
+    later; NaN elsewhere. The same as
+    `high.where(high > high.shift(1) & ... & high >= high.shift(-wing)).shift(wing)`.
+    """
+    return _FRACTALS(_floats(high), _floats(low), int(wing))
+
+
+def _trailing_stop_loop(high, low, stop, open_rate, fee_factor, distance, positive, offset, only_offset):
+    for i in range(len(high)):
+        if stop >= low[i]:
+            return i, stop
+        profit = high[i] / open_rate * fee_factor - 1
+        if not (only_offset and profit < offset):
+            trail = positive if not math.isnan(positive) and profit > offset else distance
+            candidate = high[i] * (1 - trail)
+            if candidate > stop:
+                stop = candidate
+            if stop >= low[i]:
+                return i, stop
+    return -1, stop
+
+
+def _trailing_stop_numpy(high, low, stop, open_rate, fee_factor, distance, positive, offset, only_offset):
+    profit = high / open_rate * fee_factor - 1
+    trail = np.full(len(high), distance)
+    if not math.isnan(positive):
+        trail = np.where(profit > offset, positive, trail)
+    candidate = high * (1 - trail)
+    if only_offset:
+        candidate = np.where(profit < offset, np.nan, candidate)
+    running = np.fmax.accumulate(np.concatenate(([stop], candidate)))
+    before, after = running[:-1], running[1:]
+    # A candle that reaches the stop it started with exits there; otherwise
+    # its high may have raised the stop into its low.
+    level = np.where(before >= low, before, after)
+    hits = np.flatnonzero(level >= low)
+    if len(hits):
+        return int(hits[0]), float(level[hits[0]])
+    return -1, float(running[-1])
+
+
+_TRAILING_STOP = Kernel(_trailing_stop_loop, _trailing_stop_numpy)
+
+
+def trailing_stop(
+    high,
+    low,
+    stop: float,
+    open_rate: float,
+    fee_factor: float,
+    distance: float,
+    positive: Optional[float] = None,
+    offset: float = 0.0,
+    only_offset: bool = False,
+) -> Tuple[int, float]:
+    """
+    Walk a long trade's trailing stop over candles (`high`, `low`) starting
+    at `stop`: on each candle the stop is first checked against the low,
+    then raised to `high * (1 - trail)` (never lowered), then checked
+    again. `trail` is `positive` once the profit at the high (`high /
+    open_rate * fee_factor - 1`) exceeds `offset`, `distance` otherwise;
+    with `only_offset` the stop does not move below that profit.
+
+    Returns the index of the first candle that reaches the stop and the
+    stop it reached, or -1 and the stop after the last candle.
+    """
+    index, level = _TRAILING_STOP(
+        _floats(high),
+        _floats(low),
+        float(stop),
+        float(open_rate),
+        float(fee_factor),
+        float(distance),
+        math.nan if positive is None else float(positive),
+        float(offset),
+        bool(only_offset),
+    )
+    return int(index), float(level)
+
+
+def _transition_counts_loop(states, n_states, window):
+    n = len(states)
+    counts = np.zeros((n, n_states, n_states), dtype=np.int32)
+    current = np.zeros((n_states, n_states), dtype=np.int32)
+    for t in range(1, n):
+        a, b = states[t - 1], states[t]
+        if 0 <= a < n_states and 0 <= b < n_states:
+            current[a, b] += 1
+        # The transition into row t - window leaves the window.
+        old = t - window
+        if old >= 1:
+            a, b = states[old - 1], states[old]
+            if 0 <= a < n_states and 0 <= b < n_states:
+                current[a, b] -= 1
+        counts[t] = current
+    return counts
+
+
+def _transition_counts_numpy(states, n_states, window):
+    n = len(states)
+    previous, current = states[:-1], states[1:]
+    valid = (previous >= 0) & (previous < n_states) & (current >= 0) & (current < n_states)
+    codes = np.full(n, -1)
+    codes[1:] = np.where(valid, previous * n_states + current, -1)
+    totals = np.cumsum(codes[:, None] == np.arange(n_states * n_states), axis=0, dtype=np.int32)
+    totals[window:] -= totals[:-window].copy()
+    return totals.reshape(n, n_states, n_states)
+
+
+_TRANSITION_COUNTS = Kernel(_transition_counts_loop, _transition_counts_numpy)
+
+
+def transition_counts(states, n_states: int, window: int) -> np.ndarray:
+    """
+    Rolling Markov transition counts: `counts[t, a, b]` is how many of the
+    transitions into rows t - window + 1 .. t went from state a to state b.
+    States outside 0 .. n_states - 1 (e.g. -1 for unknown) count nowhere.
+    Shape (len(states), n_states, n_states), int32.
+    """
+    if int(window) < 1:
+        raise ValueError("window must be at least 1")
+    return _TRANSITION_COUNTS(np.ascontiguousarray(states, dtype=np.int64), int(n_states), int(window))
+
+
+# Every kernel by name, for tools.check_kernels.
+KERNELS: Dict[str, Kernel] = {
+    "bounded_ffill": _BOUNDED_FFILL,
+    "fractals": _FRACTALS,
+    "trailing_stop": _TRAILING_STOP,
+    "transition_counts": _TRANSITION_COUNTS,
+}
@@ -0,0 +1,381 @@
+"""
+Memory profile of a strategy's `populate_indicators`, per pair.
+
+    python -m freqhub_common.memory_profile
+    python -m freqhub_common.memory_profile strategies/*/user_data/logs/memory_profile.jsonl
+
+Run as a module, prints the summary table of one or more profile files
+(e.g. every bot on a host). Only the standard library is imported at module
+level.
+"""
+
+import argparse
+import atexit
+import functools
+import json
+import logging
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FILE_NAME = "memory_profile.jsonl"
+DEFAULT_PATH = Path("user_data") / "logs" / FILE_NAME
+DEFAULT_TOP = 10
+SUMMARY_COLUMNS = 5
+# Pair of the records of ParallelPairAnalyzer.prefetch (all pairs at once)
+PREFETCH = "(prefetch)"
+MB = 1024 * 1024
+
+
+def _max_rss() -> int:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def dataframe_memory(dataframe) -> Dict[str, list]:
+    """
+    [dtype, bytes] per column of a pandas dataframe (the index as "Index").
+    """
+    usage = dataframe.memory_usage(index=True, deep=True)
+    dtypes = dataframe.dtypes
+    return {
+        str(column): [str(dtypes[column]) if column in dtypes.index else "index", int(size)]
+        for column, size in usage.items()
+    }
+
+
+class MemoryProfiler:
+    """
+    Records what `populate_indicators` costs in memory, per pair and call:
+
+    - the dataframe it returns, by column and dtype (`memory_usage(deep=True)`),
+    - the peak of traced allocations during the call above what was traced
+      before it, and what the call left allocated (`tracemalloc`),
+    - with `top` > 0, the source lines that allocated most during the call
+      (tracemalloc snapshots before and after, diffed),
+    - the process' maximum RSS,
+
+    one JSON line per call in `path` (the logs directory by default), so
+    growth over time can be followed per pair, dataframe and process. At
+    exit a summary table per pair (calls, rows, columns, dataframe size and
+    its growth since the first call, peak, bytes per dtype) is logged and
+    appended to the file; `python -m freqhub_common.memory_profile` prints
+    the same table from files.
+
+    `from_config` wraps the strategy instance's `populate_indicators`, so
+    strategies need no other change. Tracing every allocation slows the
+    whole process down, and profiled calls are serialized so each peak
+    belongs to one call. With parallel pair analysis
+    (`freqhub.parallel_analysis`) the indicators are computed in
+    `bot_loop_start`: the strategy's `_pair_analyzer.prefetch` is wrapped
+    too, and each prefetch that computed pairs is one record of pair
+    `(prefetch)` (peak and retained bytes of all its pairs, no top sites),
+    while `populate_indicators` records then only cover taking the
+    prefetched frame. `every` profiles only every n-th call per pair.
+    Not available in hyperopt. Config:
+
+        "freqhub": {
+            "memory_profile": {
+                "enabled": true,
+                "path": "user_data/logs/memory_profile.jsonl",
+                "top": 10,
+                "every": 1
+            }
+        }
+    """
+
+    def __init__(self, strategy_name: str, path: Optional[Path], top: int = DEFAULT_TOP, every: int = 1):
+        self.strategy_name = strategy_name
+        self.path = Path(path) if path else None
+        self.top = int(top)
+        self.every = max(int(every), 1)
+        self.summary = MemorySummary()
+        self._calls: Counter = Counter()
+        self._lock = threading.Lock()
+        self._file = None
+        self._started_tracing = False
+        self._closed = False
+
+    @classmethod
+    def from_config(cls, config: dict, strategy) -> Optional["MemoryProfiler"]:
+        settings = config.get("freqhub", {}).get("memory_profile", {})
+        if not settings.get("enabled", False):
+            return None
+        runmode = config.get("runmode")
+        if getattr(runmode, "value", runmode) == "hyperopt":
+            logger.warning("freqhub.memory_profile is not available in hyperopt, ignoring it")
+            return None
+        path = settings.get("path") or Path(config.get("user_data_dir") or "user_data") / "logs" / FILE_NAME
+        profiler = cls(
+            type(strategy).__name__,
+            path,
+            top=settings.get("top", DEFAULT_TOP),
+            every=settings.get("every", 1),
+        )
+        profiler.install(strategy)
+        return profiler
+
+    def install(self, strategy) -> None:
+        """
+        Profile `strategy.populate_indicators` from now on (until `close`).
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        populate = strategy.populate_indicators
+
+        @functools.wraps(populate)
+        def populate_indicators(dataframe, metadata):
+            return self.profile(populate, dataframe, metadata)
+
+        strategy.populate_indicators = populate_indicators
+
+        analyzer = getattr(strategy, "_pair_analyzer", None)
+        if analyzer is not None and analyzer.enabled:
+            prefetch = analyzer.prefetch
+
+            @functools.wraps(prefetch)
+            def profiled_prefetch(strategy):
+                return self.profile_prefetch(analyzer, prefetch, strategy)
+
+            analyzer.prefetch = profiled_prefetch
+        atexit.register(self.close)
+
+    def profile(self, populate, dataframe, metadata: dict):
+        """
+        `populate(dataframe, metadata)`, recorded when tracing is on and it
+        is the pair's `every`-th call.
+        """
+        pair = metadata.get("pair", "")
+        if not self._due(pair):
+            return populate(dataframe, metadata)
+
+        with self._lock:
+            before = self._snapshot()
+            traced_before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            started = time.perf_counter()
+            result = populate(dataframe, metadata)
+            seconds = time.perf_counter() - started
+            traced_after, peak = tracemalloc.get_traced_memory()
+            after = self._snapshot()
+
+        self._add(pair, result, seconds, peak - traced_before, traced_after - traced_before, traced_after, before, after)
+        return result
+
+    def profile_prefetch(self, analyzer, prefetch, strategy) -> None:
+        """
+        `prefetch(strategy)` of a ParallelPairAnalyzer, recorded (as pair
+        `(prefetch)`) when it computed pairs.
+        """
+        if self._closed or not tracemalloc.is_tracing():
+            return prefetch(strategy)
+
+        with self._lock:
+            pairs = analyzer.stats["pairs"]
+            traced_before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            started = time.perf_counter()
+            prefetch(strategy)
+            seconds = time.perf_counter() - started
+            traced_after, peak = tracemalloc.get_traced_memory()
+
+        if analyzer.stats["pairs"] > pairs and self._due(PREFETCH):
+            self._add(PREFETCH, None, seconds, peak - traced_before, traced_after - traced_before, traced_after)
+
+    def _due(self, pair: str) -> bool:
+        """
+        Count a call of `pair`; whether it is profiled.
+        """
+        self._calls[pair] += 1
+        return not self._closed and tracemalloc.is_tracing() and (self._calls[pair] - 1) % self.every == 0
+
+    def _add(self, pair: str, result, seconds: float, peak: int, retained: int, traced: int,
+             before: Optional[tracemalloc.Snapshot] = None, after: Optional[tracemalloc.Snapshot] = None) -> None:
+        columns = dataframe_memory(result) if result is not None else {}
+        dtypes: Counter = Counter()
+        for dtype, size in columns.values():
+            dtypes[dtype] += size
+        record = {
+            "time": round(time.time(), 3),
+            "strategy": self.strategy_name,
+            "pair": pair,
+            "call": self._calls[pair],
+            "rows": len(result) if result is not None else 0,
+            "seconds": round(seconds, 4),
+            "dataframe_bytes": sum(size for _, size in columns.values()),
+            "columns": columns,
+            "dtypes": dict(dtypes),
+            "peak_bytes": peak,
+            "retained_bytes": retained,
+            "traced_bytes": traced,
+            "max_rss_bytes": _max_rss(),
+        }
+        if before is not None and after is not None:
+            record["top"] = [
+                {"site": str(stat.traceback), "bytes": stat.size_diff, "count": stat.count_diff}
+                for stat in after.compare_to(before, "lineno")[: self.top]
+            ]
+        self.summary.add(record)
+        self._write(record)
+
+    def _snapshot(self) -> Optional[tracemalloc.Snapshot]:
+        if self.top <= 0:
+            return None
+        # Leave out the profiler's own allocations (snapshots, records)
+        return tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+        )
+
+    def _write(self, record: dict) -> None:
+        if self.path is None:
+            return
+        try:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = self.path.open("a", buffering=1)
+            self._file.write(json.dumps(record) + "\n")
+        except OSError as e:
+            logger.warning("Could not write memory profile %s: %s", self.path, e)
+            self.path = None
+
+    def close(self) -> None:
+        """
+        Log the summary table, append it to the file and stop tracing (if
+        this profiler started it).
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self.summary.pairs:
+            logger.info("Memory profile of %s.populate_indicators:\n%s", self.strategy_name, self.summary.table())
+            self._write({"time": round(time.time(), 3), "strategy": self.strategy_name, "summary": self.summary.rows()})
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+class MemorySummary:
+    """
+    Per (strategy, pair): calls profiled, last rows and columns, dataframe
+    size at the first and last call, largest peak and the last call's
+    bytes per dtype and largest columns. Per process: traced memory at the
+    first and last call and the maximum RSS.
+    """
+
+    def __init__(self):
+        self.pairs: Dict[tuple, dict] = {}
+        self.traced: Dict[str, list] = {}
+        self.max_rss = 0
+
+    def add(self, record: dict) -> None:
+        key = (record["strategy"], record["pair"])
+        state = self.pairs.get(key)
+        if state is None:
+            state = self.pairs[key] = {
+                "calls": 0,
+                "first_time": record["time"],
+                "first_bytes": record["dataframe_bytes"],
+                "peak_bytes": 0,
+            }
+        columns = sorted(record["columns"].items(), key=lambda item: item[1][1], reverse=True)
+        state.update(
+            calls=state["calls"] + 1,
+            last_time=record["time"],
+            last_bytes=record["dataframe_bytes"],
+            rows=record["rows"],
+            columns=len(record["columns"]),
+            peak_bytes=max(state["peak_bytes"], record["peak_bytes"]),
+            dtypes=record["dtypes"],
+            largest=[(name, dtype, size) for name, (dtype, size) in columns[:SUMMARY_COLUMNS]],
+        )
+        traced = self.traced.setdefault(record["strategy"], [record["traced_bytes"], record["traced_bytes"]])
+        traced[1] = record["traced_bytes"]
+        self.max_rss = max(self.max_rss, record.get("max_rss_bytes", 0))
+
+    def rows(self) -> List[dict]:
+        rows = []
+        for (strategy, pair), state in sorted(self.pairs.items()):
+            hours = (state["last_time"] - state["first_time"]) / 3600
+            growth = state["last_bytes"] - state["first_bytes"]
+            rows.append({
+                "strategy": strategy,
+                "pair": pair,
+                "calls": state["calls"],
+                "rows": state["rows"],
+                "columns": state["columns"],
+                "dataframe_bytes": state["last_bytes"],
+                "growth_bytes": growth,
+                # Only over an hour or more: candles arrive once per timeframe
+                "growth_bytes_per_hour": round(growth / hours) if hours >= 1 else None,
+                "peak_bytes": state["peak_bytes"],
+                "dtypes": state["dtypes"],
+                "largest_columns": [f"{name} ({dtype}) {size / MB:.2f}MB" for name, dtype, size in state["largest"]],
+            })
+        return rows
+
+    def table(self) -> str:
+        header = (
+            f"{'strategy':<24} {'pair':<16} {'calls':>6} {'rows':>8} {'cols':>5} {'df MB':>8} "
+            f"{'growth MB':>10} {'MB/h':>8} {'peak MB':>8}  MB by dtype"
+        )
+        lines = [header, "-" * len(header)]
+        for row in self.rows():
+            per_hour = row["growth_bytes_per_hour"]
+            lines.append(
+                f"{row['strategy']:<24} {row['pair']:<16} {row['calls']:>6} {row['rows']:>8} {row['columns']:>5} "
+                f"{row['dataframe_bytes'] / MB:>8.2f} {row['growth_bytes'] / MB:>10.2f} "
+                f"{'-' if per_hour is None else f'{per_hour / MB:.2f}':>8} {row['peak_bytes'] / MB:>8.2f}  "
+                + ", ".join(
+                    f"{dtype} {size / MB:.2f}"
+                    for dtype, size in sorted(row["dtypes"].items(), key=lambda item: item[1], reverse=True)
+                )
+            )
+        total = sum(row["dataframe_bytes"] for row in self.rows())
+        lines.append(f"dataframes {total / MB:.2f}MB in total, process max RSS {self.max_rss / MB:.0f}MB")
+        for strategy, (first, last) in sorted(self.traced.items()):
+            lines.append(
+                f"{strategy}: traced {first / MB:.1f}MB at the first profiled call, {last / MB:.1f}MB at the last"
+            )
+        return "\n".join(lines)
+
+
+def read_summary(paths: Iterable[Path]) -> MemorySummary:
+    summary = MemorySummary()
+    for path in paths:
+        with open(path) as file:
+            for line in file:
+                record = json.loads(line)
+                if "summary" not in record:
+                    summary.add(record)
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Summarize freqhub.memory_profile files.")
+    parser.add_argument("paths", nargs="*", default=[str(DEFAULT_PATH)], help="Profile files (JSONL)")
+    args = parser.parse_args(argv)
+
+    try:
+        summary = read_summary(Path(path) for path in args.paths)
+    except (OSError, ValueError) as e:
+        print(f"Unreadable memory profile: {e}", file=sys.stderr)
+        return 1
+    if not summary.pairs:
+        print("No memory profile records")
+        return 0
+    print(summary.table())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
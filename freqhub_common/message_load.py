@@ -0,0 +1,220 @@
+import atexit
+import json
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEDGER = "user_data/logs/message_load.jsonl"
+MESSAGE_PREFIX = "freqhub-load"
+ENTRY_TAG_PREFIX = "load@"
+
+_MESSAGE_RE = re.compile(rf"{MESSAGE_PREFIX} seq=(?P<seq>\d+) t=(?P<t>[\d.]+)")
+
+
+def format_load_message(seq: int, created: float, pair: str, burst: bool) -> str:
+    return f"{MESSAGE_PREFIX} seq={seq} t={created:.6f} pair={pair} burst={int(burst)}"
+
+
+def parse_load_message(text: str) -> Optional[dict]:
+    """
+    (seq, created) of a load generator message, or None for any other text.
+    """
+    match = _MESSAGE_RE.search(text or "")
+    if match is None:
+        return None
+    return {"seq": int(match["seq"]), "created": float(match["t"])}
+
+
+def format_entry_tag(created: float) -> str:
+    return f"{ENTRY_TAG_PREFIX}{created:.6f}"
+
+
+def parse_entry_tag(tag: Optional[str]) -> Optional[float]:
+    if not tag or not tag.startswith(ENTRY_TAG_PREFIX):
+        return None
+    try:
+        return float(tag[len(ENTRY_TAG_PREFIX):])
+    except ValueError:
+        return None
+
+
+class MessageLoadGenerator:
+    """
+    Emits strategy messages at a target rate, with periodic bursts, to
+    stress the notification path (Freqtrade's message queue, webhook and
+    Telegram senders) in dry-run.
+
+    Every message carries a sequence number and its enqueue time, and is
+    appended to a JSONL ledger. Every `duplicate_every`-th message repeats
+    the previous text, which Freqtrade suppresses as a duplicate within the
+    candle. `tools.message_load` compares the ledger with what a stand-in
+    receiver got and reports latency percentiles, drops and duplicates.
+
+    Entries are limited to `orders_per_minute` with a token bucket (see
+    `allow_order`). `from_config` registers `close` to run at exit, which
+    logs the stats and ends the ledger with a "stop" record. Only active in
+    dry-run. Config:
+
+        "freqhub": {
+            "message_load": {
+                "enabled": true,
+                "messages_per_minute": 120,
+                "burst_size": 50,
+                "burst_every_seconds": 300,
+                "duplicate_every": 10,
+                "orders_per_minute": 20,
+                "ledger": "user_data/logs/message_load.jsonl"
+            }
+        }
+    """
+
+    def __init__(
+        self,
+        send: Callable[..., None],
+        messages_per_minute: float = 60.0,
+        burst_size: int = 0,
+        burst_every_seconds: float = 0.0,
+        duplicate_every: int = 0,
+        orders_per_minute: float = 0.0,
+        ledger: Optional[str] = DEFAULT_LEDGER,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.send = send
+        self.messages_per_minute = float(messages_per_minute)
+        self.burst_size = int(burst_size)
+        self.burst_every_seconds = float(burst_every_seconds)
+        self.duplicate_every = int(duplicate_every)
+        self.orders_per_minute = float(orders_per_minute)
+        self.clock = clock
+        self._ledger_path = Path(ledger) if ledger else None
+        self._ledger = None
+        self._started: Optional[float] = None
+        self._last_burst: Optional[float] = None
+        self._scheduled = 0
+        self._seq = 0
+        self._last_text: Optional[str] = None
+        self._order_tokens = 0.0
+        self._order_refill: Optional[float] = None
+        self._closed = False
+        self.stats = {"messages": 0, "duplicates": 0, "bursts": 0, "orders_allowed": 0, "orders_blocked": 0}
+
+    @classmethod
+    def from_config(cls, config: dict, send: Callable[..., None]) -> Optional["MessageLoadGenerator"]:
+        settings = config.get("freqhub", {}).get("message_load", {})
+        runmode = config.get("runmode")
+        runmode = getattr(runmode, "value", runmode)
+        if not settings.get("enabled", False):
+            return None
+        if runmode != "dry_run":
+            logger.warning("Message load generator is only available in dry-run, ignoring it")
+            return None
+        generator = cls(
+            send,
+            messages_per_minute=settings.get("messages_per_minute", 60.0),
+            burst_size=settings.get("burst_size", 0),
+            burst_every_seconds=settings.get("burst_every_seconds", 0.0),
+            duplicate_every=settings.get("duplicate_every", 0),
+            orders_per_minute=settings.get("orders_per_minute", 0.0),
+            ledger=settings.get("ledger", DEFAULT_LEDGER),
+        )
+        atexit.register(generator.close)
+        return generator
+
+    def _record(self, entry: dict) -> None:
+        if self._ledger_path is None:
+            return
+        if self._ledger is None:
+            self._ledger_path.parent.mkdir(parents=True, exist_ok=True)
+            self._ledger = self._ledger_path.open("a", buffering=1)
+        self._ledger.write(json.dumps(entry) + "\n")
+
+    def _emit(self, pairs: List[str], burst: bool) -> None:
+        now = self.clock()
+        if self.duplicate_every > 0 and self._last_text and (self._scheduled + 1) % self.duplicate_every == 0:
+            # Same text again: Freqtrade drops it as a duplicate
+            self.send(self._last_text)
+            self._record({"kind": "duplicate", "seq": self._seq, "created": now})
+            self.stats["duplicates"] += 1
+        else:
+            self._seq += 1
+            pair = pairs[self._seq % len(pairs)] if pairs else ""
+            text = format_load_message(self._seq, now, pair, burst)
+            self.send(text)
+            self._record({"kind": "message", "seq": self._seq, "created": now, "pair": pair, "burst": burst})
+            self._last_text = text
+            self.stats["messages"] += 1
+        self._scheduled += 1
+
+    def tick(self, pairs: List[str]) -> int:
+        """
+        Emit every message due since the last call (call from
+        `bot_loop_start`). Returns the number of messages emitted.
+        """
+        now = self.clock()
+        if self._started is None:
+            self._started = now
+            self._last_burst = now
+            self._record({"kind": "start", "created": now, "config": self.describe()})
+
+        emitted = 0
+        due = int((now - self._started) * self.messages_per_minute / 60.0) - (self._scheduled - self._burst_total())
+        for _ in range(max(due, 0)):
+            self._emit(pairs, burst=False)
+            emitted += 1
+
+        if self.burst_size > 0 and self.burst_every_seconds > 0 and now - self._last_burst >= self.burst_every_seconds:
+            self._last_burst = now
+            self.stats["bursts"] += 1
+            for _ in range(self.burst_size):
+                self._emit(pairs, burst=True)
+                emitted += 1
+        return emitted
+
+    def _burst_total(self) -> int:
+        return self.stats["bursts"] * self.burst_size
+
+    def allow_order(self) -> bool:
+        """
+        Token bucket for entries; holds at most one minute of orders.
+        """
+        if self.orders_per_minute <= 0:
+            self.stats["orders_allowed"] += 1
+            return True
+        now = self.clock()
+        if self._order_refill is None:
+            self._order_refill = now
+            self._order_tokens = 1.0
+        self._order_tokens = min(
+            self.orders_per_minute,
+            self._order_tokens + (now - self._order_refill) * self.orders_per_minute / 60.0,
+        )
+        self._order_refill = now
+        if self._order_tokens >= 1.0:
+            self._order_tokens -= 1.0
+            self.stats["orders_allowed"] += 1
+            return True
+        self.stats["orders_blocked"] += 1
+        return False
+
+    def describe(self) -> Dict[str, float]:
+        return {
+            "messages_per_minute": self.messages_per_minute,
+            "burst_size": self.burst_size,
+            "burst_every_seconds": self.burst_every_seconds,
+            "duplicate_every": self.duplicate_every,
+            "orders_per_minute": self.orders_per_minute,
+        }
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        logger.info("Message load generator stats: %s", self.stats)
+        if self._ledger is not None:
+            self._record({"kind": "stop", "created": self.clock(), "stats": self.stats})
+            self._ledger.close()
+            self._ledger = None
@@ -0,0 +1,217 @@
+import functools
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LIVE_RUNMODES = ("live", "dry_run")
+DEFAULT_COALESCE_SECONDS = 60.0
+DEFAULT_MAX_PER_MINUTE = 20.0
+DEFAULT_MAX_QUEUE = 1000
+DEFAULT_LOG_EVERY_SECONDS = 300.0
+LATENCY_SAMPLES = 1000
+
+
+class _Pending:
+    __slots__ = ("text", "enqueued", "repeats")
+
+    def __init__(self, text: str, enqueued: float):
+        self.text = text
+        self.enqueued = enqueued
+        self.repeats = 0
+
+
+class NotificationQueue:
+    """
+    Coalesced, rate-limited delivery of strategy messages.
+
+    `notify()` only appends to an in-memory queue. `flush()`, called from the
+    strategy's `bot_loop_start` (main thread), hands what the rate limit
+    allows to the public `dp.send_msg`; Freqtrade's RPCManager delivers it
+    to the RPC handlers (Telegram, webhook, Discord) at the end of the loop.
+    Identical messages within `coalesce_seconds` are merged (the delivered
+    text notes the repeats), delivery is limited to `max_per_minute`, and at
+    most `max_queue` messages wait (newer ones are dropped and counted), so
+    a burst of messages cannot flood the endpoints or the loop.
+
+    `metrics()` returns queue depth, counters and enqueue-to-hand-over
+    latency percentiles; they are also logged every `log_every_seconds`.
+
+    When disabled (the default, or outside live/dry-run) `notify()` calls
+    `dp.send_msg` directly, as the strategies did before. Config:
+
+        "freqhub": {
+            "notifications": {
+                "enabled": true,
+                "coalesce_seconds": 60,
+                "max_per_minute": 20,
+                "max_queue": 1000
+            }
+        }
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str], None],
+        coalesce_seconds: float = DEFAULT_COALESCE_SECONDS,
+        max_per_minute: float = DEFAULT_MAX_PER_MINUTE,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        log_every_seconds: float = DEFAULT_LOG_EVERY_SECONDS,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.send = send
+        self.coalesce_seconds = float(coalesce_seconds)
+        self.max_per_minute = float(max_per_minute)
+        self.max_queue = int(max_queue)
+        self.log_every_seconds = float(log_every_seconds)
+        self.enabled = bool(enabled)
+        self.clock = clock
+        self._queue: "OrderedDict[str, _Pending]" = OrderedDict()
+        self._recent: Dict[str, float] = {}
+        self._suppressed: Dict[str, int] = {}
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._lock = threading.Lock()
+        self._tokens = max(self.max_per_minute, 1.0) if self.max_per_minute > 0 else 0.0
+        self._refilled = clock()
+        self._last_log = clock()
+        self.stats = {
+            "enqueued": 0,
+            "delivered": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "failed": 0,
+            "max_depth": 0,
+        }
+
+    @classmethod
+    def from_config(cls, config: dict, dp) -> "NotificationQueue":
+        settings = config.get("freqhub", {}).get("notifications", {})
+        runmode = config.get("runmode")
+        runmode = getattr(runmode, "value", runmode)
+        enabled = bool(settings.get("enabled", False)) and runmode in LIVE_RUNMODES
+        # The queue coalesces itself: bypass send_msg's once-per-candle filter
+        return cls(
+            functools.partial(dp.send_msg, always_send=True) if enabled else dp.send_msg,
+            coalesce_seconds=settings.get("coalesce_seconds", DEFAULT_COALESCE_SECONDS),
+            max_per_minute=settings.get("max_per_minute", DEFAULT_MAX_PER_MINUTE),
+            max_queue=settings.get("max_queue", DEFAULT_MAX_QUEUE),
+            log_every_seconds=settings.get("log_every_seconds", DEFAULT_LOG_EVERY_SECONDS),
+            enabled=enabled,
+        )
+
+    def notify(self, text: str) -> None:
+        """
+        Queue a message for the next `flush()`.
+        """
+        if not self.enabled:
+            self.send(text)
+            return
+
+        now = self.clock()
+        with self._lock:
+            self.stats["enqueued"] += 1
+            pending = self._queue.get(text)
+            if pending is not None:
+                pending.repeats += 1
+                self.stats["coalesced"] += 1
+                return
+            last = self._recent.get(text)
+            if last is not None and now - last < self.coalesce_seconds:
+                self._suppressed[text] = self._suppressed.get(text, 0) + 1
+                self.stats["coalesced"] += 1
+                return
+            if len(self._queue) >= self.max_queue:
+                self.stats["dropped"] += 1
+                return
+            self._queue[text] = _Pending(text, now)
+            self.stats["max_depth"] = max(self.stats["max_depth"], len(self._queue))
+
+    def _take_token(self, now: float) -> float:
+        """
+        Seconds to wait for the rate limit; 0 when a message may go now.
+        """
+        if self.max_per_minute <= 0:
+            return 0.0
+        rate = self.max_per_minute / 60.0
+        self._tokens = min(max(self.max_per_minute, 1.0), self._tokens + (now - self._refilled) * rate)
+        self._refilled = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / rate
+
+    def flush(self) -> None:
+        """
+        Hand the queued messages the rate limit allows to `dp.send_msg`.
+        Call it from `bot_loop_start`.
+        """
+        if not self.enabled:
+            return
+
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._forget(now)
+                if not self._queue or self._take_token(now) > 0:
+                    self._maybe_log()
+                    return
+                _, pending = self._queue.popitem(last=False)
+                repeats = pending.repeats + self._suppressed.pop(pending.text, 0)
+
+            text = pending.text
+            if repeats:
+                text = f"{text}\n_(+{repeats} identical within {self.coalesce_seconds:.0f}s)_"
+            try:
+                self.send(text)
+                delivered = self.clock()
+                with self._lock:
+                    self.stats["delivered"] += 1
+                    self._latencies.append(delivered - pending.enqueued)
+                    self._recent[pending.text] = delivered
+            except Exception as e:
+                with self._lock:
+                    self.stats["failed"] += 1
+                logger.warning("Could not deliver notification: %s", e)
+
+    def _forget(self, now: float) -> None:
+        # Messages older than the window can be sent again
+        expired = [text for text, sent in self._recent.items() if now - sent >= self.coalesce_seconds]
+        for text in expired:
+            del self._recent[text]
+            if self._suppressed.get(text):
+                # Repeats that arrived after delivery go out once the window closes
+                self._queue.setdefault(text, _Pending(text, now)).repeats += self._suppressed.pop(text) - 1
+
+    def _maybe_log(self) -> None:
+        now = self.clock()
+        if now - self._last_log < self.log_every_seconds:
+            return
+        self._last_log = now
+        if self.stats["enqueued"]:
+            logger.info("Notification queue: %s", self._metrics_locked())
+
+    def _metrics_locked(self) -> dict:
+        latencies: List[float] = list(self._latencies)
+        metrics = dict(self.stats, depth=len(self._queue))
+        if latencies:
+            data = np.asarray(latencies) * 1000.0
+            metrics.update(
+                latency_p50_ms=float(np.percentile(data, 50)),
+                latency_p95_ms=float(np.percentile(data, 95)),
+                latency_max_ms=float(data.max()),
+            )
+        return metrics
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return self._metrics_locked()
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
@@ -0,0 +1,213 @@
+import atexit
+import logging
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from pandas import DataFrame
+
+logger = logging.getLogger(__name__)
+
+ComputeFn = Callable[[DataFrame, dict], DataFrame]
+
+DEFAULT_PAIR_TIMEOUT = 30.0
+LIVE_RUNMODES = ("live", "dry_run")
+
+
+class ParallelPairAnalyzer:
+    """
+    Pre-analyzes every whitelisted pair on a bounded thread pool.
+
+    TA-Lib and NumPy release the GIL inside their kernels, so computing the
+    indicators of several pairs at once overlaps that work on multi-core
+    hosts. `prefetch()` is meant to be called from `bot_loop_start` and
+    `take()` from `populate_indicators`. A pair that is missing, stale or
+    failed is computed serially in `take()`, so the result is always the
+    same as a plain serial run. A running future cannot be cancelled, so a
+    pair that timed out is waited for in `take()` instead, and is not
+    submitted again while it runs: a pair is never computed twice at once.
+
+    `compute` must only depend on the OHLCV columns and must not mutate
+    shared strategy state, since it runs on worker threads.
+
+    Config (all optional, disabled by default):
+
+        "freqhub": {
+            "parallel_analysis": {
+                "enabled": true,
+                "workers": 4,
+                "pair_timeout": 30
+            }
+        }
+    """
+
+    def __init__(
+        self,
+        compute: ComputeFn,
+        workers: int = 0,
+        pair_timeout: float = DEFAULT_PAIR_TIMEOUT,
+        enabled: bool = True,
+    ):
+        self.compute = compute
+        self.workers = int(workers) if workers and int(workers) > 0 else min(8, os.cpu_count() or 1)
+        self.pair_timeout = float(pair_timeout)
+        # A single worker is just serial mode with extra overhead.
+        self.enabled = bool(enabled) and self.workers > 1
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._results: Dict[str, Tuple[Any, int, DataFrame]] = {}
+        # Timed-out pairs whose computation is still running
+        self._pending: Dict[str, Tuple[Any, int, Future]] = {}
+        self._last_seen: Dict[str, Any] = {}
+        self.stats = {
+            "loops": 0,
+            "pairs": 0,
+            "timeouts": 0,
+            "errors": 0,
+            "hits": 0,
+            "misses": 0,
+            "wall_seconds": 0.0,
+            "serial_seconds": 0.0,
+        }
+
+    @classmethod
+    def from_config(cls, config: dict, compute: ComputeFn) -> "ParallelPairAnalyzer":
+        """
+        Build an analyzer from the `freqhub.parallel_analysis` config section.
+        Always returns a serial analyzer outside of live/dry-run.
+        """
+        settings = config.get("freqhub", {}).get("parallel_analysis", {})
+        runmode = config.get("runmode")
+        runmode = getattr(runmode, "value", runmode)
+
+        return cls(
+            compute,
+            workers=settings.get("workers", 0),
+            pair_timeout=settings.get("pair_timeout", DEFAULT_PAIR_TIMEOUT),
+            enabled=settings.get("enabled", False) and runmode in LIVE_RUNMODES,
+        )
+
+    @property
+    def saved_seconds(self) -> float:
+        return self.stats["serial_seconds"] - self.stats["wall_seconds"]
+
+    def _timed_compute(self, dataframe: DataFrame, metadata: dict) -> Tuple[DataFrame, float]:
+        started = time.perf_counter()
+        result = self.compute(dataframe, metadata)
+        return result, time.perf_counter() - started
+
+    def prefetch(self, strategy) -> None:
+        """
+        Analyze all whitelisted pairs with a new candle in parallel.
+        Waits at most `pair_timeout` seconds for each pair's result.
+        """
+        if not self.enabled:
+            return
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="freqhub-analyze")
+            atexit.register(self.shutdown)
+
+        self._results.clear()
+        candle_type = strategy.config.get("candle_type_def")
+        only_new = getattr(strategy, "process_only_new_candles", True)
+
+        started = time.perf_counter()
+        jobs = {}
+        for pair in strategy.dp.current_whitelist():
+            pending = self._pending.get(pair)
+            if pending is not None:
+                if not pending[2].done():
+                    continue
+                del self._pending[pair]
+            if candle_type is not None:
+                dataframe = strategy.dp.ohlcv(pair, strategy.timeframe, candle_type=candle_type)
+            else:
+                dataframe = strategy.dp.ohlcv(pair, strategy.timeframe)
+            if not isinstance(dataframe, DataFrame) or dataframe.empty:
+                continue
+
+            last_date = dataframe["date"].iloc[-1]
+            if only_new and self._last_seen.get(pair) == last_date:
+                # Freqtrade skips analysis for already analyzed candles.
+                continue
+
+            future = self._pool.submit(self._timed_compute, dataframe, {"pair": pair})
+            jobs[pair] = (last_date, len(dataframe), future)
+
+        if not jobs:
+            return
+
+        serial_seconds = 0.0
+        for pair, (last_date, length, future) in jobs.items():
+            try:
+                result, elapsed = future.result(timeout=self.pair_timeout)
+            except FuturesTimeoutError:
+                self._pending[pair] = (last_date, length, future)
+                self.stats["timeouts"] += 1
+                logger.warning(
+                    "Parallel analysis of %s exceeded %.1fs, waiting for it in populate_indicators.",
+                    pair,
+                    self.pair_timeout,
+                )
+                continue
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning("Parallel analysis of %s failed, falling back to serial: %s", pair, e)
+                continue
+
+            serial_seconds += elapsed
+            self._results[pair] = (last_date, length, result)
+
+        wall_seconds = time.perf_counter() - started
+        self.stats["loops"] += 1
+        self.stats["pairs"] += len(jobs)
+        self.stats["wall_seconds"] += wall_seconds
+        self.stats["serial_seconds"] += serial_seconds
+
+        logger.info(
+            "Parallel analysis: %d pairs on %d workers in %.3fs (serial %.3fs, saved %.3fs, total saved %.3fs)",
+            len(jobs),
+            self.workers,
+            wall_seconds,
+            serial_seconds,
+            serial_seconds - wall_seconds,
+            self.saved_seconds,
+        )
+
+    def take(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        """
+        Return the prefetched result for this pair if it matches the given
+        candles, otherwise compute it serially (after a timed-out
+        computation of the pair has finished).
+        """
+        pair = metadata.get("pair")
+        entry = self._results.pop(pair, None)
+        pending = self._pending.pop(pair, None)
+        if pending is not None:
+            last_date, length, future = pending
+            try:
+                entry = (last_date, length, future.result()[0])
+            except Exception as e:
+                logger.warning("Parallel analysis of %s failed, falling back to serial: %s", pair, e)
+        if not dataframe.empty:
+            self._last_seen[pair] = dataframe["date"].iloc[-1]
+
+        if entry is not None:
+            last_date, length, result = entry
+            if length == len(dataframe) and last_date == dataframe["date"].iloc[-1]:
+                self.stats["hits"] += 1
+                return result
+
+        if self.enabled:
+            self.stats["misses"] += 1
+        return self.compute(dataframe, metadata)
+
+    def shutdown(self) -> None:
+        """
+        Stop the pool at exit (registered with atexit when it is created).
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,116 @@
+from bisect import bisect_right
+from typing import Callable, Dict, List, Optional, Tuple
+
+from freqtrade.strategy.hyper import detect_all_parameters
+from freqtrade.strategy.parameters import BaseParameter
+
+
+class RoiTable:
+    """
+    Minimal ROI table compiled into sorted arrays for bisect lookup.
+
+    `entry(trade_dur)` returns the same (minutes, roi) as Freqtrade's
+    `min_roi_reached_entry` without scanning the table. `table` has int
+    keys (Freqtrade's normalized form), `config` the string keys the
+    config schema expects.
+    """
+
+    __slots__ = ("minutes", "ratios", "table", "config")
+
+    def __init__(self, table: dict):
+        items = sorted((int(minutes), float(ratio)) for minutes, ratio in table.items())
+        self.minutes: Tuple[int, ...] = tuple(minutes for minutes, _ in items)
+        self.ratios: Tuple[float, ...] = tuple(ratio for _, ratio in items)
+        self.table: Dict[int, float] = dict(items)
+        self.config: Dict[str, float] = {str(minutes): ratio for minutes, ratio in items}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.table})"
+
+    def entry(self, trade_dur: int) -> Tuple[Optional[int], Optional[float]]:
+        index = bisect_right(self.minutes, trade_dur)
+        if index == 0:
+            return None, None
+        return self.minutes[index - 1], self.ratios[index - 1]
+
+
+def _strategy_parameters(strategy) -> List[Tuple[str, BaseParameter]]:
+    # Freqtrade fills _ft_hyper_params in ft_load_hyper_params; before that
+    # (e.g. while the strategy resolver normalizes attributes) detect them on
+    # the class, so properties are not evaluated recursively.
+    spaces = getattr(strategy, "_ft_hyper_params", None) or detect_all_parameters(type(strategy))
+    return [(name, param) for params in spaces.values() for name, param in params.items()]
+
+
+class ParameterSnapshot:
+    """
+    Immutable, slotted copy of a strategy's hyperopt parameter values.
+
+    Every parameter is a plain attribute (`snapshot.adx_min` instead of
+    `strategy.adx_min.value`), plus the derived `roi` (RoiTable) and
+    `stoploss`. `stale` compares the current values of the parameters the
+    snapshot was taken from with its own, so a parameter file load, a
+    hyperopt epoch or any `param.value = ...` shows on the next check;
+    `capture` returns the previous snapshot unchanged while they are equal.
+    """
+
+    __slots__ = ("_values", "_parameters", "_current", "roi", "stoploss")
+
+    _types: Dict[Tuple[str, ...], type] = {}
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={value!r}" for name, value in self._values)
+        return f"{type(self).__name__}({values})"
+
+    @classmethod
+    def _type_for(cls, names: Tuple[str, ...]) -> type:
+        snapshot_type = cls._types.get(names)
+        if snapshot_type is None:
+            snapshot_type = type(cls.__name__, (cls,), {"__slots__": names})
+            cls._types[names] = snapshot_type
+        return snapshot_type
+
+    @classmethod
+    def capture(
+        cls,
+        strategy,
+        previous: Optional["ParameterSnapshot"] = None,
+        roi: Optional[Callable[["ParameterSnapshot"], dict]] = None,
+        stoploss: Optional[Callable[["ParameterSnapshot"], float]] = None,
+    ) -> "ParameterSnapshot":
+        """
+        Snapshot the current parameter values of `strategy`.
+
+        `roi` and `stoploss` derive the ROI table and stoploss from the
+        snapshot; they only run when the values changed.
+        """
+        parameters = _strategy_parameters(strategy)
+        values = tuple((name, param.value) for name, param in parameters)
+        if previous is not None and previous._values == values:
+            return previous
+
+        snapshot = object.__new__(cls._type_for(tuple(name for name, _ in values)))
+        object.__setattr__(snapshot, "_values", values)
+        object.__setattr__(snapshot, "_parameters", tuple(param for _, param in parameters))
+        object.__setattr__(snapshot, "_current", [value for _, value in values])
+        for name, value in values:
+            object.__setattr__(snapshot, name, value)
+        object.__setattr__(snapshot, "roi", RoiTable(roi(snapshot)) if roi is not None else None)
+        object.__setattr__(snapshot, "stoploss", float(stoploss(snapshot)) if stoploss is not None else None)
+        return snapshot
+
+    @property
+    def stale(self) -> bool:
+        """
+        Whether a parameter the snapshot was taken from now has another value.
+        """
+        return [param.value for param in self._parameters] != self._current
+
+    def as_dict(self) -> dict:
+        return dict(self._values)
@@ -0,0 +1,103 @@
+import logging
+import time
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+from pandas import DataFrame
+
+try:
+    import polars as pl
+except ImportError:  # Optional: only needed with freqhub.polars_pipeline enabled
+    pl = None
+
+logger = logging.getLogger(__name__)
+
+
+class PolarsPipeline:
+    """
+    Opt-in Polars evaluation of a strategy's indicators and entry/exit masks.
+
+    The strategy states its columns as expressions on a LazyFrame over the
+    dataframe's buffers (`frame`); each query runs once and only its result
+    columns are written back to the pandas dataframe Freqtrade handed in
+    (`write`, `signals`), so there are no index alignments, temporary shifted
+    Series or `.loc` assignments per condition.
+
+    Polars treats missing values differently from pandas: columns enter as
+    null where pandas has NaN, divisions that can give NaN need
+    `.fill_nan(None)` (Polars orders NaN above every number), and masks are
+    `.fill_null(False)` like pandas comparisons with NaN. Conditions should
+    only combine comparisons with `&` and `|` for that to hold.
+
+    Needs `polars` in the strategy image; without it the strategy keeps its
+    pandas code. Config:
+
+        "freqhub": {
+            "polars_pipeline": {
+                "enabled": true
+            }
+        }
+    """
+
+    def __init__(self):
+        self.stats = {"queries": 0, "seconds": 0.0}
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["PolarsPipeline"]:
+        settings = config.get("freqhub", {}).get("polars_pipeline", {})
+        if not settings.get("enabled", False):
+            return None
+        if pl is None:
+            logger.warning("freqhub.polars_pipeline is enabled but polars is not installed, using pandas")
+            return None
+        return cls()
+
+    @staticmethod
+    def frame(dataframe: DataFrame, columns: Iterable[str], **arrays: np.ndarray) -> "pl.LazyFrame":
+        """
+        LazyFrame over the numeric `columns` of `dataframe` plus `arrays`
+        (e.g. TA-Lib results). NaN becomes null; columns without NaN share
+        their buffer with pandas.
+        """
+        series = [pl.Series(column, dataframe[column].to_numpy(), nan_to_null=True) for column in columns]
+        series += [pl.Series(name, values, nan_to_null=True) for name, values in arrays.items()]
+        return pl.DataFrame(series).lazy()
+
+    def collect(self, frame: "pl.LazyFrame") -> "pl.DataFrame":
+        """
+        Run `frame` (e.g. for columns a NumPy kernel needs before the rest).
+        """
+        started = time.perf_counter()
+        result = frame.collect()
+        self.stats["queries"] += 1
+        self.stats["seconds"] += time.perf_counter() - started
+        return result
+
+    def write(self, dataframe: DataFrame, frame, columns: Iterable[str]) -> DataFrame:
+        """
+        Run `frame` (a LazyFrame, or a collected DataFrame) and write its
+        `columns` into `dataframe`, null as NaN.
+        """
+        result = self.collect(frame.lazy().select(columns))
+        for column in result.columns:
+            dataframe[column] = result[column].to_numpy()
+        return dataframe
+
+    def signals(
+        self, dataframe: DataFrame, conditions: Dict[str, "pl.Expr"], columns: Iterable[str], **arrays: np.ndarray
+    ) -> DataFrame:
+        """
+        `dataframe.loc[condition, column] = 1` for every column/condition,
+        with all masks computed in one query over `columns` and `arrays`.
+        """
+        frame = self.frame(dataframe, columns, **arrays)
+        masks = self.collect(
+            frame.select([condition.fill_null(False).alias(column) for column, condition in conditions.items()])
+        )
+        for column in conditions:
+            mask = masks[column].to_numpy()
+            if column in dataframe.columns:
+                dataframe.loc[mask, column] = 1
+            else:
+                dataframe[column] = np.where(mask, 1.0, np.nan)
+        return dataframe
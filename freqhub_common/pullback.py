@@ -0,0 +1,78 @@
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+from pandas import DataFrame
+
+from freqhub_common.rolling import RollingMoments
+
+# values -> (rolling mean, rolling std) of the window ending at each row
+Moments = Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]]
+PullbackMethod = Callable[[DataFrame, Moments, float], None]
+
+OUTLIER_THRESHOLD = 2.0
+
+
+def _outlier_flag(zscore: np.ndarray, threshold: float) -> np.ndarray:
+    flag = np.where(zscore >= threshold, 1, 0)
+    return np.where(zscore <= -threshold, -1, flag)
+
+
+def _previous(values: np.ndarray) -> np.ndarray:
+    return np.concatenate(([np.nan], values[:-1])) if len(values) else values
+
+
+def pct_outlier(df: DataFrame, moments: Moments, threshold: float) -> None:
+    """
+    Z-score of the candle's percent change against the last `periods`
+    percent changes (the window includes the candle itself).
+    """
+    df["pb_pct_change"] = df["close"].pct_change()
+    mean, std = moments(df["pb_pct_change"].to_numpy(dtype="float64"))
+    df["pb_mean"] = mean
+    df["pb_std"] = std
+    df["pb_zscore"] = (df["pb_pct_change"] - df["pb_mean"]) / df["pb_std"]
+    df["pullback_flag"] = _outlier_flag(df["pb_zscore"].to_numpy(), threshold)
+
+
+def stdev_outlier(df: DataFrame, moments: Moments, threshold: float) -> None:
+    """
+    Z-score of the candle's close-to-close change against the `periods`
+    changes before it.
+    """
+    df["pb_diff"] = df["close"].diff()
+    mean, std = moments(df["pb_diff"].to_numpy(dtype="float64"))
+    df["pb_mean"] = _previous(mean)
+    df["pb_std"] = _previous(std)
+    df["pb_zscore"] = (df["pb_diff"] - df["pb_mean"]) / df["pb_std"]
+    df["pullback_flag"] = _outlier_flag(df["pb_zscore"].to_numpy(), threshold)
+
+
+PULLBACK_METHODS: Dict[str, PullbackMethod] = {
+    "pct_outlier": pct_outlier,
+    "stdev_outlier": stdev_outlier,
+}
+
+
+def detect_pullback(
+    df: DataFrame,
+    periods: int = 30,
+    method: str = "pct_outlier",
+    moments: Optional[Moments] = None,
+    threshold: float = OUTLIER_THRESHOLD,
+) -> DataFrame:
+    """
+    Add `pullback_flag` (1 outlier up, -1 outlier down, 0 otherwise) and the
+    method's intermediate `pb_*` columns to `df`.
+
+    Every method works on `RollingMoments` over `periods` values; pass
+    `moments` (e.g. a bound `RollingMomentsIndex.moments`) to reuse the
+    moments of earlier calls, otherwise they are computed in one batch.
+    """
+    try:
+        compute = PULLBACK_METHODS[method]
+    except KeyError:
+        raise ValueError(f"Unknown pullback method {method!r}, expected one of {sorted(PULLBACK_METHODS)}") from None
+    if moments is None:
+        moments = RollingMoments(periods).batch
+    compute(df, moments, threshold)
+    return df
@@ -0,0 +1,216 @@
+import math
+import threading
+from typing import Dict, Hashable, Tuple
+
+import numpy as np
+from pandas import Series
+
+from freqhub_common.sessions import epoch_seconds
+
+# Slides between exact two-pass recomputations of the window's moments.
+DEFAULT_RESYNC = 1024
+
+
+class RollingMoments:
+    """
+    Rolling mean and standard deviation over the last `window` values.
+
+    Once the window is full, each new value replaces the oldest with
+    Welford's sliding update
+
+        mean' = mean + (new - old) / n
+        m2'   = m2 + (new - old) * ((new - mean') + (old - mean))
+
+    and every `resync` slides the moments are recomputed exactly (two-pass)
+    from the window, so rounding errors cannot build up over long histories.
+
+    `append()` takes one value in O(1); `batch()` takes many at once and runs
+    the same recurrences as two cumulative sums per `resync` block, so both
+    modes give bit-identical results and can be mixed. Like pandas'
+    `rolling(window)` a NaN restarts the window: the moments are NaN until
+    `window` values without NaN have been seen again.
+    """
+
+    def __init__(self, window: int, ddof: int = 1, resync: int = DEFAULT_RESYNC):
+        if window <= ddof:
+            raise ValueError(f"window must be larger than ddof ({window} <= {ddof})")
+        self.window = int(window)
+        self.ddof = int(ddof)
+        self.resync = max(int(resync), 1)
+        self._buffer = np.empty(self.window)
+        self.reset()
+
+    def reset(self) -> None:
+        self._position = 0  # next slot of the ring buffer
+        self._filled = 0
+        self._steps = 0  # slides since the last exact recomputation
+        self._mean = math.nan
+        self._m2 = math.nan
+
+    def _std(self, m2):
+        return np.sqrt(np.maximum(m2, 0.0) / (self.window - self.ddof))
+
+    def _exact(self, values: np.ndarray) -> Tuple[float, float]:
+        mean = values.mean()
+        return mean, float(((values - mean) ** 2).sum())
+
+    def append(self, value: float) -> Tuple[float, float]:
+        """
+        Add one value; returns (mean, std) of the window ending with it.
+        """
+        value = float(value)
+        if math.isnan(value):
+            self.reset()
+            return math.nan, math.nan
+
+        old = self._buffer[self._position]
+        self._buffer[self._position] = value
+        self._position = (self._position + 1) % self.window
+
+        if self._filled < self.window:
+            self._filled += 1
+            if self._filled < self.window:
+                return math.nan, math.nan
+            self._mean, self._m2 = self._exact(np.roll(self._buffer, -self._position))
+            self._steps = 0
+        elif self._steps + 1 == self.resync:
+            self._mean, self._m2 = self._exact(np.roll(self._buffer, -self._position))
+            self._steps = 0
+        else:
+            delta = value - old
+            mean = self._mean + delta / self.window
+            self._m2 = self._m2 + delta * ((value - mean) + (old - self._mean))
+            self._mean = mean
+            self._steps += 1
+        return float(self._mean), float(self._std(self._m2))
+
+    def batch(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Add all `values`; returns the (mean, std) arrays, one row per value.
+        """
+        values = np.asarray(values, dtype="float64")
+        means = np.full(len(values), np.nan)
+        m2s = np.full(len(values), np.nan)
+        start = 0
+        for stop in [*np.flatnonzero(np.isnan(values)), len(values)]:
+            self._extend(values[start:stop], means[start:stop], m2s[start:stop])
+            if stop < len(values):
+                self.reset()
+            start = stop + 1
+        return means, self._std(m2s)
+
+    def _extend(self, run: np.ndarray, means: np.ndarray, m2s: np.ndarray) -> None:
+        """
+        `append()` for a run of values without NaN, writing into the
+        `means` / `m2s` views.
+        """
+        row = 0
+        if self._filled < self.window:
+            # While filling, the ring buffer is written from slot 0 in order.
+            row = min(self.window - self._filled, len(run))
+            self._buffer[self._filled:self._filled + row] = run[:row]
+            self._filled += row
+            self._position = self._filled % self.window
+            if self._filled < self.window:
+                return
+            self._mean, self._m2 = self._exact(self._buffer)
+            self._steps = 0
+            means[row - 1], m2s[row - 1] = self._mean, self._m2
+        if row == len(run):
+            return
+
+        # history[k] leaves the window when run[row + k] enters it.
+        history = np.concatenate((np.roll(self._buffer, -self._position), run[row:]))
+        k = 0
+        while row < len(run):
+            if self._steps + 1 == self.resync:
+                self._mean, self._m2 = self._exact(history[k + 1:k + 1 + self.window])
+                self._steps = 0
+                means[row], m2s[row] = self._mean, self._m2
+                row += 1
+                k += 1
+                continue
+            size = min(self.resync - 1 - self._steps, len(run) - row)
+            new = run[row:row + size]
+            old = history[k:k + size]
+            delta = new - old
+            block_means = np.cumsum(np.concatenate(([self._mean], delta / self.window)))
+            block_m2s = np.cumsum(
+                np.concatenate(([self._m2], delta * ((new - block_means[1:]) + (old - block_means[:-1]))))
+            )
+            means[row:row + size] = block_means[1:]
+            m2s[row:row + size] = block_m2s[1:]
+            self._mean, self._m2 = float(block_means[-1]), float(block_m2s[-1])
+            self._steps += size
+            row += size
+            k += size
+        self._buffer[:] = history[-self.window:]
+        self._position = 0
+
+
+class _Run:
+    __slots__ = ("seconds", "mean", "std", "moments")
+
+    def __init__(self, seconds: np.ndarray, mean: np.ndarray, std: np.ndarray, moments: RollingMoments):
+        self.seconds = seconds
+        self.mean = mean
+        self.std = std
+        self.moments = moments
+
+
+class RollingMomentsIndex:
+    """
+    Rolling moments of a per-candle series, kept per key (e.g. pair) between
+    calls. When the candles move forward, the rows already known are reused
+    and only the new candles are appended to the key's `RollingMoments`.
+
+    Rows are matched by candle date only: closed candles do not change, so
+    the caller must pass the same series for the same key. Because the
+    window carries over, the first rows of a moved frame keep the moments
+    of the full history instead of restarting their warm-up.
+
+    Calls from several threads (parallel pair analysis) are serialized by a
+    lock, so a key's run is never updated by two calls at once.
+    """
+
+    def __init__(self, window: int, resync: int = DEFAULT_RESYNC):
+        self.window = int(window)
+        self.resync = resync
+        self._runs: Dict[Hashable, _Run] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def moments(self, key: Hashable, dates: Series, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        seconds = epoch_seconds(dates)
+        values = np.asarray(values, dtype="float64")
+        with self._lock:
+            return self._moments(key, seconds, values)
+
+    def _moments(self, key: Hashable, seconds: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        run = self._runs.get(key)
+        if run is not None and len(run.seconds) and len(seconds):
+            start = int(np.searchsorted(run.seconds, seconds[0]))
+            overlap = len(run.seconds) - start
+            if 0 < overlap <= len(seconds) and np.array_equal(run.seconds[start:], seconds[:overlap]):
+                mean, std = run.moments.batch(values[overlap:])
+                run = _Run(
+                    seconds,
+                    np.concatenate((run.mean[start:], mean)),
+                    np.concatenate((run.std[start:], std)),
+                    run.moments,
+                )
+                self._runs[key] = run
+                return run.mean, run.std
+
+        moments = RollingMoments(self.window, resync=self.resync)
+        mean, std = moments.batch(values)
+        self._runs[key] = _Run(seconds, mean, std, moments)
+        return mean, std
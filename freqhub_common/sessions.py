@@ -0,0 +1,123 @@
+from datetime import datetime, timezone
+from typing import Dict, Tuple
+
+import numpy as np
+from pandas import Series
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+# 1970-01-01 was a Thursday; weekdays count from Monday = 0 like datetime.weekday().
+EPOCH_WEEKDAY = 3
+
+
+def epoch_seconds(dates: Series) -> np.ndarray:
+    """
+    UTC epoch seconds of a datetime column, without materializing Timestamps.
+    """
+    return dates.values.astype("datetime64[s]").view("int64")
+
+
+def day_start(when: datetime) -> datetime:
+    """
+    Midnight UTC of the day `when` falls on (the start of its day bucket).
+    A naive `when` is taken as UTC, not as the host's local time.
+    """
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    day = int(when.timestamp() // SECONDS_PER_DAY)
+    return datetime.fromtimestamp(day * SECONDS_PER_DAY, tz=timezone.utc)
+
+
+def session_lut(*windows: Tuple[int, int]) -> np.ndarray:
+    """
+    24-entry mask of the hours inside any of the [start, end) hour windows.
+    A window with start >= end is empty, like `(hour >= start) & (hour < end)`.
+    """
+    lut = np.zeros(24, dtype=bool)
+    for start, end in windows:
+        lut[int(start):int(end)] = True
+    return lut
+
+
+class Calendar:
+    """
+    Calendar fields of a run of candle dates: hour of day, weekday and UTC
+    day ordinal (days since 1970-01-01), as small integer arrays.
+    """
+
+    __slots__ = ("seconds", "hour", "weekday", "day")
+
+    def __init__(self, seconds: np.ndarray, hour: np.ndarray, weekday: np.ndarray, day: np.ndarray):
+        self.seconds = seconds
+        self.hour = hour
+        self.weekday = weekday
+        self.day = day
+
+    @classmethod
+    def build(cls, seconds: np.ndarray) -> "Calendar":
+        day = seconds // SECONDS_PER_DAY
+        return cls(
+            seconds,
+            ((seconds - day * SECONDS_PER_DAY) // SECONDS_PER_HOUR).astype(np.int8),
+            ((day + EPOCH_WEEKDAY) % 7).astype(np.int8),
+            day.astype(np.int32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.seconds)
+
+    def _slice(self, start: int, stop: int) -> "Calendar":
+        return Calendar(
+            self.seconds[start:stop], self.hour[start:stop], self.weekday[start:stop], self.day[start:stop]
+        )
+
+    def align(self, seconds: np.ndarray) -> "Calendar":
+        """
+        The calendar of `seconds`, reusing the rows this one already has:
+        the live window moves forward by a candle at a time, so usually only
+        the new candles are computed.
+        """
+        if len(self) and len(seconds):
+            start = int(np.searchsorted(self.seconds, seconds[0]))
+            overlap = min(len(self) - start, len(seconds))
+            if overlap > 0 and np.array_equal(self.seconds[start:start + overlap], seconds[:overlap]):
+                known = self._slice(start, start + overlap)
+                if overlap == len(seconds):
+                    return known
+                new = Calendar.build(seconds[overlap:])
+                return Calendar(
+                    seconds,
+                    np.concatenate((known.hour, new.hour)),
+                    np.concatenate((known.weekday, new.weekday)),
+                    np.concatenate((known.day, new.day)),
+                )
+        return Calendar.build(seconds)
+
+
+class CalendarIndex:
+    """
+    Per-pair calendar of the candles a strategy analyzes, kept between
+    calls and extended with the new candles only.
+
+    Session filters become a gather from a 24-entry lookup table
+    (`session_mask`), so hyperoptable session hours cost one indexing
+    operation per evaluation instead of re-parsing the date column, and
+    `Calendar.day` buckets candles by UTC day.
+    """
+
+    def __init__(self):
+        self._calendars: Dict[str, Calendar] = {}
+
+    def calendar(self, pair: str, dates: Series) -> Calendar:
+        seconds = epoch_seconds(dates)
+        cached = self._calendars.get(pair)
+        calendar = cached.align(seconds) if cached is not None else Calendar.build(seconds)
+        self._calendars[pair] = calendar
+        return calendar
+
+    def session_mask(self, pair: str, dates: Series, *windows: Tuple[int, int]) -> np.ndarray:
+        """
+        True for the candles whose UTC hour is inside any of the
+        [start, end) hour windows.
+        """
+        return session_lut(*windows)[self.calendar(pair, dates).hour]
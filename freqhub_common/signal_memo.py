@@ -0,0 +1,283 @@
+import ast
+import hashlib
+import inspect
+import logging
+import textwrap
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+logger = logging.getLogger(__name__)
+
+BACKTEST_RUNMODES = ("backtest", "hyperopt", "edge", "plot", "other")
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_SIZE_MB = 256
+# Read set of a function that called a snapshot method (e.g. as_dict()).
+ALL_PARAMETERS = ("*",)
+
+SignalFn = Callable[[DataFrame, dict, object], DataFrame]
+
+
+class _Store:
+    """
+    Entries and stats of one memo in this process. Hyperopt pickles the
+    strategy for every job, so workers find their store again by token and
+    keep the entries of the epochs they already ran.
+    """
+
+    def __init__(self):
+        self.entries: "OrderedDict[tuple, Dict[str, np.ndarray]]" = OrderedDict()
+        self.read_sets: Dict[str, List[Tuple[str, ...]]] = {}
+        self.bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+_STORES: Dict[str, _Store] = {}
+
+
+class _TracedParameters:
+    """
+    Records which attributes of a ParameterSnapshot a signal function reads.
+    """
+
+    __slots__ = ("_params", "reads")
+
+    def __init__(self, params):
+        object.__setattr__(self, "_params", params)
+        object.__setattr__(self, "reads", set())
+
+    def __getattr__(self, name):
+        value = getattr(self._params, name)
+        self.reads.add("*" if callable(value) else name)
+        return value
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self._params).__name__} is immutable")
+
+
+class _FrameAccess:
+    """
+    Columns a signal function reads and writes, from its source: every
+    `<frame>["column"]` and the column of every `<frame>.loc[..., "column"]`.
+    `resolved` is False when the frame is used any other way (passed to a
+    call, indexed with a variable, reassigned), so the caller must assume it
+    depends on, and changes, every column.
+    """
+
+    def __init__(self, function: Callable):
+        self.reads: FrozenSet[str] = frozenset()
+        self.writes: FrozenSet[str] = frozenset()
+        self.resolved = False
+        try:
+            tree = ast.parse(textwrap.dedent(inspect.getsource(function)))
+            frame = next(iter(inspect.signature(function).parameters))
+        except (OSError, TypeError, StopIteration, SyntaxError):
+            return
+
+        parents = {child: node for node in ast.walk(tree) for child in ast.iter_child_nodes(node)}
+        reads, writes = set(), set()
+        for node in ast.walk(tree):
+            if not (isinstance(node, ast.Name) and node.id == frame) or isinstance(node.ctx, ast.Param):
+                continue
+            parent = parents.get(node)
+            if isinstance(parent, ast.Return):
+                continue
+            if isinstance(parent, ast.Subscript) and parent.value is node:
+                column = parent.slice
+                if not (isinstance(column, ast.Constant) and isinstance(column.value, str)):
+                    return
+                (writes if isinstance(parent.ctx, ast.Store) else reads).add(column.value)
+                continue
+            if isinstance(parent, ast.Attribute) and parent.attr == "loc":
+                target = parents.get(parent)
+                index = target.slice if isinstance(target, ast.Subscript) else None
+                if not (isinstance(index, ast.Tuple) and len(index.elts) == 2):
+                    return
+                column = index.elts[1]
+                if not (isinstance(column, ast.Constant) and isinstance(column.value, str)):
+                    return
+                (writes if isinstance(target.ctx, ast.Store) else reads).add(column.value)
+                continue
+            return
+
+        self.reads = frozenset(reads)
+        self.writes = frozenset(writes)
+        self.resolved = True
+
+
+def _column_digest(digest, name: str, series: pd.Series) -> None:
+    digest.update(name.encode())
+    values = series.to_numpy()
+    digest.update(str(values.dtype).encode())
+    if values.dtype.kind in "biufcmM":
+        digest.update(np.ascontiguousarray(values).view(np.uint8))
+    else:
+        digest.update(pd.util.hash_array(values.astype(object)).view(np.uint8))
+
+
+class SignalMemo:
+    """
+    Bounded LRU memo of entry/exit signal columns for hyperopt.
+
+    Epochs that only change parameters a signal function does not read, or
+    that change a `DecimalParameter` to a value that rounds to the same
+    `.value`, produce the same signals. Each result is keyed by
+
+    - the parameters the function actually read, traced on the
+      `ParameterSnapshot` it receives (a function only reads more parameters
+      under other values of the ones it already read, so keys are exact),
+    - a hash of the contents of the dataframe columns it reads and writes,
+      taken from its source (all columns when the source does not name them
+      plainly), on every call: indicator columns change between epochs under
+      `analyze_per_epoch` or other indicator parameters, with the same shape,
+    - the pair.
+
+    On a hit, the columns the function writes are copied back into the
+    dataframe instead of running it. Entries are evicted least recently used
+    first beyond `max_entries` or `max_size_mb` of stored columns.
+
+    Only active in backtesting/hyperopt. Config:
+
+        "freqhub": {
+            "signal_memo": {
+                "enabled": true,
+                "max_entries": 512,
+                "max_size_mb": 256
+            }
+        }
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_size_mb: float = DEFAULT_MAX_SIZE_MB):
+        self.max_entries = max(int(max_entries), 1)
+        self.max_bytes = int(float(max_size_mb) * 1024 * 1024)
+        self._token = uuid.uuid4().hex
+        self._init_state()
+
+    def _init_state(self) -> None:
+        self._store = _STORES.setdefault(self._token, _Store())
+        self._access: Dict[str, _FrameAccess] = {}
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self._store.stats
+
+    @property
+    def bytes(self) -> int:
+        return self._store.bytes
+
+    def __len__(self) -> int:
+        return len(self._store.entries)
+
+    def __getstate__(self) -> dict:
+        return {"max_entries": self.max_entries, "max_bytes": self.max_bytes, "_token": self._token}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._init_state()
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["SignalMemo"]:
+        settings = config.get("freqhub", {}).get("signal_memo", {})
+        runmode = config.get("runmode")
+        runmode = getattr(runmode, "value", runmode)
+        if not settings.get("enabled", False) or runmode not in BACKTEST_RUNMODES:
+            return None
+        return cls(
+            max_entries=settings.get("max_entries", DEFAULT_MAX_ENTRIES),
+            max_size_mb=settings.get("max_size_mb", DEFAULT_MAX_SIZE_MB),
+        )
+
+    @staticmethod
+    def _entry_bytes(columns: Dict[str, np.ndarray]) -> int:
+        return sum(values.nbytes for values in columns.values())
+
+    def _frame_access(self, function: Callable) -> _FrameAccess:
+        name = function.__qualname__
+        access = self._access.get(name)
+        if access is None:
+            access = self._access[name] = _FrameAccess(function)
+            if not access.resolved:
+                logger.info("Signal memo for %s hashes every column (frame use not resolved from source)", name)
+        return access
+
+    def _fingerprint(self, dataframe: DataFrame, access: _FrameAccess) -> bytes:
+        digest = hashlib.sha256()
+        digest.update(str(len(dataframe)).encode())
+        if access.resolved:
+            columns = sorted(access.reads | access.writes)
+        else:
+            columns = [str(column) for column in dataframe.columns]
+        for column in columns:
+            if column in dataframe.columns:
+                _column_digest(digest, column, dataframe[column])
+            else:
+                digest.update(f"{column}:missing".encode())
+        return digest.digest()
+
+    @staticmethod
+    def _values(params, names: Tuple[str, ...]) -> tuple:
+        if names == ALL_PARAMETERS:
+            return tuple(params.as_dict().items())
+        return tuple(getattr(params, name) for name in names)
+
+    def compute(self, function: SignalFn, dataframe: DataFrame, metadata: dict, params) -> DataFrame:
+        """
+        Return `function(dataframe, metadata, params)`, from the memo when
+        possible. `params` is the strategy's ParameterSnapshot.
+        """
+        name = function.__qualname__
+        access = self._frame_access(function)
+        fingerprint = self._fingerprint(dataframe, access)
+        pair = metadata.get("pair")
+
+        store = self._store
+        for names in store.read_sets.get(name, ()):
+            key = (name, pair, names, self._values(params, names), fingerprint)
+            columns = store.entries.get(key)
+            if columns is not None:
+                store.entries.move_to_end(key)
+                self.stats["hits"] += 1
+                if not access.resolved:
+                    return DataFrame({column: values.copy() for column, values in columns.items()},
+                                     index=dataframe.index)
+                for column, values in columns.items():
+                    dataframe[column] = values.copy()
+                return dataframe
+
+        self.stats["misses"] += 1
+        before = set(dataframe.columns)
+        traced = _TracedParameters(params)
+        result = function(dataframe, metadata, traced)
+
+        names = ALL_PARAMETERS if "*" in traced.reads else tuple(sorted(traced.reads))
+        read_sets = store.read_sets.setdefault(name, [])
+        if names not in read_sets:
+            read_sets.append(names)
+        if access.resolved:
+            stored = [c for c in result.columns if c in access.writes or c not in before]
+        else:
+            stored = list(result.columns)
+        columns = {column: result[column].to_numpy().copy() for column in stored}
+        self._put((name, pair, names, self._values(params, names), fingerprint), columns)
+        return result
+
+    def _put(self, key: tuple, columns: Dict[str, np.ndarray]) -> None:
+        store = self._store
+        size = self._entry_bytes(columns)
+        if size > self.max_bytes:
+            return
+        store.entries[key] = columns
+        store.bytes += size
+        while len(store.entries) > self.max_entries or store.bytes > self.max_bytes:
+            _, evicted = store.entries.popitem(last=False)
+            store.bytes -= self._entry_bytes(evicted)
+            store.stats["evictions"] += 1
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
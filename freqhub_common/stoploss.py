@@ -0,0 +1,116 @@
+import functools
+import logging
+
+import numpy as np
+
+from freqtrade.strategy import stoploss_from_open
+
+logger = logging.getLogger(__name__)
+
+# Returned when the stop would sit at or above the current profit
+# ("only for hyperopt invalid return" in the original strategy).
+INVALID_STOPLOSS = -0.99
+# Stops and profits the vectorized stoploss_from_open is compared with
+# Freqtrade's on (see batch_matches_freqtrade)
+CHECK_STOPS = (-0.99, -0.35, -0.1, -0.02, -0.0, 0.0, 0.01, 0.05, 0.3, 1.0)
+CHECK_PROFITS = (-1.0, -0.999, -0.5, -0.1, -0.01, -0.0, 0.0, 0.005, 0.02, 0.1, 0.5, 3.0)
+
+
+def _stoploss_from_open_batch(open_relative_stop: np.ndarray, current_profit: np.ndarray) -> np.ndarray:
+    """
+    Freqtrade's `stoploss_from_open` (leverage 1.0, long) over arrays, with
+    the same floating point operations in the same order. Only used while
+    `batch_matches_freqtrade()`.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stoploss = 1 - ((1 + open_relative_stop / 1.0) / (1 + current_profit / 1.0))
+        stoploss = stoploss * 1.0
+        stoploss = np.where(0.0 > stoploss, 0.0, stoploss)
+        return np.where(current_profit / 1.0 == -1, 1.0, stoploss)
+
+
+@functools.lru_cache(maxsize=None)
+def batch_matches_freqtrade() -> bool:
+    """
+    Whether the vectorized copy of `stoploss_from_open` returns exactly what
+    the installed Freqtrade's function returns on `CHECK_STOPS` x
+    `CHECK_PROFITS`. Checked once per process; if it does not (Freqtrade
+    changed the formula), `PiecewiseTrailingStop.batch` calls Freqtrade's
+    function per profit instead.
+    """
+    stops, profits = (grid.ravel() for grid in np.meshgrid(np.array(CHECK_STOPS), np.array(CHECK_PROFITS)))
+    expected = np.array([stoploss_from_open(stop, profit) for stop, profit in zip(stops.tolist(), profits.tolist())],
+                        dtype=np.float64)
+    matches = np.array_equal(expected, _stoploss_from_open_batch(stops, profits), equal_nan=True)
+    if not matches:
+        logger.warning("Vectorized stoploss_from_open differs from Freqtrade's; "
+                       "PiecewiseTrailingStop.batch calls it per profit instead")
+    return matches
+
+
+class PiecewiseTrailingStop:
+    """
+    Custom trailing stoploss curve with a hard stop and two profit levels.
+    Credit: @github/perkmeister (awesome-freqtrade)
+
+    - profit <= PF_1: stop at HSL (relative to open)
+    - PF_1 < profit <= PF_2: stop interpolates linearly between SL_1 and SL_2
+    - profit > PF_2: stop rises linearly with profit from SL_2
+
+    Calling the curve evaluates one profit (what `custom_stoploss`
+    returns) and calls Freqtrade's `stoploss_from_open`. `batch` evaluates
+    an array of profits (for example every open trade on every candle) with
+    NumPy, with the same floating point operations in the same order, so
+    both agree exactly. Its copy of `stoploss_from_open` is only used while
+    `batch_matches_freqtrade()`; otherwise it calls Freqtrade's function.
+    """
+
+    __slots__ = ("hsl", "pf_1", "sl_1", "pf_2", "sl_2")
+
+    def __init__(self, hsl: float, pf_1: float, sl_1: float, pf_2: float, sl_2: float):
+        self.hsl = hsl
+        self.pf_1 = pf_1
+        self.sl_1 = sl_1
+        self.pf_2 = pf_2
+        self.sl_2 = sl_2
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(hsl={self.hsl}, pf_1={self.pf_1}, sl_1={self.sl_1}, "
+            f"pf_2={self.pf_2}, sl_2={self.sl_2})"
+        )
+
+    def __call__(self, current_profit: float) -> float:
+        if current_profit > self.pf_2:
+            sl_profit = self.sl_2 + (current_profit - self.pf_2)
+        elif current_profit > self.pf_1:
+            sl_profit = self.sl_1 + ((current_profit - self.pf_1) * (self.sl_2 - self.sl_1) / (self.pf_2 - self.pf_1))
+        else:
+            sl_profit = self.hsl
+
+        if sl_profit >= current_profit:
+            return INVALID_STOPLOSS
+        return stoploss_from_open(sl_profit, current_profit)
+
+    def batch(self, current_profit) -> np.ndarray:
+        """
+        Stoploss for every profit in `current_profit` (any shape).
+        """
+        profit = np.asarray(current_profit, dtype=np.float64)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sl_profit = np.where(
+                profit > self.pf_2,
+                self.sl_2 + (profit - self.pf_2),
+                np.where(
+                    profit > self.pf_1,
+                    self.sl_1 + ((profit - self.pf_1) * (self.sl_2 - self.sl_1) / (self.pf_2 - self.pf_1)),
+                    self.hsl,
+                ),
+            )
+
+        if batch_matches_freqtrade():
+            stoploss = _stoploss_from_open_batch(sl_profit, profit)
+        else:
+            stoploss = np.vectorize(stoploss_from_open, otypes=[np.float64])(sl_profit, profit)
+        return np.where(sl_profit >= profit, INVALID_STOPLOSS, stoploss)
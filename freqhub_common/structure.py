@@ -0,0 +1,99 @@
+from typing import Dict
+
+import numpy as np
+
+from freqhub_common.kernels import bounded_ffill
+
+# Output columns, in the order FailureToReturn used to add them. Flags are int8.
+FTR_COLUMNS = (
+    "impulse",
+    "impulse_short",
+    "impulse_level",
+    "impulse_level_short",
+    "recent_impulse",
+    "recent_impulse_short",
+    "pullback_zone",
+    "pullback_zone_short",
+    "pullback_recent",
+    "pullback_recent_short",
+    "reengulf",
+    "reengulf_short",
+)
+
+
+def _last_true(flags: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """
+    Per row of `flags`, the index of the latest True at or before each
+    column; -1 before the first one.
+    """
+    return np.maximum.accumulate(np.where(flags, rows, -1), axis=1)
+
+
+def ftr_structure(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    atr: np.ndarray,
+    swing_high: np.ndarray,
+    swing_low: np.ndarray,
+    pullback_window: int,
+    impulse_atr: float,
+    impulse_body_atr: float,
+    pullback_atr: float,
+    fail_atr: float,
+    reengulf_atr: float,
+) -> Dict[str, np.ndarray]:
+    """
+    Failure-to-return structure (impulse, impulse level, pullback zone,
+    recent pullback, re-engulf) for the long and the short side at once.
+
+    The short side is the long side on mirrored prices (-high as the low,
+    -close as the close, -swing_low as the swing high), so both sides are
+    stacked into (2, n) arrays and every step runs once for both. Negation
+    is exact in floating point, so `-(a - b) == -a + b` and the mirrored
+    comparisons give the same flags as the original short-side expressions.
+
+    The level's `ffill(limit=pullback_window)` is `kernels.bounded_ffill`
+    per side (a recent impulse is a filled level: the swing is never NaN
+    on an impulse), and the rolling maximum of the shifted pullback zone is
+    a countdown from the last zone index before each candle (the running
+    maximum of zone indices). As in the rolling version, the first
+    `pullback_window` candles are never a recent pullback.
+    """
+    n = len(close)
+    rows = np.arange(n, dtype=np.int32)
+    window = int(pullback_window)
+
+    low_side = np.stack((low, -high))
+    close_side = np.stack((close, -close))
+    swing = np.stack((swing_high, -swing_low))
+
+    with np.errstate(invalid="ignore"):
+        impulse = (close_side > swing + atr * impulse_atr) & (np.abs(close - open_) > atr * impulse_body_atr)
+
+        level = np.stack([bounded_ffill(np.where(impulse[side], swing[side], np.nan), window) for side in (0, 1)])
+        recent_impulse = ~np.isnan(level)
+
+        pullback_zone = (
+            recent_impulse & (low_side <= level + atr * pullback_atr) & (low_side >= level - atr * fail_atr)
+        )
+        reengulf = recent_impulse & (close_side > level + atr * reengulf_atr)
+
+    last_zone = np.empty(impulse.shape, dtype=rows.dtype)
+    last_zone[:, :1] = -1
+    last_zone[:, 1:] = _last_true(pullback_zone, rows)[:, :-1]
+    pullback_recent = (rows >= window) & (last_zone >= rows - window)
+
+    flags = {
+        "impulse": impulse,
+        "recent_impulse": recent_impulse,
+        "pullback_zone": pullback_zone,
+        "pullback_recent": pullback_recent,
+        "reengulf": reengulf,
+    }
+    columns = {"impulse_level": level[0], "impulse_level_short": -level[1]}
+    for name, sides in flags.items():
+        sides = sides.astype(np.int8)
+        columns[name], columns[f"{name}_short"] = sides[0], sides[1]
+    return {name: columns[name] for name in FTR_COLUMNS}
@@ -1,10 +1,16 @@
 import logging
+from datetime import datetime
+from typing import Optional
 
 import freqtrade.vendor.qtpylib.indicators as qtpylib
 from pandas import DataFrame
 
 from freqtrade.strategy import IntParameter, IStrategy
 
+from freqhub_common.heartbeat import Heartbeat
+from freqhub_common.memory_profile import MemoryProfiler
+from freqhub_common.notifications import NotificationQueue
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,10 +32,21 @@ class BinHV45Strategy(IStrategy):
         "buy_tail": 25,
     }
 
+    # Strategy messages (see freqhub.notifications in config)
+    _notifier: Optional[NotificationQueue] = None
+    # Candle-processing heartbeat (see freqhub.heartbeat in config)
+    _heartbeat: Optional[Heartbeat] = None
+    # Memory profile of populate_indicators (see freqhub.memory_profile in config)
+    _memory_profiler: Optional[MemoryProfiler] = None
+
     def bot_start(self, **kwargs) -> None:
         """
         Runs when the bot starts. Sends a startup message using configured messaging.
         """
+        self._notifier = NotificationQueue.from_config(self.config, self.dp)
+        self._heartbeat = Heartbeat.from_config(self.config, self.timeframe)
+        self._memory_profiler = MemoryProfiler.from_config(self.config, self)
+
         try:
             exchange = (
                 self.dp.exchange.name
@@ -57,10 +74,16 @@ class BinHV45Strategy(IStrategy):
             )
 
             if hasattr(self.dp, "send_msg"):
-                self.dp.send_msg(startup_msg)
+                self._notifier.notify(startup_msg)
         except Exception as e:
             logger.warning("Could not send startup message: %s", e)
 
+    def bot_loop_start(self, current_time: datetime, **kwargs) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.beat(self)
+        if self._notifier is not None:
+            self._notifier.flush()
+
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         bollinger = qtpylib.bollinger_bands(dataframe["close"], window=40, stds=2)
 
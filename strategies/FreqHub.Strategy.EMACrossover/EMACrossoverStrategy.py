@@ -1,10 +1,16 @@
 import logging
+from datetime import datetime
+from typing import Optional
 
 import talib.abstract as ta
 from pandas import DataFrame
 
 from freqtrade.strategy import DecimalParameter, IntParameter, IStrategy, merge_informative_pair
 
+from freqhub_common.heartbeat import Heartbeat
+from freqhub_common.informative import InformativeProvider
+from freqhub_common.memory_profile import MemoryProfiler
+
 logger = logging.getLogger(__name__)
 
 
@@ -45,9 +51,27 @@ class EMACrossoverStrategy(IStrategy):
 
     informative_timeframe = "1h"
 
+    # Informative candles (see freqhub.resample_informative in config)
+    _informative: Optional[InformativeProvider] = None
+    # Candle-processing heartbeat (see freqhub.heartbeat in config)
+    _heartbeat: Optional[Heartbeat] = None
+    # Memory profile of populate_indicators (see freqhub.memory_profile in config)
+    _memory_profiler: Optional[MemoryProfiler] = None
+
+    def bot_start(self, **kwargs) -> None:
+        self._informative = InformativeProvider.from_config(
+            self.config, self.timeframe, self.informative_timeframe
+        )
+        self._heartbeat = Heartbeat.from_config(self.config, self.timeframe)
+        self._memory_profiler = MemoryProfiler.from_config(self.config, self)
+
+    def bot_loop_start(self, current_time: datetime, **kwargs) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.beat(self)
+
     def informative_pairs(self):
         pairs = self.dp.current_whitelist()
-        return [(pair, self.informative_timeframe) for pair in pairs]
+        return self._informative.informative_pairs(pairs)
 
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         dataframe["ema_fast"] = ta.EMA(dataframe, timeperiod=self.buy_ema_fast.value)
@@ -64,8 +88,8 @@ class EMACrossoverStrategy(IStrategy):
         dataframe["volume_sma"] = dataframe["volume"].rolling(window=20).mean()
         dataframe["atr"] = ta.ATR(dataframe, timeperiod=14)
 
-        informative = self.dp.get_pair_dataframe(
-            pair=metadata["pair"], timeframe=self.informative_timeframe
+        informative = self._informative.get_pair_dataframe(
+            self.dp, metadata["pair"], dataframe
         )
         informative["ema_fast"] = ta.EMA(informative, timeperiod=9)
         informative["ema_slow"] = ta.EMA(informative, timeperiod=50)
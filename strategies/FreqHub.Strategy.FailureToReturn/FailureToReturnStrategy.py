@@ -2,13 +2,21 @@ import logging
 from datetime import datetime, timezone
 from typing import Optional
 
-import pandas as pd
+import numpy as np
 import talib.abstract as ta
 from pandas import DataFrame
 
 from freqtrade.persistence import Trade
 from freqtrade.strategy import DecimalParameter, IntParameter, IStrategy
 
+from freqhub_common.heartbeat import Heartbeat
+from freqhub_common.indicator_cache import IndicatorCache
+from freqhub_common.memory_profile import MemoryProfiler
+from freqhub_common.parallel import ParallelPairAnalyzer
+from freqhub_common.polars_pipeline import PolarsPipeline
+from freqhub_common.sessions import CalendarIndex, day_start
+from freqhub_common.structure import ftr_structure
+
 try:
     from freqtrade.strategy import BoolParameter
 except ImportError:  # Backward compatibility for older Freqtrade versions
@@ -18,6 +26,11 @@ except ImportError:  # Backward compatibility for older Freqtrade versions
         def __init__(self, default: bool = False, **kwargs):
             super().__init__([True, False], default=default, **kwargs)
 
+try:
+    import polars as pl
+except ImportError:  # Optional: only needed with freqhub.polars_pipeline enabled
+    pl = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -70,7 +83,43 @@ class FailureToReturnStrategy(IStrategy):
         "720": 0.01
     }
 
+    # Optional parallel pair analysis (see freqhub.parallel_analysis in config)
+    _pair_analyzer: Optional[ParallelPairAnalyzer] = None
+    # Optional on-disk indicator cache for backtests (see freqhub.indicator_cache in config)
+    _indicator_cache: Optional[IndicatorCache] = None
+    # Candle-processing heartbeat (see freqhub.heartbeat in config)
+    _heartbeat: Optional[Heartbeat] = None
+    # Memory profile of populate_indicators (see freqhub.memory_profile in config)
+    _memory_profiler: Optional[MemoryProfiler] = None
+    # Per-pair hour/weekday/day index of the analyzed candles (see _is_liquid_session)
+    _calendar: Optional[CalendarIndex] = None
+    # Optional Polars indicators and signals (see freqhub.polars_pipeline in config)
+    _polars: Optional[PolarsPipeline] = None
+
+    def bot_start(self, **kwargs) -> None:
+        self._pair_analyzer = ParallelPairAnalyzer.from_config(self.config, self._compute_indicators)
+        self._indicator_cache = IndicatorCache.from_config(self.config)
+        self._heartbeat = Heartbeat.from_config(self.config, self.timeframe)
+        self._memory_profiler = MemoryProfiler.from_config(self.config, self)
+        self._polars = PolarsPipeline.from_config(self.config)
+
+    def bot_loop_start(self, current_time: datetime, **kwargs) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.beat(self)
+        if self._pair_analyzer is not None:
+            self._pair_analyzer.prefetch(self)
+
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        if self._indicator_cache is not None:
+            return self._indicator_cache.compute(self, self._compute_indicators, dataframe, metadata)
+        if self._pair_analyzer is not None:
+            return self._pair_analyzer.take(dataframe, metadata)
+        return self._compute_indicators(dataframe, metadata)
+
+    def _compute_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        if self._polars is not None:
+            return self._polars_indicators(dataframe, metadata)
+
         lookback = int(self.sr_lookback.value)
         pullback_window = int(self.pullback_lookback.value)
 
@@ -81,81 +130,88 @@ class FailureToReturnStrategy(IStrategy):
 
         dataframe["swing_high"] = dataframe["high"].rolling(lookback).max().shift(1)
         dataframe["swing_low"] = dataframe["low"].rolling(lookback).min().shift(1)
-        body = (dataframe["close"] - dataframe["open"]).abs()
 
-        dataframe["impulse"] = (
-            (dataframe["close"] > dataframe["swing_high"] + dataframe["atr"] * self.impulse_atr.value) &
-            (body > dataframe["atr"] * self.impulse_body_atr.value)
-        )
-        dataframe["impulse_short"] = (
-            (dataframe["close"] < dataframe["swing_low"] - dataframe["atr"] * self.impulse_atr.value) &
-            (body > dataframe["atr"] * self.impulse_body_atr.value)
+        # Both sides' structure in one pass (checked against the rolling/ffill
+        # version by `python -m tools.check_structure`)
+        structure = ftr_structure(
+            dataframe["open"].to_numpy(dtype="float64"),
+            dataframe["high"].to_numpy(dtype="float64"),
+            dataframe["low"].to_numpy(dtype="float64"),
+            dataframe["close"].to_numpy(dtype="float64"),
+            dataframe["atr"].to_numpy(dtype="float64"),
+            dataframe["swing_high"].to_numpy(dtype="float64"),
+            dataframe["swing_low"].to_numpy(dtype="float64"),
+            pullback_window,
+            self.impulse_atr.value,
+            self.impulse_body_atr.value,
+            self.pullback_atr.value,
+            self.fail_atr.value,
+            self.reengulf_atr.value,
         )
+        for column, values in structure.items():
+            dataframe[column] = values.view(bool) if values.dtype == np.int8 else values
 
-        dataframe["impulse_level"] = dataframe["swing_high"].where(dataframe["impulse"]).ffill(
-            limit=pullback_window
-        )
-        dataframe["impulse_level_short"] = dataframe["swing_low"].where(dataframe["impulse_short"]).ffill(
-            limit=pullback_window
-        )
-        dataframe["recent_impulse"] = dataframe["impulse_level"].notna()
-        dataframe["recent_impulse_short"] = dataframe["impulse_level_short"].notna()
+        dataframe["atr_ratio"] = dataframe["atr"] / dataframe["close"]
 
-        dataframe["pullback_zone"] = (
-            dataframe["recent_impulse"] &
-            (dataframe["low"] <= dataframe["impulse_level"] + dataframe["atr"] * self.pullback_atr.value) &
-            (dataframe["low"] >= dataframe["impulse_level"] - dataframe["atr"] * self.fail_atr.value)
-        )
-        dataframe["pullback_zone_short"] = (
-            dataframe["recent_impulse_short"] &
-            (dataframe["high"] >= dataframe["impulse_level_short"] - dataframe["atr"] * self.pullback_atr.value) &
-            (dataframe["high"] <= dataframe["impulse_level_short"] + dataframe["atr"] * self.fail_atr.value)
-        )
+        return dataframe
 
-        dataframe["pullback_recent"] = (
-            dataframe["pullback_zone"]
-            .shift(1)
-            .rolling(window=pullback_window)
-            .max()
-            .fillna(0)
-            .astype(bool)
-        )
-        dataframe["pullback_recent_short"] = (
-            dataframe["pullback_zone_short"]
-            .shift(1)
-            .rolling(window=pullback_window)
-            .max()
-            .fillna(0)
-            .astype(bool)
-        )
+    def _polars_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        """
+        _compute_indicators on the Polars pipeline (see freqhub.polars_pipeline):
+        the rolling columns in one query, TA-Lib and the structure kernel on
+        NumPy as before. Compare with `python -m tools.check_polars`.
+        """
+        lookback = int(self.sr_lookback.value)
 
-        dataframe["reengulf"] = (
-            dataframe["recent_impulse"] &
-            (dataframe["close"] > dataframe["impulse_level"] + dataframe["atr"] * self.reengulf_atr.value)
+        dataframe["ema_fast"] = ta.EMA(dataframe, timeperiod=50)
+        dataframe["ema_slow"] = ta.EMA(dataframe, timeperiod=200)
+        dataframe["atr"] = ta.ATR(dataframe, timeperiod=14)
+
+        frame = self._polars.frame(dataframe, ["high", "low", "close", "volume", "atr"]).with_columns(
+            volume_sma=pl.col("volume").rolling_mean(20),
+            swing_high=pl.col("high").rolling_max(lookback).shift(1),
+            swing_low=pl.col("low").rolling_min(lookback).shift(1),
         )
-        dataframe["reengulf_short"] = (
-            dataframe["recent_impulse_short"] &
-            (dataframe["close"] < dataframe["impulse_level_short"] - dataframe["atr"] * self.reengulf_atr.value)
+        self._polars.write(dataframe, frame, ["volume_sma", "swing_high", "swing_low"])
+
+        structure = ftr_structure(
+            dataframe["open"].to_numpy(dtype="float64"),
+            dataframe["high"].to_numpy(dtype="float64"),
+            dataframe["low"].to_numpy(dtype="float64"),
+            dataframe["close"].to_numpy(dtype="float64"),
+            dataframe["atr"].to_numpy(dtype="float64"),
+            dataframe["swing_high"].to_numpy(dtype="float64"),
+            dataframe["swing_low"].to_numpy(dtype="float64"),
+            int(self.pullback_lookback.value),
+            self.impulse_atr.value,
+            self.impulse_body_atr.value,
+            self.pullback_atr.value,
+            self.fail_atr.value,
+            self.reengulf_atr.value,
         )
+        for column, values in structure.items():
+            dataframe[column] = values.view(bool) if values.dtype == np.int8 else values
 
         dataframe["atr_ratio"] = dataframe["atr"] / dataframe["close"]
-        dataframe["liquid_session"] = self._is_liquid_session(dataframe)
 
         return dataframe
 
-    def _is_liquid_session(self, dataframe: DataFrame) -> pd.Series:
-        dates = pd.to_datetime(dataframe["date"], utc=True, errors="coerce")
-        hours = dates.dt.hour
-
-        london = (hours >= int(self.london_start_hour.value)) & (hours < int(self.london_end_hour.value))
-        new_york = (hours >= int(self.ny_start_hour.value)) & (hours < int(self.ny_end_hour.value))
-
-        return (london | new_york).fillna(False)
+    def _is_liquid_session(self, dataframe: DataFrame, metadata: dict) -> np.ndarray:
+        # Session hours are hyperopt parameters, so the mask is built per
+        # evaluation from the pair's cached hour-of-day index.
+        if self._calendar is None:
+            self._calendar = CalendarIndex()
+        return self._calendar.session_mask(
+            metadata["pair"],
+            dataframe["date"],
+            (self.london_start_hour.value, self.london_end_hour.value),
+            (self.ny_start_hour.value, self.ny_end_hour.value),
+        )
 
     def _daily_profit_ratio(self, now: Optional[datetime] = None) -> float:
         if now is None:
             now = datetime.now(timezone.utc)
-        start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        start = day_start(now)
 
         trades = Trade.get_trades_proxy(is_open=False, close_date=start)
         profit = 0.0
@@ -166,12 +222,16 @@ class FailureToReturnStrategy(IStrategy):
         return profit
 
     def populate_entry_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        if self._polars is not None:
+            return self._polars_entry_trend(dataframe, metadata)
+
         trend_ok = (dataframe["close"] > dataframe["ema_slow"]) & (dataframe["ema_fast"] > dataframe["ema_slow"])
         trend_ok_short = (dataframe["close"] < dataframe["ema_slow"]) & (dataframe["ema_fast"] < dataframe["ema_slow"])
         volume_ok = (dataframe["volume"] > dataframe["volume_sma"] * self.volume_factor.value) & (
             dataframe["volume"] > 0
         )
         volatility_ok = dataframe["atr_ratio"] >= self.min_atr_ratio.value
+        dataframe["liquid_session"] = self._is_liquid_session(dataframe, metadata)
         session_ok = (~self.use_session_filter.value) | dataframe["liquid_session"]
 
         dataframe.loc[
@@ -222,6 +282,9 @@ class FailureToReturnStrategy(IStrategy):
         return True
 
     def populate_exit_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        if self._polars is not None:
+            return self._polars_exit_trend(dataframe)
+
         dataframe.loc[
             (
                 ((dataframe["close"] < dataframe["ema_fast"]) &
@@ -241,3 +304,37 @@ class FailureToReturnStrategy(IStrategy):
         ] = 1
 
         return dataframe
+
+    def _polars_entry_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        close, volume = pl.col("close"), pl.col("volume")
+        ema_fast, ema_slow = pl.col("ema_fast"), pl.col("ema_slow")
+        trend_ok = (close > ema_slow) & (ema_fast > ema_slow)
+        trend_ok_short = (close < ema_slow) & (ema_fast < ema_slow)
+        volume_ok = (volume > pl.col("volume_sma") * self.volume_factor.value) & (volume > 0)
+        volatility_ok = pl.col("atr_ratio") >= self.min_atr_ratio.value
+        dataframe["liquid_session"] = self._is_liquid_session(dataframe, metadata)
+        # As in the pandas version: `~` on the bool parameter is an integer
+        # complement (-1 or -2), which is truthy, so this never filters.
+        session_ok = pl.lit(bool(~self.use_session_filter.value)) | pl.col("liquid_session")
+
+        common = volume_ok & volatility_ok & session_ok
+        return self._polars.signals(
+            dataframe,
+            {
+                "enter_long": trend_ok & common & pl.col("pullback_recent") & pl.col("reengulf"),
+                "enter_short": trend_ok_short & common & pl.col("pullback_recent_short") & pl.col("reengulf_short"),
+            },
+            ["close", "volume", "ema_fast", "ema_slow", "volume_sma", "atr_ratio", "liquid_session",
+             "pullback_recent", "reengulf", "pullback_recent_short", "reengulf_short"],
+        )
+
+    def _polars_exit_trend(self, dataframe: DataFrame) -> DataFrame:
+        close, ema_fast, ema_slow = pl.col("close"), pl.col("ema_fast"), pl.col("ema_slow")
+        return self._polars.signals(
+            dataframe,
+            {
+                "exit_long": ((close < ema_fast) & (close.shift(1) >= ema_fast.shift(1))) | (close < ema_slow),
+                "exit_short": ((close > ema_fast) & (close.shift(1) <= ema_fast.shift(1))) | (close > ema_slow),
+            },
+            ["close", "ema_fast", "ema_slow"],
+        )
@@ -1,4 +1,5 @@
 import logging
+from functools import partial
 from typing import Optional, Tuple
 from datetime import datetime, timezone
 
@@ -7,10 +8,69 @@ import numpy as np
 import talib.abstract as ta
 from pandas import DataFrame
 
-from freqtrade.strategy import (DecimalParameter, IntParameter, IStrategy, merge_informative_pair, stoploss_from_open)
+from freqtrade.strategy import (DecimalParameter, IntParameter, IStrategy, merge_informative_pair)
+
+from freqhub_common.conditions import CompiledCondition, col, greatest, least, param
+from freqhub_common.heartbeat import Heartbeat
+from freqhub_common.indicator_cache import IndicatorCache
+from freqhub_common.memory_profile import MemoryProfiler
+from freqhub_common.parallel import ParallelPairAnalyzer
+from freqhub_common.polars_pipeline import PolarsPipeline
+from freqhub_common.pullback import OUTLIER_THRESHOLD, detect_pullback
+from freqhub_common.rolling import RollingMoments, RollingMomentsIndex
+from freqhub_common.stoploss import PiecewiseTrailingStop
+
+try:
+    import polars as pl
+except ImportError:  # Optional: only needed with freqhub.polars_pipeline enabled
+    pl = None
 
 logger = logging.getLogger(__name__)
 
+# Window of the pullback detection's rolling moments
+PULLBACK_PERIODS = 30
+
+ENTRY_CONDITION = (
+    # Price above cloud (bullish trend)
+    (col('trend_above_senkou') >= param('buy_trend_above_senkou_level')) &
+    # Tenkan above Kijun (confirmed bullish trend)
+    (col('trend_bullish') >= param('buy_trend_bullish_level')) &
+    # Chikou Span above price (trend confirmation)
+    (col('chikou_span') > col('close'))
+) | (
+    # Or price crossing above the cloud
+    (col('close') > col('senkou_span_a')) &
+    (col('close') > col('senkou_span_b')) &
+    (col('close').shift(1) <= greatest(col('senkou_span_a'), col('senkou_span_b')).shift(1)) &
+    (col('tenkan_sen') > col('kijun_sen')) &
+    # Volume confirmation with fan
+    (col('fan_magnitude_gain') >= param('buy_min_fan_magnitude_gain')) &
+    # RSI not overbought
+    (col('rsi') < 70) &
+    # Volume above average
+    (col('volume') > col('volume').rolling_mean(20)) &
+    # Avoid entries during extreme bearish pullback
+    (col('pullback_flag') != -1)
+)
+
+EXIT_CONDITION = (
+    # Trend indicator turns bearish
+    (col('trend_indicator') <= param('sell_trend_indicator')) |
+    # Tenkan crosses below Kijun
+    ((col('tenkan_sen') < col('kijun_sen')) & (col('tenkan_sen').shift(1) >= col('kijun_sen').shift(1))) |
+    # Price crosses below the cloud
+    (
+        (col('close') < col('senkou_span_a')) &
+        (col('close') < col('senkou_span_b')) &
+        (col('close').shift(1) >= least(col('senkou_span_a'), col('senkou_span_b')).shift(1))
+    ) |
+    # Chikou Span crosses below price
+    ((col('chikou_span') < col('close')) & (col('chikou_span').shift(1) >= col('close').shift(1)))
+) & (
+    # RSI overbought
+    col('rsi') > 70
+)
+
 
 class IchiV1Strategy(IStrategy):
     """
@@ -71,10 +131,55 @@ class IchiV1Strategy(IStrategy):
     _daily_profit_checked = False
     _daily_profit_positive = False
     
+    # Optional parallel pair analysis (see freqhub.parallel_analysis in config)
+    _pair_analyzer: Optional[ParallelPairAnalyzer] = None
+    # Optional on-disk indicator cache for backtests (see freqhub.indicator_cache in config)
+    _indicator_cache: Optional[IndicatorCache] = None
+    # Candle-processing heartbeat (see freqhub.heartbeat in config)
+    _heartbeat: Optional[Heartbeat] = None
+    # Memory profile of populate_indicators (see freqhub.memory_profile in config)
+    _memory_profiler: Optional[MemoryProfiler] = None
+    # Per-pair rolling moments of the pullback detection (see detect_pullback),
+    # created in bot_start; shared by the parallel analysis worker threads
+    _pullback_moments: Optional[RollingMomentsIndex] = None
+    # Optional Polars indicators and signals (see freqhub.polars_pipeline in config)
+    _polars: Optional[PolarsPipeline] = None
+    # Entry/exit masks, evaluated block by block (hit rates: tools.check_conditions)
+    _entry_condition = CompiledCondition(ENTRY_CONDITION)
+    _exit_condition = CompiledCondition(EXIT_CONDITION)
+    # custom_stoploss curve and the parameter values it was built from (see stoploss_curve)
+    _stoploss_curve: Optional[PiecewiseTrailingStop] = None
+    _stoploss_values: Optional[tuple] = None
+    
+    def bot_start(self, **kwargs) -> None:
+        self._pair_analyzer = ParallelPairAnalyzer.from_config(self.config, self._compute_indicators)
+        self._indicator_cache = IndicatorCache.from_config(self.config)
+        self._heartbeat = Heartbeat.from_config(self.config, self.timeframe)
+        self._memory_profiler = MemoryProfiler.from_config(self.config, self)
+        self._polars = PolarsPipeline.from_config(self.config)
+        self._pullback_moments = RollingMomentsIndex(PULLBACK_PERIODS)
+        self.stoploss_curve()
+    
+    def bot_loop_start(self, current_time: datetime, **kwargs) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.beat(self)
+        if self._pair_analyzer is not None:
+            self._pair_analyzer.prefetch(self)
+    
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         """
         Add Ichimoku Cloud indicators and volume fan to the DataFrame.
         """
+        if self._indicator_cache is not None:
+            return self._indicator_cache.compute(self, self._compute_indicators, dataframe, metadata)
+        if self._pair_analyzer is not None:
+            return self._pair_analyzer.take(dataframe, metadata)
+        return self._compute_indicators(dataframe, metadata)
+    
+    def _compute_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        if self._polars is not None:
+            return self._polars_indicators(dataframe, metadata)
+        
         # Standard Ichimoku parameters
         tenkan_period = 9
         kijun_period = 26
@@ -143,30 +248,102 @@ class IchiV1Strategy(IStrategy):
         
         # Detect Pullback (from awesome-freqtrade)
         # Credit: @github/just-nilux
-        dataframe = self.detect_pullback(dataframe, periods=30, method='pct_outlier')
+        dataframe = self.detect_pullback(dataframe, periods=PULLBACK_PERIODS, method='pct_outlier',
+                                         pair=metadata['pair'])
         
         return dataframe
     
-    def detect_pullback(self, df: DataFrame, periods=30, method='pct_outlier'):
+    def detect_pullback(self, df: DataFrame, periods=30, method='pct_outlier', pair=None):
         """
         Pullback & Outlier Detection
         Know when a sudden move and possible reversal is coming
         Credit: @github/just-nilux (awesome-freqtrade)
         
-        Method: Percent-Change Outlier (z-score)
+        Methods (freqhub_common.pullback.PULLBACK_METHODS):
+        - pct_outlier: Percent-Change Outlier (z-score)
+        - stdev_outlier: Close-Change Outlier (z-score)
         df['pullback_flag']: 1 (Outlier Up) / -1 (Outlier Down)
+        
+        With `pair` (and `periods` == PULLBACK_PERIODS, after bot_start),
+        the rolling moments are kept between calls and only the new candles
+        are added.
+        """
+        moments = None
+        if pair is not None:
+            moments = self._pair_moments(df, periods, method, pair)
+        return detect_pullback(df, periods=periods, method=method, moments=moments)
+    
+    def _pair_moments(self, df: DataFrame, periods: int, method: str, pair: str):
+        # Runs on the parallel analysis worker threads: only bot_start creates
+        # the shared index (it serializes its own updates)
+        index = self._pullback_moments
+        if index is None or index.window != periods:
+            return RollingMoments(periods).batch
+        return partial(index.moments, (pair, method), df['date'])
+    
+    def _polars_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        """
+        The indicators of _compute_indicators as one Polars query (see
+        freqhub.polars_pipeline). Same columns as the pandas version; compare
+        with `python -m tools.check_polars`.
         """
-        if method == 'pct_outlier':
-            outlier_threshold = 2.0
-            df["pb_pct_change"] = df["close"].pct_change()
-            # Calculate z-score manually
-            df['pb_mean'] = df['pb_pct_change'].rolling(window=periods).mean()
-            df['pb_std'] = df['pb_pct_change'].rolling(window=periods).std()
-            df['pb_zscore'] = (df['pb_pct_change'] - df['pb_mean']) / df['pb_std']
-            df['pullback_flag'] = np.where(df['pb_zscore'] >= outlier_threshold, 1, 0)
-            df['pullback_flag'] = np.where(df['pb_zscore'] <= -outlier_threshold, -1, df['pullback_flag'])
+        tenkan_period = 9
+        kijun_period = 26
+        senkou_b_period = 52
+        chikou_shift = 26
+        volume_shift = int(self.buy_fan_magnitude_shift_value.value * 10)
+        
+        high, low, close, volume = pl.col('high'), pl.col('low'), pl.col('close'), pl.col('volume')
+        tenkan, kijun = pl.col('tenkan_sen'), pl.col('kijun_sen')
+        cloud_top = pl.max_horizontal('senkou_span_a', 'senkou_span_b')
+        cloud_bottom = pl.min_horizontal('senkou_span_a', 'senkou_span_b')
+        zscore = pl.col('pb_zscore')
+        
+        def midpoint(window: int):
+            return (high.rolling_max(window) + low.rolling_min(window)) / 2
         
-        return df
+        # Pullback (pct_outlier) on the pair's rolling moments, as in detect_pullback
+        pct_change = dataframe['close'].pct_change().to_numpy(dtype='float64')
+        pb_mean, pb_std = self._pair_moments(dataframe, PULLBACK_PERIODS, 'pct_outlier', metadata['pair'])(pct_change)
+        
+        frame = self._polars.frame(
+            dataframe,
+            ['high', 'low', 'close', 'volume'],
+            rsi=ta.RSI(dataframe, timeperiod=14).to_numpy(),
+            atr=ta.ATR(dataframe, timeperiod=14).to_numpy(),
+            pb_pct_change=pct_change,
+            pb_mean=pb_mean,
+            pb_std=pb_std,
+        )
+        frame = frame.with_columns(
+            tenkan_sen=midpoint(tenkan_period),
+            kijun_sen=midpoint(kijun_period),
+            senkou_span_b=midpoint(senkou_b_period).shift(chikou_shift),
+            chikou_span=close.shift(-chikou_shift),
+            volume_shift=(volume / volume.ewm_mean(span=20, adjust=False).shift(volume_shift)).fill_nan(None),
+            pb_zscore=((pl.col('pb_pct_change') - pl.col('pb_mean')) / pl.col('pb_std')).fill_nan(None),
+        ).with_columns(
+            senkou_span_a=((tenkan + kijun) / 2).shift(chikou_shift),
+            trend_bullish=pl.when(tenkan > kijun).then((tenkan - kijun) / kijun).otherwise(0.0),
+            fan_magnitude=pl.col('volume_shift') - 1.0,
+            pullback_flag=pl.when(zscore >= OUTLIER_THRESHOLD).then(1)
+            .when(zscore <= -OUTLIER_THRESHOLD).then(-1)
+            .otherwise(0)
+            .cast(pl.Int64),
+        ).with_columns(
+            trend_indicator=pl.when(close > cloud_top).then(1.0).when(close < cloud_bottom).then(-1.0).otherwise(0.0),
+            fan_magnitude_gain=pl.col('fan_magnitude').rolling_mean(5),
+        ).with_columns(
+            trend_above_senkou=pl.when(pl.col('trend_indicator') > 0)
+            .then((close - cloud_top) / close)
+            .otherwise(0.0),
+        )
+        return self._polars.write(dataframe, frame, [
+            'tenkan_sen', 'kijun_sen', 'senkou_span_a', 'senkou_span_b', 'chikou_span',
+            'trend_indicator', 'trend_above_senkou', 'trend_bullish',
+            'volume_shift', 'fan_magnitude', 'fan_magnitude_gain', 'rsi', 'atr',
+            'pb_pct_change', 'pb_mean', 'pb_std', 'pb_zscore', 'pullback_flag',
+        ])
     
     def custom_stoploss(self, pair: str, trade, current_time: datetime,
                        current_rate: float, current_profit: float, **kwargs) -> float:
@@ -178,29 +355,35 @@ class IchiV1Strategy(IStrategy):
         - For profits between PF_1 and PF_2: stoploss interpolates between SL_1 and SL_2
         - For profits above PF_2: stoploss increases linearly with profit
         - For profits below PF_1: uses hard stoploss (HSL)
+
+        Evaluated by the curve last refreshed by `stoploss_curve`.
         """
-        HSL = self.pHSL.value
-        PF_1 = self.pPF_1.value
-        SL_1 = self.pSL_1.value
-        PF_2 = self.pPF_2.value
-        SL_2 = self.pSL_2.value
-        
-        # For profits between PF_1 and PF_2 the stoploss interpolates linearly
-        # between SL_1 and SL_2. For profits above PF_2 the stoploss increases
-        # linearly with profit. For profits below PF_1 it uses HSL.
-        
-        if (current_profit > PF_2):
-            sl_profit = SL_2 + (current_profit - PF_2)
-        elif (current_profit > PF_1):
-            sl_profit = SL_1 + ((current_profit - PF_1) * (SL_2 - SL_1) / (PF_2 - PF_1))
-        else:
-            sl_profit = HSL
-        
-        # Only for hyperopt invalid return
-        if (sl_profit >= current_profit):
-            return -0.99
-        
-        return stoploss_from_open(sl_profit, current_profit)
+        curve = self._stoploss_curve
+        if curve is None:
+            curve = self.stoploss_curve()
+        return curve(current_profit)
+    
+    def stoploss_curve(self) -> PiecewiseTrailingStop:
+        """
+        The custom_stoploss curve for the current parameter values, rebuilt
+        only when one of them changed. Refreshed where Freqtrade loads
+        parameters: in bot_start (after the parameter file) and in
+        populate_entry_trend (after every hyperopt epoch's assignment);
+        values assigned elsewhere take effect on the next call.
+        """
+        values = (self.pHSL.value, self.pPF_1.value, self.pSL_1.value, self.pPF_2.value, self.pSL_2.value)
+        if values != self._stoploss_values:
+            self._stoploss_values = values
+            self._stoploss_curve = PiecewiseTrailingStop(*values)
+        return self._stoploss_curve
+    
+    def custom_stoploss_batch(self, current_profit) -> np.ndarray:
+        """
+        Vectorized custom_stoploss for an array of profits (e.g. every open
+        trade on every candle of a backtest). Agrees exactly with the scalar
+        custom_stoploss; check with `python -m tools.check_stoploss`.
+        """
+        return self.stoploss_curve().batch(current_profit)
     
     def get_daily_profit(self) -> Tuple[float, bool]:
         """
@@ -315,67 +498,61 @@ class IchiV1Strategy(IStrategy):
         """
         Define entry conditions based on the Ichimoku Cloud.
         """
-        dataframe.loc[
-            (
-                # Price above cloud (bullish trend)
-                (dataframe['trend_above_senkou'] >= self.buy_trend_above_senkou_level.value) &
-                # Tenkan above Kijun (confirmed bullish trend)
-                (dataframe['trend_bullish'] >= self.buy_trend_bullish_level.value) &
-                # Chikou Span above price (trend confirmation)
-                (dataframe['chikou_span'] > dataframe['close'])
-            ) |
-            # Or price crossing above the cloud
-            (
-                (dataframe['close'] > dataframe['senkou_span_a']) &
-                (dataframe['close'] > dataframe['senkou_span_b']) &
-                (dataframe['close'].shift(1) <= dataframe[['senkou_span_a', 'senkou_span_b']].max(axis=1).shift(1)) &
-                (dataframe['tenkan_sen'] > dataframe['kijun_sen'])
-            )
-            &
-            # Volume confirmation with fan
-            (dataframe['fan_magnitude_gain'] >= self.buy_min_fan_magnitude_gain.value) &
-            # RSI not overbought
-            (dataframe['rsi'] < 70) &
-            # Volume above average
-            (dataframe['volume'] > dataframe['volume'].rolling(window=20).mean()) &
-            # Avoid entries during extreme bearish pullback
-            (dataframe['pullback_flag'] != -1)
-            ,
-            'enter_long'
-        ] = 1
-        
-        return dataframe
+        # Runs for every pair after hyperopt assigned an epoch's parameters
+        self.stoploss_curve()
+        if self._polars is not None:
+            return self._polars_entry_trend(dataframe)
+        return self._entry_condition.write(dataframe, 'enter_long', self)
     
     def populate_exit_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         """
         Define exit conditions based on the Ichimoku Cloud.
         """
-        dataframe.loc[
+        if self._polars is not None:
+            return self._polars_exit_trend(dataframe)
+        return self._exit_condition.write(dataframe, 'exit_long', self)
+    
+    def _polars_entry_trend(self, dataframe: DataFrame) -> DataFrame:
+        close, volume = pl.col('close'), pl.col('volume')
+        span_a, span_b = pl.col('senkou_span_a'), pl.col('senkou_span_b')
+        tenkan, kijun = pl.col('tenkan_sen'), pl.col('kijun_sen')
+        entry = (
+            # Price above cloud, Tenkan above Kijun, Chikou Span above price
+            (pl.col('trend_above_senkou') >= self.buy_trend_above_senkou_level.value) &
+            (pl.col('trend_bullish') >= self.buy_trend_bullish_level.value) &
+            (pl.col('chikou_span') > close)
+        ) | (
+            # Or price crossing above the cloud ...
+            (close > span_a) &
+            (close > span_b) &
+            (close.shift(1) <= pl.max_horizontal(span_a, span_b).shift(1)) &
+            (tenkan > kijun) &
+            # ... with volume fan, RSI not overbought, volume above average, no bearish pullback
+            (pl.col('fan_magnitude_gain') >= self.buy_min_fan_magnitude_gain.value) &
+            (pl.col('rsi') < 70) &
+            (volume > volume.rolling_mean(20)) &
+            (pl.col('pullback_flag') != -1)
+        )
+        return self._polars.signals(dataframe, {'enter_long': entry}, [
+            'close', 'volume', 'senkou_span_a', 'senkou_span_b', 'tenkan_sen', 'kijun_sen',
+            'trend_above_senkou', 'trend_bullish', 'chikou_span', 'fan_magnitude_gain', 'rsi', 'pullback_flag',
+        ])
+    
+    def _polars_exit_trend(self, dataframe: DataFrame) -> DataFrame:
+        close, chikou = pl.col('close'), pl.col('chikou_span')
+        span_a, span_b = pl.col('senkou_span_a'), pl.col('senkou_span_b')
+        tenkan, kijun = pl.col('tenkan_sen'), pl.col('kijun_sen')
+        exit_ = (
+            (pl.col('trend_indicator') <= self.sell_trend_indicator.value) |
+            ((tenkan < kijun) & (tenkan.shift(1) >= kijun.shift(1))) |
             (
-                # Trend indicator turns bearish
-                (dataframe['trend_indicator'] <= self.sell_trend_indicator.value) |
-                # Tenkan crosses below Kijun
-                (
-                    (dataframe['tenkan_sen'] < dataframe['kijun_sen']) &
-                    (dataframe['tenkan_sen'].shift(1) >= dataframe['kijun_sen'].shift(1))
-                ) |
-                # Price crosses below the cloud
-                (
-                    (dataframe['close'] < dataframe['senkou_span_a']) &
-                    (dataframe['close'] < dataframe['senkou_span_b']) &
-                    (dataframe['close'].shift(1) >= dataframe[['senkou_span_a', 'senkou_span_b']].min(axis=1).shift(1))
-                ) |
-                # Chikou Span crosses below price
-                (
-                    (dataframe['chikou_span'] < dataframe['close']) &
-                    (dataframe['chikou_span'].shift(1) >= dataframe['close'].shift(1))
-                )
-            ) &
-            # RSI overbought
-            (dataframe['rsi'] > 70)
-            ,
-            'exit_long'
-        ] = 1
-        
-        return dataframe
-
+                (close < span_a) &
+                (close < span_b) &
+                (close.shift(1) >= pl.min_horizontal(span_a, span_b).shift(1))
+            ) |
+            ((chikou < close) & (chikou.shift(1) >= close.shift(1)))
+        ) & (pl.col('rsi') > 70)
+        return self._polars.signals(dataframe, {'exit_long': exit_}, [
+            'close', 'chikou_span', 'senkou_span_a', 'senkou_span_b', 'tenkan_sen', 'kijun_sen',
+            'trend_indicator', 'rsi',
+        ])
@@ -1,10 +1,16 @@
 import logging
+from datetime import datetime
+from typing import Optional
 
 import talib.abstract as ta
 from pandas import DataFrame
 
 from freqtrade.strategy import DecimalParameter, IStrategy
 
+from freqhub_common.heartbeat import Heartbeat
+from freqhub_common.kernels import bounded_ffill, fractals
+from freqhub_common.memory_profile import MemoryProfiler
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,29 +48,31 @@ class MandelbrotFibonacciStrategy(IStrategy):
         "720": 0.01
     }
 
+    # Candle-processing heartbeat (see freqhub.heartbeat in config)
+    _heartbeat: Optional[Heartbeat] = None
+    # Memory profile of populate_indicators (see freqhub.memory_profile in config)
+    _memory_profiler: Optional[MemoryProfiler] = None
+
+    def bot_start(self, **kwargs) -> None:
+        self._heartbeat = Heartbeat.from_config(self.config, self.timeframe)
+        self._memory_profiler = MemoryProfiler.from_config(self.config, self)
+
+    def bot_loop_start(self, current_time: datetime, **kwargs) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.beat(self)
+
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         dataframe["ema_fast"] = ta.EMA(dataframe, timeperiod=50)
         dataframe["ema_slow"] = ta.EMA(dataframe, timeperiod=200)
         dataframe["volume_sma"] = dataframe["volume"].rolling(window=20).mean()
 
-        fractal_high = (
-            (dataframe["high"] > dataframe["high"].shift(1)) &
-            (dataframe["high"] > dataframe["high"].shift(2)) &
-            (dataframe["high"] >= dataframe["high"].shift(-1)) &
-            (dataframe["high"] >= dataframe["high"].shift(-2))
-        )
-        fractal_low = (
-            (dataframe["low"] < dataframe["low"].shift(1)) &
-            (dataframe["low"] < dataframe["low"].shift(2)) &
-            (dataframe["low"] <= dataframe["low"].shift(-1)) &
-            (dataframe["low"] <= dataframe["low"].shift(-2))
-        )
-
-        dataframe["fractal_high"] = dataframe["high"].where(fractal_high).shift(2)
-        dataframe["fractal_low"] = dataframe["low"].where(fractal_low).shift(2)
+        # Fractals two candles later, once the two candles after them are known
+        fractal_high, fractal_low = fractals(dataframe["high"].to_numpy(), dataframe["low"].to_numpy(), 2)
+        dataframe["fractal_high"] = fractal_high
+        dataframe["fractal_low"] = fractal_low
 
-        dataframe["swing_high"] = dataframe["fractal_high"].ffill()
-        dataframe["swing_low"] = dataframe["fractal_low"].ffill()
+        dataframe["swing_high"] = bounded_ffill(fractal_high)
+        dataframe["swing_low"] = bounded_ffill(fractal_low)
         dataframe["swing_range"] = dataframe["swing_high"] - dataframe["swing_low"]
 
         dataframe["fib_382_long"] = dataframe["swing_high"] - dataframe["swing_range"] * self.fib_low.value
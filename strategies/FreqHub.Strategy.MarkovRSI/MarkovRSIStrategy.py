@@ -8,6 +8,11 @@ from pandas import DataFrame
 
 from freqtrade.strategy import DecimalParameter, IntParameter, IStrategy
 
+from freqhub_common.heartbeat import Heartbeat
+from freqhub_common.memory_profile import MemoryProfiler
+from freqhub_common.parameters import ParameterSnapshot, RoiTable
+from freqhub_common.signal_memo import SignalMemo
+
 logger = logging.getLogger(__name__)
 
 
@@ -55,22 +60,45 @@ class MarkovRSIStrategy(IStrategy):
     _daily_profit_checked = False
     _daily_profit_positive = False
 
+    # Frozen parameter values for the hot path (see _refresh_parameters)
+    _params: Optional[ParameterSnapshot] = None
+    _roi_override: Optional[RoiTable] = None
+    _stoploss_override: Optional[float] = None
+    _roi_normalized = False
+
+    # Candle-processing heartbeat (see freqhub.heartbeat in config)
+    _heartbeat: Optional[Heartbeat] = None
+    # Memory profile of populate_indicators (see freqhub.memory_profile in config)
+    _memory_profiler: Optional[MemoryProfiler] = None
+    # Optional memo of entry/exit signals for hyperopt (see freqhub.signal_memo in config)
+    _signal_memo: Optional[SignalMemo] = None
+
+    def bot_start(self, **kwargs) -> None:
+        self._heartbeat = Heartbeat.from_config(self.config, self.timeframe)
+        self._memory_profiler = MemoryProfiler.from_config(self.config, self)
+        self._signal_memo = SignalMemo.from_config(self.config)
+
+    def bot_loop_start(self, current_time: datetime, **kwargs) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.beat(self)
+
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        params = self._refresh_parameters()
         dataframe["ema_slow"] = ta.EMA(dataframe, timeperiod=self.slow_ema)
-        dataframe["rsi"] = ta.RSI(dataframe, timeperiod=int(self.rsi_period.value))
+        dataframe["rsi"] = ta.RSI(dataframe, timeperiod=int(params.rsi_period))
         dataframe["adx"] = ta.ADX(dataframe, timeperiod=self.adx_period)
         dataframe["atr"] = ta.ATR(dataframe, timeperiod=self.atr_period)
         dataframe["atr_percent"] = dataframe["atr"] / dataframe["close"]
 
         conditions = [
             (dataframe["close"] < dataframe["ema_slow"])
-            & (dataframe["rsi"] < self.rsi_low.value),
+            & (dataframe["rsi"] < params.rsi_low),
             (dataframe["close"] < dataframe["ema_slow"])
-            & (dataframe["rsi"] >= self.rsi_low.value),
+            & (dataframe["rsi"] >= params.rsi_low),
             (dataframe["close"] > dataframe["ema_slow"])
-            & (dataframe["rsi"] < self.rsi_high.value),
+            & (dataframe["rsi"] < params.rsi_high),
             (dataframe["close"] > dataframe["ema_slow"])
-            & (dataframe["rsi"] >= self.rsi_high.value),
+            & (dataframe["rsi"] >= params.rsi_high),
         ]
 
         choices = [0, 1, 2, 3]
@@ -80,6 +108,12 @@ class MarkovRSIStrategy(IStrategy):
         return dataframe
 
     def populate_entry_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        params = self._refresh_parameters()
+        if self._signal_memo is not None:
+            return self._signal_memo.compute(self._entry_signals, dataframe, metadata, params)
+        return self._entry_signals(dataframe, metadata, params)
+
+    def _entry_signals(self, dataframe: DataFrame, metadata: dict, params: ParameterSnapshot) -> DataFrame:
         dataframe.loc[
             (
                 (
@@ -87,8 +121,8 @@ class MarkovRSIStrategy(IStrategy):
                     | ((dataframe["prev_state"] == 1) & (dataframe["markov_state"] == 2))
                     | ((dataframe["prev_state"] == 2) & (dataframe["markov_state"] == 3))
                 )
-                & (dataframe["adx"] > self.adx_min.value)
-                & (dataframe["atr_percent"] > self.atr_min.value)
+                & (dataframe["adx"] > params.adx_min)
+                & (dataframe["atr_percent"] > params.atr_min)
             ),
             "enter_long",
         ] = 1
@@ -96,12 +130,18 @@ class MarkovRSIStrategy(IStrategy):
         return dataframe
 
     def populate_exit_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        params = self._refresh_parameters()
+        if self._signal_memo is not None:
+            return self._signal_memo.compute(self._exit_signals, dataframe, metadata, params)
+        return self._exit_signals(dataframe, metadata, params)
+
+    def _exit_signals(self, dataframe: DataFrame, metadata: dict, params: ParameterSnapshot) -> DataFrame:
         dataframe.loc[
             (
                 ((dataframe["prev_state"] == 3) & (dataframe["markov_state"] == 2))
                 | ((dataframe["prev_state"] == 2) & (dataframe["markov_state"] == 1))
                 | (dataframe["markov_state"] == 0)
-                | (dataframe["rsi"] > self.sell_rsi_overbought.value)
+                | (dataframe["rsi"] > params.sell_rsi_overbought)
             ),
             "exit_long",
         ] = 1
@@ -206,27 +246,62 @@ class MarkovRSIStrategy(IStrategy):
             logger.warning("Error in confirm_trade_entry: %s", e)
             return True
 
+    def _refresh_parameters(self) -> ParameterSnapshot:
+        """
+        Frozen parameter values, rebuilt only when a parameter value changed
+        (parameter file load, hyperopt epoch, assignment).
+        """
+        params = self._params
+        if params is not None and not params.stale:
+            return params
+        self._params = ParameterSnapshot.capture(
+            self,
+            params,
+            roi=lambda params: {
+                0: params.roi_p1,
+                int(params.roi_t1): params.roi_p2,
+                int(params.roi_t2): params.roi_p3,
+                int(params.roi_t3): params.roi_p4,
+            },
+            stoploss=lambda params: params.stoploss_opt,
+        )
+        return self._params
+
+    def _roi(self) -> RoiTable:
+        if self._roi_override is not None:
+            return self._roi_override
+        return self._refresh_parameters().roi
+
     @property
     def minimal_roi(self):
-        if hasattr(self, "_minimal_roi_override") and self._minimal_roi_override is not None:
-            return self._minimal_roi_override
-        return {
-            "0": float(self.roi_p1.value),
-            str(int(self.roi_t1.value)): float(self.roi_p2.value),
-            str(int(self.roi_t2.value)): float(self.roi_p3.value),
-            str(int(self.roi_t3.value)): float(self.roi_p4.value),
-        }
+        # Freqtrade copies the table into the config (string keys) before it
+        # normalizes it to int keys, which is what the strategy then serves.
+        roi = self._roi()
+        return roi.table if self._roi_normalized else roi.config
 
     @minimal_roi.setter
     def minimal_roi(self, value):
-        self._minimal_roi_override = value
+        # Freqtrade assigns the table back when normalizing it; only a
+        # different table (config, hyperopt roi space) overrides the parameters.
+        roi = RoiTable(value)
+        self._roi_normalized = all(isinstance(minutes, int) for minutes in value)
+        self._roi_override = None if roi.table == self._refresh_parameters().roi.table else roi
 
     @property
     def stoploss(self):
-        if hasattr(self, "_stoploss_override") and self._stoploss_override is not None:
+        if self._stoploss_override is not None:
             return self._stoploss_override
-        return float(self.stoploss_opt.value)
+        return self._refresh_parameters().stoploss
 
     @stoploss.setter
     def stoploss(self, value):
-        self._stoploss_override = value
+        value = float(value)
+        self._stoploss_override = None if value == self._refresh_parameters().stoploss else value
+
+    def min_roi_reached_entry(self, trade, trade_dur: int, current_time: datetime):
+        """
+        ROI entry for the trade duration, by bisect on the precompiled table.
+        """
+        if self.use_custom_roi:
+            return super().min_roi_reached_entry(trade, trade_dur, current_time)
+        return self._roi().entry(trade_dur)
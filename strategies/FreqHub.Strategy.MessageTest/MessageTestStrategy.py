@@ -1,15 +1,23 @@
 import logging
+import time
+from datetime import datetime
+from typing import Optional
 
 from pandas import DataFrame
 
 from freqtrade.strategy import IStrategy
 
+from freqhub_common.heartbeat import Heartbeat
+from freqhub_common.memory_profile import MemoryProfiler
+from freqhub_common.message_load import MessageLoadGenerator, format_entry_tag
+
 logger = logging.getLogger(__name__)
 
 
 class MessageTestStrategy(IStrategy):
     """
     Messaging test strategy that alternates buy/sell every candle.
+    Optionally generates message load (see freqhub.message_load in config).
     """
 
     INTERFACE_VERSION = 3
@@ -29,6 +37,26 @@ class MessageTestStrategy(IStrategy):
         "30": 0.002,
     }
 
+    # Optional message load generator (see freqhub.message_load in config)
+    _load: Optional[MessageLoadGenerator] = None
+    # Candle-processing heartbeat (see freqhub.heartbeat in config)
+    _heartbeat: Optional[Heartbeat] = None
+    # Memory profile of populate_indicators (see freqhub.memory_profile in config)
+    _memory_profiler: Optional[MemoryProfiler] = None
+
+    def bot_start(self, **kwargs) -> None:
+        self._heartbeat = Heartbeat.from_config(self.config, self.timeframe)
+        self._memory_profiler = MemoryProfiler.from_config(self.config, self)
+        self._load = MessageLoadGenerator.from_config(self.config, self.dp.send_msg)
+        if self._load is not None:
+            logger.info("Message load generator enabled: %s", self._load.describe())
+
+    def bot_loop_start(self, current_time: datetime, **kwargs) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.beat(self)
+        if self._load is not None:
+            self._load.tick(self.dp.current_whitelist())
+
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         dataframe["candle_count"] = range(len(dataframe))
         dataframe["should_buy"] = (dataframe["candle_count"] % 2 == 0).astype(int)
@@ -36,10 +64,11 @@ class MessageTestStrategy(IStrategy):
         return dataframe
 
     def populate_entry_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
-        dataframe.loc[
-            (dataframe["should_buy"] == 1) & (dataframe["volume"] > 0),
-            "enter_long",
-        ] = 1
+        entries = (dataframe["should_buy"] == 1) & (dataframe["volume"] > 0)
+        dataframe.loc[entries, "enter_long"] = 1
+        if self._load is not None:
+            # Analysis time, to measure signal-to-notification latency
+            dataframe.loc[entries, "enter_tag"] = format_entry_tag(time.time())
         return dataframe
 
     def populate_exit_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
@@ -48,3 +77,20 @@ class MessageTestStrategy(IStrategy):
             "exit_long",
         ] = 1
         return dataframe
+
+    def confirm_trade_entry(
+        self,
+        pair: str,
+        order_type: str,
+        amount: float,
+        rate: float,
+        time_in_force: str,
+        current_time: datetime,
+        entry_tag: Optional[str],
+        side: str,
+        **kwargs,
+    ) -> bool:
+        """
+        Limit entries to the load generator's target order rate.
+        """
+        return self._load is None or self._load.allow_order()
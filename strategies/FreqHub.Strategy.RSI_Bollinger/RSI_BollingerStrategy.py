@@ -1,4 +1,5 @@
 import logging
+from datetime import datetime
 from typing import Optional
 
 import pandas as pd
@@ -7,6 +8,11 @@ from pandas import DataFrame
 
 from freqtrade.strategy import (DecimalParameter, IntParameter, IStrategy, merge_informative_pair)
 
+from freqhub_common.heartbeat import Heartbeat
+from freqhub_common.informative import InformativeProvider
+from freqhub_common.memory_profile import MemoryProfiler
+from freqhub_common.notifications import NotificationQueue
+
 logger = logging.getLogger(__name__)
 
 
@@ -59,12 +65,26 @@ class RSI_BollingerStrategy(IStrategy):
     # Informative pairs
     informative_timeframe = '1h'
     
+    # Informative candles (see freqhub.resample_informative in config)
+    _informative: Optional[InformativeProvider] = None
+    # Strategy messages (see freqhub.notifications in config)
+    _notifier: Optional[NotificationQueue] = None
+    # Candle-processing heartbeat (see freqhub.heartbeat in config)
+    _heartbeat: Optional[Heartbeat] = None
+    # Memory profile of populate_indicators (see freqhub.memory_profile in config)
+    _memory_profiler: Optional[MemoryProfiler] = None
+    
     def informative_pairs(self):
         pairs = self.dp.current_whitelist()
-        informative_pairs = [(pair, self.informative_timeframe) for pair in pairs]
+        informative_pairs = self._informative.informative_pairs(pairs)
         return informative_pairs
     
     def bot_start(self, **kwargs) -> None:
+        self._informative = InformativeProvider.from_config(self.config, self.timeframe, self.informative_timeframe)
+        self._notifier = NotificationQueue.from_config(self.config, self.dp)
+        self._heartbeat = Heartbeat.from_config(self.config, self.timeframe)
+        self._memory_profiler = MemoryProfiler.from_config(self.config, self)
+        
         try:
             exchange = self.dp.exchange.name if hasattr(self.dp, 'exchange') and hasattr(self.dp.exchange, 'name') else 'binance'
             stake_currency = self.dp.stake_currency if hasattr(self.dp, 'stake_currency') else 'USDT'
@@ -84,10 +104,16 @@ class RSI_BollingerStrategy(IStrategy):
 Bot started successfully and ready to trade."""
             
             if hasattr(self.dp, 'send_msg'):
-                self.dp.send_msg(startup_msg)
+                self._notifier.notify(startup_msg)
         except Exception as e:
             logger.warning(f"Could not send startup message: {e}")
     
+    def bot_loop_start(self, current_time: datetime, **kwargs) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.beat(self)
+        if self._notifier is not None:
+            self._notifier.flush()
+    
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         # RSI for momentum
         dataframe['rsi'] = ta.RSI(dataframe, timeperiod=14)
@@ -110,7 +136,7 @@ Bot started successfully and ready to trade."""
         dataframe['volume_sma'] = dataframe['volume'].rolling(window=20).mean()
         
         # Informative timeframe (1h) for context
-        informative = self.dp.get_pair_dataframe(pair=metadata['pair'], timeframe=self.informative_timeframe)
+        informative = self._informative.get_pair_dataframe(self.dp, metadata['pair'], dataframe)
         informative['rsi'] = ta.RSI(informative, timeperiod=14)
         informative['ema'] = ta.EMA(informative, timeperiod=21)
         dataframe = merge_informative_pair(dataframe, informative, self.timeframe, self.informative_timeframe,
@@ -1,8 +1,14 @@
+from datetime import datetime
+from typing import Optional
+
 from pandas import DataFrame
 import talib.abstract as ta
 
 from freqtrade.strategy.interface import IStrategy
 
+from freqhub_common.heartbeat import Heartbeat
+from freqhub_common.memory_profile import MemoryProfiler
+
 
 class TemplateStrategy(IStrategy):
     """
@@ -14,6 +20,19 @@ class TemplateStrategy(IStrategy):
     timeframe = "5m"
     startup_candle_count = 50
 
+    # Candle-processing heartbeat (see freqhub.heartbeat in config)
+    _heartbeat: Optional[Heartbeat] = None
+    # Memory profile of populate_indicators (see freqhub.memory_profile in config)
+    _memory_profiler: Optional[MemoryProfiler] = None
+
+    def bot_start(self, **kwargs) -> None:
+        self._heartbeat = Heartbeat.from_config(self.config, self.timeframe)
+        self._memory_profiler = MemoryProfiler.from_config(self.config, self)
+
+    def bot_loop_start(self, current_time: datetime, **kwargs) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.beat(self)
+
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         dataframe["ema_fast"] = ta.EMA(dataframe, timeperiod=12)
         dataframe["ema_slow"] = ta.EMA(dataframe, timeperiod=26)
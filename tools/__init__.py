@@ -0,0 +1,9 @@
+"""
+Offline tooling for FreqHub strategies.
+
+These modules are not shipped in the strategy images. Run them from the repo
+root in an environment with Freqtrade installed (a local venv, or the
+`freqtradeorg/freqtrade` image with the repo mounted), e.g.:
+
+    python -m tools.plan_downloads --timerange 20240101-20240401
+"""
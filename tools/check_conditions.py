@@ -0,0 +1,162 @@
+"""
+Check IchiV1's compiled entry/exit conditions and report their hit rates.
+
+Analyzes synthetic candles, then builds `enter_long`/`exit_long` with the
+original pandas expressions and with `freqhub_common.conditions` (NumPy
+and, when installed, numexpr engine) for the default parameters and
+`--cases` random draws from the hyperopt ranges, and requires identical
+columns. Prints each condition's hit rate (rows true of rows evaluated)
+and the rows short-circuiting skipped, then times the three on
+`--candles` candles. Exits with status 1 on a mismatch.
+
+    python -m tools.check_conditions
+    python -m tools.check_conditions --cases 100 --candles 2000000 --block-size 65536
+"""
+
+import argparse
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from pandas import DataFrame
+
+from freqhub_common.conditions import CompiledCondition, numexpr
+
+from tools.fixtures import synthetic_ohlcv
+from tools.strategy_loader import create_strategy, discover, offline_config, sample_parameters, set_parameters
+
+
+def reference_entry(strategy, dataframe: DataFrame) -> DataFrame:
+    """
+    IchiV1's populate_entry_trend as pandas expressions.
+    """
+    dataframe.loc[
+        (
+            (dataframe['trend_above_senkou'] >= strategy.buy_trend_above_senkou_level.value) &
+            (dataframe['trend_bullish'] >= strategy.buy_trend_bullish_level.value) &
+            (dataframe['chikou_span'] > dataframe['close'])
+        ) |
+        (
+            (dataframe['close'] > dataframe['senkou_span_a']) &
+            (dataframe['close'] > dataframe['senkou_span_b']) &
+            (dataframe['close'].shift(1) <= dataframe[['senkou_span_a', 'senkou_span_b']].max(axis=1).shift(1)) &
+            (dataframe['tenkan_sen'] > dataframe['kijun_sen'])
+        )
+        &
+        (dataframe['fan_magnitude_gain'] >= strategy.buy_min_fan_magnitude_gain.value) &
+        (dataframe['rsi'] < 70) &
+        (dataframe['volume'] > dataframe['volume'].rolling(window=20).mean()) &
+        (dataframe['pullback_flag'] != -1),
+        'enter_long'
+    ] = 1
+    return dataframe
+
+
+def reference_exit(strategy, dataframe: DataFrame) -> DataFrame:
+    """
+    IchiV1's populate_exit_trend as pandas expressions.
+    """
+    dataframe.loc[
+        (
+            (dataframe['trend_indicator'] <= strategy.sell_trend_indicator.value) |
+            (
+                (dataframe['tenkan_sen'] < dataframe['kijun_sen']) &
+                (dataframe['tenkan_sen'].shift(1) >= dataframe['kijun_sen'].shift(1))
+            ) |
+            (
+                (dataframe['close'] < dataframe['senkou_span_a']) &
+                (dataframe['close'] < dataframe['senkou_span_b']) &
+                (dataframe['close'].shift(1) >= dataframe[['senkou_span_a', 'senkou_span_b']].min(axis=1).shift(1))
+            ) |
+            (
+                (dataframe['chikou_span'] < dataframe['close']) &
+                (dataframe['chikou_span'].shift(1) >= dataframe['close'].shift(1))
+            )
+        ) &
+        (dataframe['rsi'] > 70),
+        'exit_long'
+    ] = 1
+    return dataframe
+
+
+def _signals(strategy, analyzed: DataFrame, conditions: Optional[Dict[str, CompiledCondition]]) -> Dict[str, np.ndarray]:
+    if conditions is None:
+        entry = reference_entry(strategy, analyzed.copy())
+        exit_ = reference_exit(strategy, analyzed.copy())
+    else:
+        entry = conditions["enter_long"].write(analyzed.copy(), "enter_long", strategy)
+        exit_ = conditions["exit_long"].write(analyzed.copy(), "exit_long", strategy)
+    return {"enter_long": entry["enter_long"].to_numpy(), "exit_long": exit_["exit_long"].to_numpy()}
+
+
+def _print_report(column: str, condition: CompiledCondition) -> None:
+    print(f"  {column} ({condition.engine}, block {condition.block_size}):")
+    for row in condition.report():
+        indent = "  " * row["depth"]
+        print(
+            f"    {row['hit_rate']:7.2%} {row['hits']:>10} / {row['rows']:<10} skipped {row['skipped']:>10}  "
+            f"{indent}{row['condition']}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", type=int, default=20, help="Random parameter draws besides the defaults")
+    parser.add_argument("--check-candles", type=int, default=20000, help="Candles for the equality checks")
+    parser.add_argument("--candles", type=int, default=1_000_000, help="Candles for the benchmark")
+    parser.add_argument("--block-size", type=int, default=None, help="Default: CompiledCondition's")
+    parser.add_argument("--pair", default="BTC/USDT")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    package = discover(["IchiV1"])[0]
+    strategy = create_strategy(package, offline_config(package))
+    options = {"block_size": args.block_size} if args.block_size else {}
+    engines = ["numpy"] + (["numexpr"] if numexpr is not None else [])
+    compiled = {
+        engine: {
+            "enter_long": CompiledCondition(strategy._entry_condition.condition, engine=engine, **options),
+            "exit_long": CompiledCondition(strategy._exit_condition.condition, engine=engine, **options),
+        }
+        for engine in engines
+    }
+
+    def analyze(candles: DataFrame, pair: str) -> DataFrame:
+        return strategy.advise_indicators(candles, {"pair": pair})
+
+    analyzed = analyze(synthetic_ohlcv(args.pair, strategy.timeframe, candles=args.check_candles, seed=args.seed),
+                       args.pair)
+    rng = np.random.default_rng(args.seed)
+    for case in range(args.cases + 1):
+        values = sample_parameters(strategy, rng, ["buy", "sell"]) if case else {}
+        set_parameters(strategy, values)
+        expected = _signals(strategy, analyzed, None)
+        for engine, conditions in compiled.items():
+            actual = _signals(strategy, analyzed, conditions)
+            for column, want in expected.items():
+                if not np.array_equal(want, actual[column], equal_nan=True):
+                    print(f"IchiV1: case {case} {values}: {column} differs ({engine})")
+                    return 1
+    print(f"IchiV1: {args.cases + 1} parameter sets x {len(analyzed)} candles agree ({', '.join(engines)})")
+    for column, condition in compiled["numpy"].items():
+        _print_report(column, condition)
+
+    set_parameters(strategy, {})
+    analyzed = analyze(synthetic_ohlcv(args.pair, strategy.timeframe, candles=args.candles, seed=args.seed), "bench")
+    timings = {}
+    for name, conditions in [("pandas", None)] + list(compiled.items()):
+        started = time.perf_counter()
+        _signals(strategy, analyzed, conditions)
+        timings[name] = time.perf_counter() - started
+    print(
+        f"IchiV1: {len(analyzed)} candles, entry + exit: "
+        + ", ".join(
+            f"{name} {seconds * 1e3:.1f} ms" + (f" ({timings['pandas'] / seconds:.1f}x)" if name != "pandas" else "")
+            for name, seconds in timings.items()
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
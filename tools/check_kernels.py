@@ -0,0 +1,181 @@
+"""
+Check the loop kernels of freqhub_common.kernels and time their fast paths.
+
+Runs every kernel as its plain-Python loop (the reference), compiled with
+Numba (when numba is installed) and as its NumPy formulation on synthetic
+candles with NaN gaps, for random parameters and `--cases` trade paths,
+and requires identical results (floats exactly, NaN matching NaN). The
+reference is also checked against the pandas expressions the kernels
+replaced (`ffill(limit)`, MandelbrotFibonacci's fractals). Then times the
+NumPy and Numba paths on `--candles` candles. Exits with status 1 on a
+mismatch.
+
+    python -m tools.check_kernels
+    python -m tools.check_kernels --kernels fractals trailing_stop --cases 500 --candles 5000000
+"""
+
+import argparse
+import math
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from freqhub_common.kernels import KERNELS, numba
+
+from tools.fixtures import synthetic_ohlcv
+
+
+def _candles(candles: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Highs and lows of synthetic candles with a few NaN gaps (missing candles).
+    """
+    frame = synthetic_ohlcv("BTC/USDT", "5m", candles=candles, seed=seed)
+    high = frame["high"].to_numpy(dtype="float64", copy=True)
+    low = frame["low"].to_numpy(dtype="float64", copy=True)
+    rng = np.random.default_rng(seed)
+    gaps = rng.choice(candles, size=max(candles // 500, 1), replace=False)
+    for start in gaps:
+        stop = start + int(rng.integers(1, 20))
+        high[start:stop] = np.nan
+        low[start:stop] = np.nan
+    return high, low
+
+
+def reference_fractals(high: np.ndarray, low: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    MandelbrotFibonacci's fractals as pandas expressions.
+    """
+    dataframe = pd.DataFrame({"high": high, "low": low})
+    fractal_high = (
+        (dataframe["high"] > dataframe["high"].shift(1)) &
+        (dataframe["high"] > dataframe["high"].shift(2)) &
+        (dataframe["high"] >= dataframe["high"].shift(-1)) &
+        (dataframe["high"] >= dataframe["high"].shift(-2))
+    )
+    fractal_low = (
+        (dataframe["low"] < dataframe["low"].shift(1)) &
+        (dataframe["low"] < dataframe["low"].shift(2)) &
+        (dataframe["low"] <= dataframe["low"].shift(-1)) &
+        (dataframe["low"] <= dataframe["low"].shift(-2))
+    )
+    return (
+        dataframe["high"].where(fractal_high).shift(2).to_numpy(),
+        dataframe["low"].where(fractal_low).shift(2).to_numpy(),
+    )
+
+
+def _cases(name: str, high: np.ndarray, low: np.ndarray, cases: int, rng: np.random.Generator) -> List[tuple]:
+    """
+    Argument tuples for kernel `name` (the kernel's positional arguments).
+    """
+    n = len(high)
+    if name == "bounded_ffill":
+        sparse = np.where(rng.random(n) < 0.05, high, np.nan)
+        return [(values, limit) for values in (high, sparse) for limit in (-1, 0, 1, 5, 50)]
+    if name == "fractals":
+        return [(high, low, wing) for wing in (1, 2, 3, 5)]
+    if name == "trailing_stop":
+        arguments = []
+        for _ in range(cases):
+            entry = int(rng.integers(0, n - 1))
+            path = slice(entry, min(entry + int(rng.integers(1, 3000)), n))
+            rate = high[entry] if not math.isnan(high[entry]) else float(np.nanmean(high))
+            distance = float(rng.uniform(0.01, 0.2))
+            positive = float(rng.uniform(0.005, 0.05)) if rng.random() < 0.7 else math.nan
+            offset = float(rng.uniform(0.0, 0.06))
+            fee_factor = 0.999 / 1.001
+            arguments.append(
+                (high[path], low[path], rate * (1 - distance), rate, fee_factor, distance, positive, offset,
+                 bool(rng.random() < 0.5))
+            )
+        return arguments
+    if name == "transition_counts":
+        states = rng.integers(-1, 4, size=n)
+        return [(states, 4, window) for window in (1, 2, 20, n + 5)]
+    raise ValueError(f"No cases for kernel {name!r}")
+
+
+def _same(expected, actual) -> bool:
+    if isinstance(expected, tuple):
+        return len(expected) == len(actual) and all(_same(e, a) for e, a in zip(expected, actual))
+    if isinstance(expected, np.ndarray):
+        return (
+            isinstance(actual, np.ndarray)
+            and expected.dtype == actual.dtype
+            and np.array_equal(expected, actual, equal_nan=expected.dtype.kind == "f")
+        )
+    return expected == actual or (math.isnan(expected) and math.isnan(actual))
+
+
+def _check_pandas(name: str, arguments: tuple, result) -> Optional[str]:
+    """
+    The reference against the pandas expression it replaced, where there is one.
+    """
+    if name == "bounded_ffill" and arguments[1] != 0:  # pandas has no limit=0
+        values, limit = arguments
+        expected = pd.Series(values).ffill(limit=None if limit < 0 else limit).to_numpy()
+    elif name == "fractals" and arguments[2] == 2:
+        expected = reference_fractals(arguments[0], arguments[1])
+    else:
+        return None
+    return None if _same(expected, result) else f"{name}: reference differs from pandas"
+
+
+def _time(function: Callable, arguments: tuple) -> float:
+    started = time.perf_counter()
+    function(*arguments)
+    return time.perf_counter() - started
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--kernels", nargs="+", default=list(KERNELS), choices=list(KERNELS))
+    parser.add_argument("--cases", type=int, default=200, help="Trade paths for trailing_stop")
+    parser.add_argument("--check-candles", type=int, default=20000, help="Candles for the equality checks")
+    parser.add_argument("--candles", type=int, default=1_000_000, help="Candles for the benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if numba is None:
+        print("numba is not installed: checking the NumPy formulations against the reference only")
+    high, low = _candles(args.check_candles, args.seed)
+    for name in args.kernels:
+        kernel = KERNELS[name]
+        paths: Dict[str, Callable] = {"numpy": kernel.vectorized}
+        if kernel.compiled is not None:
+            paths["numba"] = kernel.compiled
+        arguments = _cases(name, high, low, args.cases, np.random.default_rng(args.seed))
+        for case, values in enumerate(arguments):
+            expected = kernel.reference(*values)
+            mismatch = _check_pandas(name, values, expected)
+            if mismatch:
+                print(f"{mismatch} (case {case})")
+                return 1
+            for path, function in paths.items():
+                if not _same(expected, function(*values)):
+                    print(f"{name}: case {case}: {path} differs from the reference")
+                    return 1
+        print(f"{name}: {len(arguments)} cases agree ({', '.join(['reference'] + list(paths))})")
+
+    high, low = _candles(args.candles, args.seed)
+    for name in args.kernels:
+        kernel = KERNELS[name]
+        values = _cases(name, high, low, 1, np.random.default_rng(args.seed))[0]
+        if name == "trailing_stop":
+            # One trade over every candle, its stop trailing far out of reach.
+            values = (high, low, 0.0, float(high[0]), 1.0, 0.999, math.nan, 0.0, False)
+        timings = {"numpy": _time(kernel.vectorized, values)}
+        if kernel.compiled is not None:
+            timings["numba"] = _time(kernel.compiled, values)
+        print(
+            f"{name}: {len(high)} candles: "
+            + ", ".join(f"{path} {seconds * 1e3:.1f} ms" for path, seconds in timings.items())
+            + (f" ({timings['numpy'] / timings['numba']:.1f}x)" if "numba" in timings else "")
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
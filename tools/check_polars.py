@@ -0,0 +1,106 @@
+"""
+Check the Polars pipelines of IchiV1 and FailureToReturn against their pandas code.
+
+Analyzes synthetic candles with and without `freqhub.polars_pipeline` for
+the default parameters and `--cases` random draws from the hyperopt
+ranges, and requires the same columns and dtypes: signals, flags and other
+non-float columns exactly, floats to a relative tolerance (Polars' rolling
+and EWM sums may differ from pandas' in the last bits), NaN matching NaN.
+Then times indicators plus signals of both on `--candles` candles. Exits
+with status 1 on a mismatch.
+
+    python -m tools.check_polars
+    python -m tools.check_polars --strategies IchiV1 --cases 50 --candles 1000000
+"""
+
+import argparse
+import time
+from typing import List, Optional
+
+import numpy as np
+from pandas import DataFrame
+
+from tools.fixtures import synthetic_ohlcv
+from tools.strategy_loader import create_strategy, discover, offline_config, sample_parameters, set_parameters
+
+DEFAULT_STRATEGIES = ["IchiV1", "FailureToReturn"]
+EXACT_COLUMNS = ("enter_long", "enter_short", "exit_long", "exit_short", "pullback_flag")
+
+
+def _analyze(strategy, candles: DataFrame, pair: str) -> DataFrame:
+    metadata = {"pair": pair}
+    return strategy.ft_advise_signals(strategy.advise_indicators(candles.copy(), metadata), metadata)
+
+
+def _mismatch(expected: DataFrame, actual: DataFrame) -> Optional[str]:
+    if set(expected.columns) != set(actual.columns):
+        return f"columns {sorted(set(expected.columns) ^ set(actual.columns))} only on one side"
+    for column in expected.columns:
+        want, got = expected[column].to_numpy(), actual[column].to_numpy()
+        if want.dtype != got.dtype:
+            return f"column {column}: dtype {want.dtype} != {got.dtype}"
+        if want.dtype.kind != "f" or column in EXACT_COLUMNS:
+            if not np.array_equal(want, got, equal_nan=want.dtype.kind == "f"):
+                return f"column {column} differs"
+            continue
+        differs = np.isnan(want) != np.isnan(got)
+        finite = np.isfinite(want)
+        scale = float(np.max(np.abs(want[finite]))) if finite.any() else 1.0
+        with np.errstate(invalid="ignore"):
+            differs |= np.abs(want - got) > 1e-9 * np.maximum(np.abs(want), scale)
+        differs &= ~(np.isinf(want) & (want == got))
+        rows = np.flatnonzero(differs)
+        if len(rows):
+            row = int(rows[0])
+            return f"column {column} at row {row}: pandas {want[row]!r}, polars {got[row]!r}"
+    return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--strategies", nargs="+", default=DEFAULT_STRATEGIES)
+    parser.add_argument("--cases", type=int, default=20, help="Random parameter draws besides the defaults")
+    parser.add_argument("--check-candles", type=int, default=5000, help="Candles for the equality checks")
+    parser.add_argument("--candles", type=int, default=500_000, help="Candles for the benchmark")
+    parser.add_argument("--pair", default="BTC/USDT")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for package in discover(args.strategies):
+        config = offline_config(package)
+        plain = create_strategy(package, config)
+        config["freqhub"]["polars_pipeline"] = {"enabled": True}
+        fast = create_strategy(package, config)
+        if fast._polars is None:
+            print(f"{package.name}: no Polars pipeline (is polars installed?)")
+            return 1
+
+        candles = synthetic_ohlcv(args.pair, plain.timeframe, candles=args.check_candles, seed=args.seed)
+        rng = np.random.default_rng(args.seed)
+        for case in range(args.cases + 1):
+            values = sample_parameters(plain, rng) if case else {}
+            set_parameters(plain, values)
+            set_parameters(fast, values)
+            mismatch = _mismatch(_analyze(plain, candles, args.pair), _analyze(fast, candles, args.pair))
+            if mismatch:
+                print(f"{package.name}: case {case} {values}: {mismatch}")
+                return 1
+        print(f"{package.name}: {args.cases + 1} parameter sets x {len(candles)} candles agree")
+
+        candles = synthetic_ohlcv(args.pair, plain.timeframe, candles=args.candles, seed=args.seed)
+        timings = {}
+        for name, strategy in (("pandas", plain), ("polars", fast)):
+            # Different pair per run: IchiV1 keeps per-pair pullback moments between calls.
+            _analyze(strategy, candles.iloc[:1000], f"warmup-{name}")
+            started = time.perf_counter()
+            _analyze(strategy, candles, f"bench-{name}")
+            timings[name] = time.perf_counter() - started
+        print(
+            f"{package.name}: {len(candles)} candles: pandas {timings['pandas']:.3f}s, "
+            f"polars {timings['polars']:.3f}s ({timings['pandas'] / timings['polars']:.1f}x)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,189 @@
+"""
+Check the Welford rolling moments and IchiV1's pullback detection built on them.
+
+Compares `freqhub_common.rolling.RollingMoments` with pandas' rolling
+mean/std (to a relative tolerance: the two sum in a different order),
+checks that batch, O(1) append and any mix of the two give bit-identical
+results, that `pullback_flag` matches the original pandas pct_outlier
+version, and that `RollingMomentsIndex` on a live-like moving window agrees
+with the full-history computation. Then times pandas against the batch
+mode on `--candles` candles. Exits with status 1 on a mismatch.
+
+    python -m tools.check_rolling
+    python -m tools.check_rolling --check-candles 50000 --candles 2000000 --window 50
+"""
+
+import argparse
+import time
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from freqhub_common.pullback import detect_pullback
+from freqhub_common.rolling import RollingMoments, RollingMomentsIndex
+
+from tools.fixtures import synthetic_ohlcv
+
+
+def reference_pullback(dataframe: DataFrame, periods: int) -> DataFrame:
+    """
+    pct_outlier as IchiV1 computed it with pandas rolling windows.
+    """
+    df = dataframe.copy()
+    df["pb_pct_change"] = df["close"].pct_change()
+    df["pb_mean"] = df["pb_pct_change"].rolling(window=periods).mean()
+    df["pb_std"] = df["pb_pct_change"].rolling(window=periods).std()
+    df["pb_zscore"] = (df["pb_pct_change"] - df["pb_mean"]) / df["pb_std"]
+    df["pullback_flag"] = np.where(df["pb_zscore"] >= 2.0, 1, 0)
+    df["pullback_flag"] = np.where(df["pb_zscore"] <= -2.0, -1, df["pullback_flag"])
+    return df
+
+
+def _same(a: np.ndarray, b: np.ndarray) -> bool:
+    return np.array_equal(a, b, equal_nan=True)
+
+
+def _close(expected: np.ndarray, actual: np.ndarray, scale: float) -> Optional[int]:
+    """
+    First row where the two differ beyond rounding noise (or in NaN-ness).
+    """
+    differs = np.isnan(expected) != np.isnan(actual)
+    with np.errstate(invalid="ignore"):
+        differs |= np.abs(expected - actual) > 1e-9 * np.maximum(np.abs(expected), scale)
+    rows = np.flatnonzero(differs)
+    return int(rows[0]) if len(rows) else None
+
+
+def check_modes(rng: np.random.Generator, cases: int) -> Optional[str]:
+    """
+    Random series with NaN gaps and level shifts: append vs batch vs pandas.
+    """
+    for case in range(cases):
+        n = int(rng.integers(1, 400))
+        window = int(rng.integers(2, 40))
+        resync = int(rng.integers(1, 64))
+        values = rng.normal(0.0, 1.0, n) * 10 ** rng.uniform(-3, 3) + rng.normal() * 10
+        values[rng.random(n) < 0.02] = np.nan
+
+        appended = RollingMoments(window, resync=resync)
+        rows = [appended.append(v) for v in values]
+        append_mean = np.array([r[0] for r in rows])
+        append_std = np.array([r[1] for r in rows])
+
+        mixed = RollingMoments(window, resync=resync)
+        cut = int(rng.integers(0, n + 1))
+        head_mean, head_std = mixed.batch(values[:cut])
+        middle = [mixed.append(v) for v in values[cut:cut + 2]]
+        tail_mean, tail_std = mixed.batch(values[cut + 2:])
+        mixed_mean = np.concatenate((head_mean, [r[0] for r in middle], tail_mean))
+        mixed_std = np.concatenate((head_std, [r[1] for r in middle], tail_std))
+
+        label = f"case {case} (n={n}, window={window}, resync={resync})"
+        if not (_same(append_mean, mixed_mean) and _same(append_std, mixed_std)):
+            return f"{label}: batch and append differ"
+
+        rolling = pd.Series(values).rolling(window)
+        scale = float(np.nanmax(np.abs(values))) if not np.isnan(values).all() else 1.0
+        # Rounding errors scale with the values, not with the spread, so the
+        # variance is compared relative to the values' magnitude.
+        for name, expected, actual, magnitude in (
+            ("mean", rolling.mean().to_numpy(), append_mean, scale),
+            ("variance", rolling.var().to_numpy(), append_std ** 2, scale ** 2),
+        ):
+            row = _close(expected, actual, magnitude)
+            if row is not None:
+                return f"{label}: {name} at row {row}: pandas {expected[row]!r}, welford {actual[row]!r}"
+    return None
+
+
+def check_pullback(candles: DataFrame, periods: int) -> Optional[str]:
+    expected = reference_pullback(candles, periods)
+    actual = detect_pullback(candles.copy(), periods=periods)
+    scale = float(expected["pb_pct_change"].abs().max())
+    for column, power, magnitude in (("pb_mean", 1, scale), ("pb_std", 2, scale ** 2), ("pb_zscore", 1, 1.0)):
+        want = expected[column].to_numpy() ** power
+        got = actual[column].to_numpy() ** power
+        row = _close(want, got, magnitude)
+        if row is not None:
+            return f"{column} at row {row}: pandas {expected[column].iloc[row]!r}, welford {actual[column].iloc[row]!r}"
+    differs = np.flatnonzero(expected["pullback_flag"].to_numpy() != actual["pullback_flag"].to_numpy())
+    if len(differs):
+        row = int(differs[0])
+        return f"pullback_flag at row {row} (z-score {expected['pb_zscore'].iloc[row]!r})"
+    return None
+
+
+def check_index(candles: DataFrame, periods: int, frame: int) -> Optional[str]:
+    """
+    Slide a `frame`-candle window over the candles like the live bot does
+    and compare each call with the full-history moments.
+    """
+    full = detect_pullback(candles.copy(), periods=periods)
+    scale = float(full["pb_pct_change"].abs().max())
+    index = RollingMomentsIndex(periods)
+    for end in range(frame, len(candles) + 1, 7):
+        window = candles.iloc[end - frame:end].reset_index(drop=True)
+        moments = lambda values: index.moments("pair", window["date"], values)  # noqa: E731
+        live = detect_pullback(window, periods=periods, moments=moments)
+        want = full.iloc[end - frame:end]
+        # Rows whose window is fully inside the frame must agree with the history
+        for column in ("pb_mean", "pb_std"):
+            row = _close(want[column].to_numpy()[periods:], live[column].to_numpy()[periods:], scale)
+            if row is not None:
+                return f"{column} at candle {end - frame + periods + row} of the frame ending at {end}"
+        if not np.array_equal(want["pullback_flag"].to_numpy()[periods:], live["pullback_flag"].to_numpy()[periods:]):
+            return f"pullback_flag in the frame ending at {end}"
+    return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--window", type=int, default=30, help="detect_pullback periods")
+    parser.add_argument("--cases", type=int, default=500, help="Random series for the mode checks")
+    parser.add_argument("--check-candles", type=int, default=20000, help="Candles for the pullback checks")
+    parser.add_argument("--candles", type=int, default=1_000_000, help="Candles for the benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    candles = synthetic_ohlcv("BTC/USDT", "15m", candles=max(args.check_candles, args.candles), seed=args.seed)
+    sample = candles.iloc[: args.check_candles].reset_index(drop=True)
+
+    for name, run in (
+        ("batch/append/pandas", lambda: check_modes(rng, args.cases)),
+        ("pullback_flag", lambda: check_pullback(sample, args.window)),
+        ("moving window", lambda: check_index(sample.iloc[:3000], args.window, 500)),
+    ):
+        mismatch = run()
+        if mismatch:
+            print(f"{name}: {mismatch}")
+            return 1
+        print(f"{name}: ok")
+
+    values = candles["close"].iloc[: args.candles].pct_change().to_numpy()
+    timings = {}
+    started = time.perf_counter()
+    rolling = pd.Series(values).rolling(args.window)
+    rolling.mean()
+    rolling.std()
+    timings["pandas"] = time.perf_counter() - started
+    started = time.perf_counter()
+    RollingMoments(args.window).batch(values)
+    timings["welford"] = time.perf_counter() - started
+    moments = RollingMoments(args.window)
+    moments.batch(values[:-1000])
+    started = time.perf_counter()
+    for value in values[-1000:]:
+        moments.append(value)
+    append = (time.perf_counter() - started) / 1000
+    print(
+        f"{len(values)} values: pandas {timings['pandas']:.3f}s, welford batch {timings['welford']:.3f}s, "
+        f"append {append * 1e6:.1f}us per value"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,126 @@
+"""
+Check the Markov strategies' signal memo against plain signal computation.
+
+Analyzes synthetic candles once per strategy, then runs `--epochs`
+hyperopt-like epochs: draws new values for the parameters of `--spaces`,
+computes entry/exit signals with and without `freqhub.signal_memo` and
+requires identical `enter_*`/`exit_*` columns. The memo is pickled and
+restored between epochs, as hyperopt does with the strategy for every job.
+Then `--analyze-epochs` more epochs also redraw the buy space and analyze
+the candles again before the signals, as hyperopt's `analyze_per_epoch`
+does: indicator columns change with the same frame shape, and the memo
+must not return the previous epoch's signals. Reports hit rate, memo size
+and the time of both variants. Exits with status 1 on a mismatch.
+
+    python -m tools.check_signal_memo
+    python -m tools.check_signal_memo --strategies Markov --spaces buy sell --epochs 500 --candles 50000
+    python -m tools.check_signal_memo --strategies MarkovFastEMA --epochs 0 --analyze-epochs 50
+"""
+
+import argparse
+import pickle
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from tools.fixtures import synthetic_ohlcv
+from tools.strategy_loader import create_strategy, discover, offline_config, sample_parameters, set_parameters
+
+MARKOV_STRATEGIES = ["Markov", "MarkovFastEMA", "MarkovRSI", "MarkovVolume"]
+SIGNAL_COLUMNS = ("enter_long", "enter_short", "enter_tag", "exit_long", "exit_short", "exit_tag")
+ANALYZE_SPACES = ["buy", "sell"]
+
+
+def _signals(strategy, dataframe, pair: str):
+    result = strategy.ft_advise_signals(dataframe.copy(), {"pair": pair})
+    return {c: result[c].to_numpy() for c in SIGNAL_COLUMNS if c in result.columns}
+
+
+def _same(expected: dict, actual: dict) -> Optional[str]:
+    if expected.keys() != actual.keys():
+        return f"columns {sorted(expected)} != {sorted(actual)}"
+    for column, want in expected.items():
+        got = actual[column]
+        if want.dtype.kind == "f":
+            equal = np.array_equal(want, got, equal_nan=True)
+        else:
+            equal = np.array_equal(want.astype(object), got.astype(object))
+        if not equal:
+            return f"column {column}"
+    return None
+
+
+def _epochs(plain, memoized, candles: dict, spaces: List[str], epochs: int, rng, timings: dict,
+            analyze: bool) -> Optional[str]:
+    """
+    Run `epochs` epochs; the first mismatch, or None. Without `analyze` the
+    candles are analyzed once, under the current parameters.
+    """
+    analyzed = {pair: plain.advise_indicators(frame.copy(), {"pair": pair}) for pair, frame in candles.items()}
+    for epoch in range(epochs):
+        values = sample_parameters(plain, rng, spaces)
+        set_parameters(plain, values)
+        set_parameters(memoized, values)
+        memoized._signal_memo = pickle.loads(pickle.dumps(memoized._signal_memo))
+        if analyze:
+            analyzed = {pair: plain.advise_indicators(frame.copy(), {"pair": pair}) for pair, frame in candles.items()}
+        for pair, dataframe in analyzed.items():
+            started = time.perf_counter()
+            expected = _signals(plain, dataframe, pair)
+            timings["plain"] += time.perf_counter() - started
+            started = time.perf_counter()
+            actual = _signals(memoized, dataframe, pair)
+            timings["memo"] += time.perf_counter() - started
+            mismatch = _same(expected, actual)
+            if mismatch:
+                return f"epoch {epoch} {pair} {values}: {mismatch} differs"
+    return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--strategies", nargs="+", default=MARKOV_STRATEGIES)
+    parser.add_argument("--spaces", nargs="+", default=["sell"], help="Parameter spaces each epoch redraws")
+    parser.add_argument("--epochs", type=int, default=200)
+    parser.add_argument(
+        "--analyze-epochs", type=int, default=20, help="Epochs that also redraw the buy space and re-analyze"
+    )
+    parser.add_argument("--candles", type=int, default=26000, help="1h candles per pair (26000 = ~3 years)")
+    parser.add_argument("--pairs", nargs="+", default=["BTC/USDT", "ETH/USDT"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for package in discover(args.strategies):
+        config = offline_config(package)
+        plain = create_strategy(package, config)
+        config["freqhub"]["signal_memo"] = {"enabled": True}
+        memoized = create_strategy(package, config)
+        if memoized._signal_memo is None:
+            print(f"{package.name}: no signal memo")
+            return 1
+
+        candles = {
+            pair: synthetic_ohlcv(pair, plain.timeframe, candles=args.candles, seed=args.seed) for pair in args.pairs
+        }
+        rng = np.random.default_rng(args.seed)
+        timings = {"plain": 0.0, "memo": 0.0}
+        mismatch = _epochs(plain, memoized, candles, args.spaces, args.epochs, rng, timings, analyze=False)
+        if mismatch is None:
+            mismatch = _epochs(plain, memoized, candles, ANALYZE_SPACES, args.analyze_epochs, rng, timings, analyze=True)
+        if mismatch:
+            print(f"{package.name}: {mismatch}")
+            return 1
+
+        memo = memoized._signal_memo
+        print(
+            f"{package.name}: {args.epochs} + {args.analyze_epochs} re-analyzed epochs x {len(args.pairs)} pairs agree; "
+            f"hit rate {memo.hit_rate:.0%} ({memo.stats['hits']} hits, {memo.stats['misses']} misses, "
+            f"{memo.stats['evictions']} evictions, {len(memo)} entries, {memo.bytes / 1e6:.1f} MB); "
+            f"signals {timings['plain']:.2f}s plain, {timings['memo']:.2f}s memo"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,131 @@
+"""
+Check that IchiV1's scalar and vectorized custom_stoploss agree exactly with the original.
+
+Draws random stoploss parameter sets from the hyperopt ranges of
+pHSL/pPF_1/pSL_1/pPF_2/pSL_2 (including the corners), evaluates random and
+edge-case profits (curve breakpoints, -100%, the invalid-return boundary)
+through the original scalar formula, `custom_stoploss` and
+`custom_stoploss_batch`, and reports the first mismatch. Exits with status
+1 if any value differs.
+
+    python -m tools.check_stoploss
+    python -m tools.check_stoploss --cases 2000 --profits 5000 --seed 7
+"""
+
+import argparse
+import itertools
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from freqtrade.strategy import stoploss_from_open
+
+from freqhub_common.stoploss import batch_matches_freqtrade
+from tools.strategy_loader import create_strategy, discover
+
+PARAMETERS = ("pHSL", "pPF_1", "pSL_1", "pPF_2", "pSL_2")
+
+
+def _parameter_grid(strategy, rng: np.random.Generator, cases: int) -> List[tuple]:
+    """
+    `cases` random parameter sets plus every corner of the search space,
+    rounded like the DecimalParameters round them.
+    """
+    params = [getattr(strategy, name) for name in PARAMETERS]
+    corners = list(itertools.product(*[(p.low, p.high) for p in params]))
+    random_sets = [
+        tuple(round(float(rng.uniform(p.low, p.high)), p.decimals) for p in params) for _ in range(cases)
+    ]
+    return [tuple(float(v) for v in values) for values in corners] + random_sets
+
+
+def _profits(values: tuple, rng: np.random.Generator, count: int) -> np.ndarray:
+    hsl, pf_1, sl_1, pf_2, sl_2 = values
+    edges = [-1.0, -0.99, -0.5, hsl, 0.0, -0.0, pf_1, pf_2, sl_1, sl_2, 1.0, 10.0]
+    edges += [np.nextafter(v, np.inf) for v in (pf_1, pf_2, hsl, sl_1, sl_2)]
+    edges += [np.nextafter(v, -np.inf) for v in (pf_1, pf_2, hsl, sl_1, sl_2)]
+    return np.concatenate([np.array(edges), rng.uniform(-0.5, 0.5, count), rng.uniform(-1.0, 3.0, count // 4)])
+
+
+def reference_stoploss(self, current_profit: float) -> float:
+    """
+    IchiV1's original custom_stoploss (reading the parameters on every call).
+    """
+    HSL = self.pHSL.value
+    PF_1 = self.pPF_1.value
+    SL_1 = self.pSL_1.value
+    PF_2 = self.pPF_2.value
+    SL_2 = self.pSL_2.value
+
+    if (current_profit > PF_2):
+        sl_profit = SL_2 + (current_profit - PF_2)
+    elif (current_profit > PF_1):
+        sl_profit = SL_1 + ((current_profit - PF_1) * (SL_2 - SL_1) / (PF_2 - PF_1))
+    else:
+        sl_profit = HSL
+
+    # Only for hyperopt invalid return
+    if (sl_profit >= current_profit):
+        return -0.99
+
+    return stoploss_from_open(sl_profit, current_profit)
+
+
+def _same(a: float, b: float) -> bool:
+    return a == b or (np.isnan(a) and np.isnan(b))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", type=int, default=500, help="Random parameter sets")
+    parser.add_argument("--profits", type=int, default=2000, help="Random profits per parameter set")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    package = discover(["IchiV1"])[0]
+    strategy = create_strategy(package, package.load_config(prefer_example=True))
+    rng = np.random.default_rng(args.seed)
+
+    checked = 0
+    reference_time = scalar_time = batch_time = 0.0
+    for values in _parameter_grid(strategy, rng, args.cases):
+        for name, value in zip(PARAMETERS, values):
+            getattr(strategy, name).value = value
+        # Where Freqtrade would refresh it (bot_start, populate_entry_trend)
+        strategy.stoploss_curve()
+        profits = _profits(values, rng, args.profits)
+
+        started = time.perf_counter()
+        expected = [reference_stoploss(strategy, float(p)) for p in profits]
+        reference_time += time.perf_counter() - started
+
+        started = time.perf_counter()
+        scalar = [strategy.custom_stoploss("", None, None, 0.0, float(p)) for p in profits]
+        scalar_time += time.perf_counter() - started
+
+        started = time.perf_counter()
+        actual = strategy.custom_stoploss_batch(profits)
+        batch_time += time.perf_counter() - started
+
+        for profit, want, got, vector in zip(profits, expected, scalar, actual.tolist()):
+            if not (_same(want, got) and _same(want, vector)):
+                print(
+                    f"Mismatch for {strategy.stoploss_curve()} at profit {profit!r}: "
+                    f"original {want!r}, custom_stoploss {got!r}, batch {vector!r}"
+                )
+                return 1
+        checked += len(profits)
+
+    print(f"{checked} evaluations agree exactly")
+    print(f"batch uses the vectorized stoploss_from_open: {batch_matches_freqtrade()}")
+    print(
+        f"original: {reference_time:.3f}s, custom_stoploss: {scalar_time:.3f}s "
+        f"({reference_time / max(scalar_time, 1e-9):.1f}x), batch: {batch_time:.3f}s "
+        f"({scalar_time / max(batch_time, 1e-9):.0f}x)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
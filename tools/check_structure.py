@@ -0,0 +1,178 @@
+"""
+Check FailureToReturn's fused structure kernel against the rolling/ffill version.
+
+Computes impulse, impulse level, pullback zone, recent pullback and
+re-engulf for both sides with the original pandas expressions and with
+`freqhub_common.structure.ftr_structure`, for the default parameters, the
+corners of the hyperopt ranges and random draws from them, and reports the
+first column that differs (floats must match exactly, NaN matching NaN).
+Then times both on `--candles` candles. Exits with status 1 on a mismatch.
+
+    python -m tools.check_structure
+    python -m tools.check_structure --cases 200 --check-candles 50000 --candles 2000000
+"""
+
+import argparse
+import itertools
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import talib.abstract as ta
+from pandas import DataFrame
+
+from freqhub_common.structure import FTR_COLUMNS, ftr_structure
+
+from tools.fixtures import synthetic_ohlcv
+from tools.strategy_loader import create_strategy, discover, offline_config, sample_parameters
+
+PARAMETERS = (
+    "sr_lookback",
+    "pullback_lookback",
+    "impulse_atr",
+    "impulse_body_atr",
+    "pullback_atr",
+    "fail_atr",
+    "reengulf_atr",
+)
+
+
+def reference_structure(dataframe: DataFrame, values: Dict[str, float]) -> DataFrame:
+    """
+    The structure columns as FailureToReturn computed them with pandas.
+    `dataframe` needs `atr`, `swing_high` and `swing_low`.
+    """
+    df = dataframe.copy()
+    pullback_window = int(values["pullback_lookback"])
+    body = (df["close"] - df["open"]).abs()
+
+    df["impulse"] = (
+        (df["close"] > df["swing_high"] + df["atr"] * values["impulse_atr"]) &
+        (body > df["atr"] * values["impulse_body_atr"])
+    )
+    df["impulse_short"] = (
+        (df["close"] < df["swing_low"] - df["atr"] * values["impulse_atr"]) &
+        (body > df["atr"] * values["impulse_body_atr"])
+    )
+
+    df["impulse_level"] = df["swing_high"].where(df["impulse"]).ffill(limit=pullback_window)
+    df["impulse_level_short"] = df["swing_low"].where(df["impulse_short"]).ffill(limit=pullback_window)
+    df["recent_impulse"] = df["impulse_level"].notna()
+    df["recent_impulse_short"] = df["impulse_level_short"].notna()
+
+    df["pullback_zone"] = (
+        df["recent_impulse"] &
+        (df["low"] <= df["impulse_level"] + df["atr"] * values["pullback_atr"]) &
+        (df["low"] >= df["impulse_level"] - df["atr"] * values["fail_atr"])
+    )
+    df["pullback_zone_short"] = (
+        df["recent_impulse_short"] &
+        (df["high"] >= df["impulse_level_short"] - df["atr"] * values["pullback_atr"]) &
+        (df["high"] <= df["impulse_level_short"] + df["atr"] * values["fail_atr"])
+    )
+
+    for side in ("", "_short"):
+        df[f"pullback_recent{side}"] = (
+            df[f"pullback_zone{side}"].shift(1).rolling(window=pullback_window).max().fillna(0).astype(bool)
+        )
+
+    df["reengulf"] = df["recent_impulse"] & (
+        df["close"] > df["impulse_level"] + df["atr"] * values["reengulf_atr"]
+    )
+    df["reengulf_short"] = df["recent_impulse_short"] & (
+        df["close"] < df["impulse_level_short"] - df["atr"] * values["reengulf_atr"]
+    )
+    return df[list(FTR_COLUMNS)]
+
+
+def fused_structure(dataframe: DataFrame, values: Dict[str, float]) -> Dict[str, np.ndarray]:
+    return ftr_structure(
+        *(dataframe[c].to_numpy(dtype="float64") for c in ("open", "high", "low", "close", "atr")),
+        dataframe["swing_high"].to_numpy(dtype="float64"),
+        dataframe["swing_low"].to_numpy(dtype="float64"),
+        int(values["pullback_lookback"]),
+        values["impulse_atr"],
+        values["impulse_body_atr"],
+        values["pullback_atr"],
+        values["fail_atr"],
+        values["reengulf_atr"],
+    )
+
+
+def prepare(candles: DataFrame, lookback: int) -> DataFrame:
+    dataframe = candles.copy()
+    dataframe["atr"] = ta.ATR(dataframe, timeperiod=14)
+    dataframe["swing_high"] = dataframe["high"].rolling(lookback).max().shift(1)
+    dataframe["swing_low"] = dataframe["low"].rolling(lookback).min().shift(1)
+    return dataframe
+
+
+def first_mismatch(expected: DataFrame, actual: Dict[str, np.ndarray]) -> Optional[str]:
+    for column in FTR_COLUMNS:
+        want = expected[column].to_numpy()
+        got = actual[column]
+        if want.dtype == bool:
+            got = got.astype(bool)
+            differs = want != got
+        else:
+            differs = ~((want == got) | (np.isnan(want) & np.isnan(got)))
+        if differs.any():
+            row = int(np.flatnonzero(differs)[0])
+            return f"{column} at row {row}: expected {want[row]!r}, got {got[row]!r}"
+    return None
+
+
+def _parameter_sets(strategy, rng: np.random.Generator, cases: int) -> List[Dict[str, float]]:
+    params = {name: getattr(strategy, name) for name in PARAMETERS}
+    sets = [{name: p.value for name, p in params.items()}]
+    for corner in itertools.product(*[(p.low, p.high) for p in params.values()]):
+        sets.append(dict(zip(params, corner)))
+    for _ in range(cases):
+        drawn = sample_parameters(strategy, rng, ["buy"])
+        sets.append({name: drawn[name] for name in PARAMETERS})
+    return sets
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", type=int, default=50, help="Random parameter sets besides defaults and corners")
+    parser.add_argument("--check-candles", type=int, default=20000, help="Candles per equivalence check")
+    parser.add_argument("--candles", type=int, default=1_000_000, help="Candles for the benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    package = discover(["FailureToReturn"])[0]
+    strategy = create_strategy(package, offline_config(package))
+    rng = np.random.default_rng(args.seed)
+
+    candles = synthetic_ohlcv("BTC/USDT", "5m", candles=max(args.check_candles, args.candles), seed=args.seed)
+    sample = candles.iloc[: args.check_candles].reset_index(drop=True)
+    prepared = {}
+    sets = _parameter_sets(strategy, rng, args.cases)
+    for values in sets:
+        lookback = int(values["sr_lookback"])
+        if lookback not in prepared:
+            prepared[lookback] = prepare(sample, lookback)
+        dataframe = prepared[lookback]
+        mismatch = first_mismatch(reference_structure(dataframe, values), fused_structure(dataframe, values))
+        if mismatch:
+            print(f"Mismatch for {values}: {mismatch}")
+            return 1
+    print(f"{len(sets)} parameter sets x {len(sample)} candles agree exactly")
+
+    values = sets[0]
+    dataframe = prepare(candles.iloc[: args.candles], int(values["sr_lookback"]))
+    timings = {}
+    for name, compute in (("rolling/ffill", reference_structure), ("fused", fused_structure)):
+        started = time.perf_counter()
+        compute(dataframe, values)
+        timings[name] = time.perf_counter() - started
+    print(
+        f"{len(dataframe)} candles: rolling/ffill {timings['rolling/ffill']:.3f}s, "
+        f"fused {timings['fused']:.3f}s ({timings['rolling/ffill'] / max(timings['fused'], 1e-9):.1f}x)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
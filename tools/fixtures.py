@@ -0,0 +1,162 @@
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from freqtrade.enums import RunMode
+from freqtrade.exchange import timeframe_to_minutes, timeframe_to_seconds
+
+RESOLUTION_MINUTES = 5
+
+
+def synthetic_ohlcv(
+    pair: str,
+    timeframe: str,
+    start: str = "2024-01-01",
+    candles: Optional[int] = None,
+    end: Optional[str] = None,
+    seed: int = 0,
+) -> DataFrame:
+    """
+    Deterministic random-walk OHLCV candles for `pair`.
+
+    The price path is generated on a 5-minute grid starting at `start` and
+    aggregated into `timeframe` candles, so the same (pair, start, seed)
+    gives consistent candles in every timeframe (e.g. 15m and 1h fixtures
+    aggregate to the same 1h candles). `start` should be aligned to the
+    largest timeframe in use.
+    """
+    minutes = timeframe_to_minutes(timeframe)
+    resolution = RESOLUTION_MINUTES if minutes % RESOLUTION_MINUTES == 0 else 1
+    substeps = minutes // resolution
+    start_ts = pd.Timestamp(start, tz="UTC").floor(f"{minutes}min")
+    if candles is None:
+        if end is None:
+            raise ValueError("Either candles or end is required.")
+        end_ts = pd.Timestamp(end, tz="UTC")
+        candles = max(int((end_ts - start_ts) / pd.Timedelta(minutes=minutes)), 0)
+
+    rng = np.random.default_rng(zlib.crc32(f"{pair}:{seed}".encode()))
+    # One row per grid step, so any prefix of the path is stable.
+    noise = rng.standard_normal((candles * substeps, 2))
+    steps = noise[:, 0] * 0.0015 * np.sqrt(resolution)
+    volumes = np.exp(3.0 + 0.6 * noise[:, 1])
+    base = 10.0 + zlib.crc32(pair.encode()) % 1000
+    path = base * np.exp(np.cumsum(steps))
+
+    shaped = path.reshape(candles, substeps)
+    volume = volumes.reshape(candles, substeps).sum(axis=1)
+    close = shaped[:, -1]
+    open_ = np.r_[base, close[:-1]][:candles]
+    high = np.maximum(shaped.max(axis=1), open_)
+    low = np.minimum(shaped.min(axis=1), open_)
+
+    return DataFrame(
+        {
+            "date": pd.date_range(start_ts, periods=candles, freq=f"{minutes}min"),
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": volume,
+        }
+    )
+
+
+def load_candles(
+    pair: str,
+    timeframes: List[str],
+    candles: int,
+    start: str = "2024-01-01",
+    datadir: Optional[Path] = None,
+    data_format: Optional[str] = None,
+    seed: int = 0,
+) -> Dict[Tuple[str, str], DataFrame]:
+    """
+    `candles` candles of the first timeframe for `pair`, plus the other
+    timeframes over the same period: the last candles of the stored history
+    in `datadir`, or synthetic candles starting at `start`.
+    """
+    base_minutes = timeframe_to_minutes(timeframes[0])
+    result = {}
+    if datadir is None:
+        for timeframe in timeframes:
+            count = max(candles * base_minutes // timeframe_to_minutes(timeframe), 1)
+            result[(pair, timeframe)] = synthetic_ohlcv(pair, timeframe, start=start, candles=count, seed=seed)
+        return result
+
+    from freqtrade.data.history import load_pair_history
+
+    base = load_pair_history(pair, timeframes[0], Path(datadir), data_format=data_format).tail(candles)
+    if base.empty:
+        raise ValueError(f"No {timeframes[0]} candles for {pair} in {datadir}")
+    result[(pair, timeframes[0])] = base.reset_index(drop=True)
+    for timeframe in timeframes[1:]:
+        history = load_pair_history(pair, timeframe, Path(datadir), data_format=data_format)
+        result[(pair, timeframe)] = history[history["date"] >= base["date"].iloc[0]].reset_index(drop=True)
+    return result
+
+
+def truncate_candles(
+    candles: Dict[Tuple[str, str], DataFrame], timeframe: str, rows: int, start: int = 0
+) -> Dict[Tuple[str, str], DataFrame]:
+    """
+    What a live bot would have seen after the first `rows` candles of
+    `timeframe`: that prefix, and only the closed candles of every other
+    timeframe. With `start`, history begins at that candle instead.
+    """
+    base = next(df for (_, tf), df in candles.items() if tf == timeframe)
+    first = base["date"].iloc[start]
+    close = base["date"].iloc[rows - 1] + pd.Timedelta(seconds=timeframe_to_seconds(timeframe))
+    result = {}
+    for (pair, tf), dataframe in candles.items():
+        if tf == timeframe:
+            result[(pair, tf)] = dataframe.iloc[start:rows].reset_index(drop=True)
+        else:
+            kept = (dataframe["date"] >= first) & (
+                dataframe["date"] + pd.Timedelta(seconds=timeframe_to_seconds(tf)) <= close
+            )
+            result[(pair, tf)] = dataframe[kept].reset_index(drop=True)
+    return result
+
+
+class FixtureDataProvider:
+    """
+    In-memory stand-in for Freqtrade's DataProvider, for offline tools.
+
+    Serves candles from a `{(pair, timeframe): DataFrame}` mapping and
+    implements the subset of the DataProvider API our strategies use.
+    """
+
+    def __init__(
+        self,
+        candles: Dict[Tuple[str, str], DataFrame],
+        runmode: RunMode = RunMode.BACKTEST,
+        whitelist: Optional[List[str]] = None,
+    ):
+        self.candles = candles
+        self.runmode = runmode
+        self._whitelist = whitelist or sorted({pair for pair, _ in candles})
+        self.messages: List[str] = []
+
+    def current_whitelist(self) -> List[str]:
+        return list(self._whitelist)
+
+    def get_pair_dataframe(self, pair: str, timeframe: Optional[str] = None, candle_type: str = "") -> DataFrame:
+        return self.candles.get((pair, timeframe), DataFrame()).copy()
+
+    def ohlcv(self, pair: str, timeframe: Optional[str] = None, copy: bool = True, candle_type: str = "") -> DataFrame:
+        dataframe = self.candles.get((pair, timeframe), DataFrame())
+        return dataframe.copy() if copy else dataframe
+
+    historic_ohlcv = ohlcv
+
+    def send_msg(self, message: str, *, always_send: bool = False) -> None:
+        self.messages.append(message)
+
+    def market(self, pair: str) -> Optional[dict]:
+        base, _, quote = pair.partition("/")
+        return {"base": base, "quote": quote.split(":")[0]}
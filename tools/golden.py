@@ -0,0 +1,323 @@
+"""
+Golden-signal regression check with wall-time and memory budgets.
+
+Runs every strategy (or `--strategies`) with its default parameters on the
+checked-in fixture candles in `golden/candles` (three pairs, 5m/15m/1h over
+the same three weeks, so informative timeframes are served too) and
+compares the result with `golden/signals/<strategy>.json`:
+
+- `enter_*`/`exit_*` columns exactly, on every row,
+- every other column the strategy adds (indicators) on every
+  `stride`-th row, floats to a relative tolerance, NaN matching NaN.
+
+Then analyzes all pairs again and enforces the strategy's budgets in
+`golden/budgets.json`: the best of `--repeat` timings of one run (each
+timing averages back-to-back runs over at least `SAMPLE_SECONDS`, so short
+runs are measurable), and the peak of traced allocations (tracemalloc)
+during one run. Exits with status 1 on
+any difference or exceeded budget.
+
+    python -m tools.golden check
+    python -m tools.golden check --strategies IchiV1 FailureToReturn --time-scale 2
+    python -m tools.golden record --strategies IchiV1
+    python -m tools.golden record --fixtures
+
+`record` rewrites the golden files (and, unless `--keep-budgets`, the
+budgets: measured values with `TIME_HEADROOM`/`MEMORY_HEADROOM`) of the
+strategies it runs; do it only for an intended behavior change, and review
+the diff. `--fixtures` regenerates the candles first and records every
+strategy. `--time-scale` loosens the time budgets on slower machines.
+"""
+
+import argparse
+import json
+import math
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from tools.fixtures import FixtureDataProvider, synthetic_ohlcv
+from tools.strategy_loader import StrategyPackage, analyze, create_strategy, discover, offline_config
+
+GOLDEN_DIR = Path(__file__).resolve().parent.parent / "golden"
+CANDLES_DIR = GOLDEN_DIR / "candles"
+SIGNALS_DIR = GOLDEN_DIR / "signals"
+BUDGETS_PATH = GOLDEN_DIR / "budgets.json"
+
+PAIRS = ("BTC/USDT", "ETH/USDT", "SOL/USDT")
+TIMEFRAMES = ("5m", "15m", "1h")
+FIXTURE_START = "2024-01-01"
+FIXTURE_END = "2024-01-22"
+# Prices with 4 decimals, volumes with 2: compact files that read back exactly.
+PRICE_DECIMALS = 4
+VOLUME_DECIMALS = 2
+
+OHLCV_COLUMNS = ("date", "open", "high", "low", "close", "volume")
+SIGNAL_PREFIXES = ("enter_", "exit_")
+STRIDE = 25
+SIGNIFICANT_DIGITS = 12
+RTOL = 1e-9
+TIME_HEADROOM = 3.0
+MEMORY_HEADROOM = 1.5
+# Shortest timing: runs are repeated until it has passed, and averaged.
+SAMPLE_SECONDS = 0.2
+MB = 1024 * 1024
+
+
+def _candle_path(pair: str, timeframe: str) -> Path:
+    return CANDLES_DIR / f"{pair.replace('/', '_')}-{timeframe}.csv.gz"
+
+
+def write_fixtures() -> None:
+    CANDLES_DIR.mkdir(parents=True, exist_ok=True)
+    for pair in PAIRS:
+        for timeframe in TIMEFRAMES:
+            candles = synthetic_ohlcv(pair, timeframe, start=FIXTURE_START, end=FIXTURE_END)
+            candles[["open", "high", "low", "close"]] = candles[["open", "high", "low", "close"]].round(PRICE_DECIMALS)
+            candles["volume"] = candles["volume"].round(VOLUME_DECIMALS)
+            # mtime 0: the same candles give the same file
+            candles.to_csv(
+                _candle_path(pair, timeframe),
+                index=False,
+                date_format="%Y-%m-%dT%H:%M:%SZ",
+                compression={"method": "gzip", "mtime": 0},
+            )
+
+
+def load_fixtures() -> Dict[Tuple[str, str], DataFrame]:
+    candles = {}
+    for pair in PAIRS:
+        for timeframe in TIMEFRAMES:
+            dataframe = pd.read_csv(_candle_path(pair, timeframe))
+            dataframe["date"] = pd.to_datetime(dataframe["date"], utc=True)
+            candles[(pair, timeframe)] = dataframe
+    return candles
+
+
+def run(package: StrategyPackage, candles: Dict[Tuple[str, str], DataFrame]) -> Dict[str, DataFrame]:
+    """
+    Every pair's analyzed dataframe, from a new strategy instance (some keep
+    per-pair state between calls).
+    """
+    strategy = create_strategy(package, offline_config(package), dp=FixtureDataProvider(candles, whitelist=list(PAIRS)))
+    return {pair: analyze(strategy, candles, pair) for pair in PAIRS}
+
+
+def _value(value):
+    if isinstance(value, (bool, np.bool_)):
+        return int(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        if math.isnan(value):
+            return None
+        if math.isinf(value):
+            return "inf" if value > 0 else "-inf"
+        return float(f"{value:.{SIGNIFICANT_DIGITS}g}")
+    return None if pd.isna(value) else str(value)
+
+
+def snapshot(analyzed: Dict[str, DataFrame], stride: int = STRIDE) -> dict:
+    """
+    Golden contents: per pair the rows, the rows of every signal (tags by
+    row) and every `stride`-th value of every other added column.
+    """
+    pairs = {}
+    for pair, dataframe in analyzed.items():
+        signals, indicators = {}, {}
+        for column in dataframe.columns:
+            if column in OHLCV_COLUMNS:
+                continue
+            series = dataframe[column]
+            if column.startswith(SIGNAL_PREFIXES):
+                if series.dtype == object or str(series.dtype) in ("str", "string"):
+                    signals[column] = {str(row): str(tag) for row, tag in series.dropna().items() if tag != ""}
+                else:
+                    signals[column] = np.flatnonzero(series.to_numpy() == 1).tolist()
+            else:
+                indicators[column] = [_value(value) for value in series.iloc[::stride]]
+        pairs[pair] = {"rows": len(dataframe), "signals": signals, "indicators": indicators}
+    return {"stride": stride, "pairs": pairs}
+
+
+def _close(expected: list, actual: list) -> Optional[int]:
+    """
+    First index where two sampled columns differ, or None.
+    """
+    numbers = [abs(v) for v in expected if isinstance(v, float)]
+    scale = max(numbers) if numbers else 1.0
+    for index, (want, got) in enumerate(zip(expected, actual)):
+        if isinstance(want, float) and isinstance(got, float):
+            if abs(want - got) > RTOL * max(abs(want), scale):
+                return index
+        elif want != got:
+            return index
+    return None if len(expected) == len(actual) else min(len(expected), len(actual))
+
+
+def compare(golden: dict, current: dict) -> List[str]:
+    problems = []
+    stride = golden["stride"]
+    for pair, want in golden["pairs"].items():
+        got = current["pairs"].get(pair)
+        if got is None:
+            problems.append(f"{pair}: not analyzed")
+            continue
+        if want["rows"] != got["rows"]:
+            problems.append(f"{pair}: {got['rows']} rows, golden {want['rows']}")
+            continue
+        for column in sorted(set(want["signals"]) | set(got["signals"])):
+            expected, actual = want["signals"].get(column, []), got["signals"].get(column, [])
+            if expected == actual:
+                continue
+            if isinstance(expected, dict) or isinstance(actual, dict):
+                problems.append(f"{pair}: {column} tags differ")
+                continue
+            first = min(set(expected) ^ set(actual))
+            problems.append(
+                f"{pair}: {column} on {len(actual)} rows, golden {len(expected)} (first difference at row {first})"
+            )
+        for column, expected in want["indicators"].items():
+            actual = got["indicators"].get(column)
+            if actual is None:
+                problems.append(f"{pair}: indicator {column} missing")
+                continue
+            index = _close(expected, actual)
+            if index is not None:
+                problems.append(
+                    f"{pair}: {column} at row {index * stride}: "
+                    f"{actual[index] if index < len(actual) else '-'}, golden "
+                    f"{expected[index] if index < len(expected) else '-'}"
+                )
+    return problems
+
+
+def measure(package: StrategyPackage, candles: Dict[Tuple[str, str], DataFrame], repeat: int) -> Dict[str, float]:
+    """
+    Best of `repeat` timings of one run over all pairs (untraced; each
+    averages the runs of at least `SAMPLE_SECONDS`), and the peak of traced
+    allocations during one more run.
+    """
+    seconds = math.inf
+    for _ in range(repeat):
+        runs = 0
+        started = time.perf_counter()
+        while True:
+            run(package, candles)
+            runs += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= SAMPLE_SECONDS:
+                break
+        seconds = min(seconds, elapsed / runs)
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    run(package, candles)
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    if not tracing:
+        tracemalloc.stop()
+    return {"seconds": seconds, "peak_mb": peak / MB}
+
+
+def _golden_path(package: StrategyPackage) -> Path:
+    return SIGNALS_DIR / f"{package.name}.json"
+
+
+def _load_budgets() -> Dict[str, dict]:
+    return json.loads(BUDGETS_PATH.read_text()) if BUDGETS_PATH.exists() else {}
+
+
+def record(packages: List[StrategyPackage], repeat: int, keep_budgets: bool) -> int:
+    candles = load_fixtures()
+    budgets = _load_budgets()
+    SIGNALS_DIR.mkdir(parents=True, exist_ok=True)
+    for package in packages:
+        golden = snapshot(run(package, candles))
+        _golden_path(package).write_text(json.dumps(golden, indent=1, sort_keys=True) + "\n")
+        signals = sum(len(rows) for pair in golden["pairs"].values() for rows in pair["signals"].values())
+        status = f"{package.name}: recorded {signals} signals"
+        if not keep_budgets:
+            measured = measure(package, candles, repeat)
+            budgets[package.name] = {
+                "seconds": round(measured["seconds"] * TIME_HEADROOM, 3),
+                "peak_mb": round(measured["peak_mb"] * MEMORY_HEADROOM + 1, 1),
+            }
+            status += f", {measured['seconds']:.3f}s, peak {measured['peak_mb']:.1f}MB -> budget {budgets[package.name]}"
+        print(status)
+    BUDGETS_PATH.write_text(json.dumps(dict(sorted(budgets.items())), indent=1) + "\n")
+    return 0
+
+
+def check(packages: List[StrategyPackage], repeat: int, time_scale: float, budgets_only: bool) -> int:
+    candles = load_fixtures()
+    budgets = _load_budgets()
+    failed = False
+    for package in packages:
+        path = _golden_path(package)
+        if not path.exists() or package.name not in budgets:
+            print(f"{package.name}: no golden file or budget (python -m tools.golden record --strategies {package.name})")
+            failed = True
+            continue
+
+        problems = [] if budgets_only else compare(json.loads(path.read_text()), snapshot(run(package, candles)))
+        budget = budgets[package.name]
+        measured = measure(package, candles, repeat)
+        if measured["seconds"] > budget["seconds"] * time_scale:
+            problems.append(f"wall time {measured['seconds']:.3f}s over budget {budget['seconds'] * time_scale:.3f}s")
+        if measured["peak_mb"] > budget["peak_mb"]:
+            problems.append(f"peak {measured['peak_mb']:.1f}MB over budget {budget['peak_mb']:.1f}MB")
+
+        summary = (
+            f"{measured['seconds']:.3f}s of {budget['seconds'] * time_scale:.3f}s, "
+            f"peak {measured['peak_mb']:.1f}MB of {budget['peak_mb']:.1f}MB"
+        )
+        if problems:
+            failed = True
+            print(f"{package.name}: FAILED ({summary})")
+            for problem in problems[:20]:
+                print(f"  {problem}")
+            if len(problems) > 20:
+                print(f"  ... {len(problems) - 20} more")
+        else:
+            print(f"{package.name}: ok ({summary})")
+    return 1 if failed else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("check", "record"):
+        command = commands.add_parser(name)
+        command.add_argument("--strategies", nargs="+", help="Default: every strategy")
+        command.add_argument("--repeat", type=int, default=3, help="Timings (the best counts)")
+    commands.choices["check"].add_argument("--time-scale", type=float, default=1.0, help="Multiply time budgets")
+    commands.choices["check"].add_argument("--budgets-only", action="store_true", help="Skip the signal comparison")
+    commands.choices["record"].add_argument("--keep-budgets", action="store_true", help="Only rewrite golden files")
+    commands.choices["record"].add_argument(
+        "--fixtures", action="store_true", help="Regenerate the fixture candles first (records every strategy)"
+    )
+    args = parser.parse_args(argv)
+
+    packages = discover(args.strategies)
+    if not packages:
+        print("No strategies found")
+        return 1
+    if args.command == "record":
+        if args.fixtures:
+            if args.strategies:
+                parser.error("--fixtures records every strategy; leave out --strategies")
+            write_fixtures()
+        return record(packages, args.repeat, args.keep_budgets)
+    return check(packages, args.repeat, args.time_scale, args.budgets_only)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,374 @@
+"""
+Sharded hyperopt: split an epoch budget across worker processes sharing a SQLite study.
+
+Each worker loads the data once, then asks the shared study for the next
+parameter point, backtests it with Freqtrade's hyperopt machinery and
+reports the loss back. Workers see each other's completed trials (the
+sampler learns from all of them), skip parameter points that are already
+done or being evaluated, and stop once the study holds `--epochs` completed
+trials. Interrupt with Ctrl+C and run the same command again to resume;
+raise `--epochs` to extend a finished study.
+
+    python -m tools.hyperopt_shards run --strategy Markov --workers 4 --epochs 800 --timerange 20230101-
+    python -m tools.hyperopt_shards status --strategy Markov
+    python -m tools.hyperopt_shards export --strategy Markov
+
+`run` uses the strategy folder's `config.json` and `user_data/` by default,
+writes the best parameters next to the strategy like `freqtrade hyperopt`
+does, and exports all trials to a `.fthypt` file, so
+`freqtrade hyperopt-list` / `hyperopt-show` work as usual. Requires the
+hyperopt dependencies (optuna), as shipped in the Freqtrade image.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import optuna
+import rapidjson
+from optuna.distributions import CategoricalDistribution, FloatDistribution, IntDistribution
+from optuna.trial import TrialState
+
+from freqtrade.constants import FTHYPT_FILEVERSION, LAST_BT_RESULT_FN
+from freqtrade.misc import file_dump_json
+from tools.strategy_loader import StrategyPackage, discover
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOSS = "SharpeHyperOptLoss"
+DEFAULT_SPACES = ("buy", "sell")
+STORE_NAME = "hyperopt_shards.sqlite"
+# Consecutive duplicate points after which a worker assumes the space is exhausted
+MAX_DUPLICATES = 50
+SQLITE_TIMEOUT = 60
+PROGRESS_SECONDS = 10.0
+RESULT_ATTR = "result"
+
+
+def _storage(store: Path) -> optuna.storages.RDBStorage:
+    return optuna.storages.RDBStorage(
+        f"sqlite:///{store}", engine_kwargs={"connect_args": {"timeout": SQLITE_TIMEOUT}}
+    )
+
+
+def _plain_distributions(dimensions: dict) -> dict:
+    """
+    Freqtrade's distribution subclasses cannot be read back from an optuna
+    storage; the shared study uses the equivalent optuna distributions.
+    """
+    plain = {}
+    for name, dist in dimensions.items():
+        if isinstance(dist, CategoricalDistribution):
+            plain[name] = CategoricalDistribution(list(dist.choices))
+        elif isinstance(dist, IntDistribution):
+            plain[name] = IntDistribution(dist.low, dist.high, log=dist.log, step=dist.step)
+        else:
+            plain[name] = FloatDistribution(dist.low, dist.high, log=dist.log, step=dist.step)
+    return plain
+
+
+def _settings(args: argparse.Namespace, package: StrategyPackage) -> dict:
+    """
+    Everything a worker needs to rebuild the hyperopt configuration.
+    """
+    config = args.config or next(
+        (path for path in (package.folder / "config.json", package.folder / "config.json.example") if path.is_file()),
+        package.folder / "config.json",
+    )
+    userdir = Path(args.userdir or package.folder / "user_data").resolve()
+    return {
+        "config": str(Path(config).resolve()),
+        "strategy": package.class_name,
+        "strategy_path": str(package.folder),
+        "userdir": str(userdir),
+        "datadir": str(Path(args.datadir).resolve()) if args.datadir else None,
+        "spaces": list(args.spaces),
+        "loss": args.hyperopt_loss,
+        "timerange": args.timerange,
+        "min_trades": args.min_trades,
+        "epochs": args.epochs,
+        "store": str(Path(args.store or userdir / "hyperopt_results" / STORE_NAME).resolve()),
+        "study": args.study or f"{package.class_name}-{'-'.join(args.spaces)}",
+    }
+
+
+def build_config(settings: dict) -> dict:
+    from freqtrade.configuration import Configuration
+    from freqtrade.configuration.directory_operations import create_userdata_dir
+    from freqtrade.enums import RunMode
+
+    create_userdata_dir(settings["userdir"], create_dir=True)
+    args = {
+        "config": [settings["config"]],
+        "strategy": settings["strategy"],
+        "strategy_path": settings["strategy_path"],
+        "user_data_dir": settings["userdir"],
+        "spaces": settings["spaces"],
+        "hyperopt_loss": settings["loss"],
+        "epochs": settings["epochs"],
+        "hyperopt_min_trades": settings["min_trades"],
+        "hyperopt_jobs": 1,
+        "disableparamexport": True,
+    }
+    for key, value in (
+        ("datadir", settings["datadir"]),
+        ("timerange", settings["timerange"]),
+    ):
+        if value is not None:
+            args[key] = value
+    return Configuration(args, RunMode.HYPEROPT).get_config()
+
+
+def _serialize(result: dict) -> str:
+    from freqtrade.optimize.hyperopt_tools import hyperopt_serializer
+
+    return rapidjson.dumps(result, default=hyperopt_serializer, number_mode=rapidjson.NM_NATIVE | rapidjson.NM_NAN)
+
+
+def _is_duplicate(study: optuna.Study, trial: optuna.Trial) -> bool:
+    # Completed points, and points other workers are evaluating right now
+    for other in study.get_trials(deepcopy=False, states=(TrialState.COMPLETE, TrialState.RUNNING)):
+        if other.number != trial.number and other.params == trial.params:
+            return True
+    return False
+
+
+def _completed_or_running(study: optuna.Study) -> int:
+    return len(study.get_trials(deepcopy=False, states=(TrialState.COMPLETE, TrialState.RUNNING)))
+
+
+def run_worker(number: int, settings: dict, seed: int) -> None:
+    """
+    One shard: evaluate trials of the shared study until the budget is used.
+    """
+    userdir = Path(settings["userdir"])
+    log_file = userdir / "logs" / f"hyperopt-shard-{number}.log"
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    # Worker output (logs, tracebacks) goes to its own file; the runner prints progress
+    sys.stdout = sys.stderr = log_file.open("a", buffering=1)
+
+    optuna.logging.disable_default_handler()
+    optuna.logging.enable_propagation()
+
+    from freqtrade.optimize.hyperopt.hyperopt_optimizer import HyperOptimizer
+
+    config = build_config(settings)
+    pickle_file = userdir / "hyperopt_results" / f"hyperopt_tickerdata.shard{number}.pkl"
+    hyperopter = HyperOptimizer(config, pickle_file)
+    hyperopter.prepare_hyperopt()
+    dimensions = _plain_distributions(hyperopter.o_dimensions)
+    # Freqtrade's sampler choice (the strategy's generate_estimator), on the shared study
+    sampler = hyperopter.get_optimizer(seed + number).sampler
+    study = optuna.load_study(study_name=settings["study"], storage=_storage(Path(settings["store"])), sampler=sampler)
+
+    duplicates = 0
+    trial = None
+    try:
+        while _completed_or_running(study) < settings["epochs"]:
+            trial = study.ask(dimensions)
+            if _is_duplicate(study, trial):
+                study.tell(trial, state=TrialState.PRUNED)
+                trial = None
+                duplicates += 1
+                if duplicates >= MAX_DUPLICATES:
+                    logger.warning("Shard %s: %s duplicate points in a row, stopping", number, duplicates)
+                    break
+                continue
+            duplicates = 0
+            trial.set_user_attr("worker", number)
+            result = hyperopter.generate_optimizer(dict(trial.params))
+            trial.set_user_attr(RESULT_ATTR, _serialize(result))
+            study.tell(trial, result["loss"])
+            trial = None
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if trial is not None:
+            study.tell(trial, state=TrialState.FAIL)
+        pickle_file.unlink(missing_ok=True)
+
+
+def _fail_stale(study: optuna.Study) -> int:
+    """
+    Trials left running by an interrupted run are failed so they no longer
+    count against the budget.
+    """
+    stale = study.get_trials(deepcopy=False, states=(TrialState.RUNNING,))
+    for trial in stale:
+        study._storage.set_trial_state_values(trial._trial_id, TrialState.FAIL)
+    return len(stale)
+
+
+def study_status(study: optuna.Study) -> Dict[str, object]:
+    trials = study.get_trials(deepcopy=False)
+    counts = {state.name.lower(): 0 for state in (TrialState.COMPLETE, TrialState.RUNNING, TrialState.FAIL)}
+    counts["duplicate"] = 0
+    for trial in trials:
+        key = "duplicate" if trial.state == TrialState.PRUNED else trial.state.name.lower()
+        counts[key] = counts.get(key, 0) + 1
+    completed = [t for t in trials if t.state == TrialState.COMPLETE]
+    best = min(completed, key=lambda t: t.value) if completed else None
+    workers = {t.user_attrs.get("worker") for t in completed}
+    return {
+        "study": study.study_name,
+        "counts": counts,
+        "workers": len(workers),
+        "best_loss": best.value if best else None,
+        "best_trial": best.number if best else None,
+        "best_params": best.params if best else {},
+    }
+
+
+def export_results(study: optuna.Study, results_dir: Path, strategy: str, total_epochs: int) -> Optional[dict]:
+    """
+    Write completed trials, in order, as a Freqtrade `.fthypt` file and
+    return the best epoch.
+    """
+    from freqtrade.optimize.hyperopt.hyperopt_optimizer import INITIAL_POINTS
+    from freqtrade.optimize.hyperopt_tools import HyperoptTools, hyperopt_serializer
+
+    completed = sorted(
+        (t for t in study.get_trials(deepcopy=False, states=(TrialState.COMPLETE,)) if RESULT_ATTR in t.user_attrs),
+        key=lambda t: t.number,
+    )
+    if not completed:
+        return None
+
+    results_dir.mkdir(parents=True, exist_ok=True)
+    results_file = results_dir / f"strategy_{strategy}_{time.strftime('%Y-%m-%d_%H-%M-%S')}.fthypt"
+    best, best_loss = None, 100
+    with results_file.open("w") as f:
+        for current, trial in enumerate(completed, start=1):
+            epoch = rapidjson.loads(trial.user_attrs[RESULT_ATTR], number_mode=rapidjson.NM_NATIVE | rapidjson.NM_NAN)
+            epoch["current_epoch"] = current
+            epoch["is_initial_point"] = current <= INITIAL_POINTS
+            epoch["is_random"] = False
+            epoch["is_best"] = HyperoptTools.is_best_loss(epoch, best_loss)
+            if epoch["is_best"]:
+                best, best_loss = epoch, epoch["loss"]
+            epoch[FTHYPT_FILEVERSION] = 2
+            rapidjson.dump(
+                epoch, f, default=hyperopt_serializer, number_mode=rapidjson.NM_NATIVE | rapidjson.NM_NAN
+            )
+            f.write("\n")
+    file_dump_json(results_dir / LAST_BT_RESULT_FN, {"latest_hyperopt": results_file.name}, log=False)
+    print(f"{len(completed)} epochs exported to {results_file}")
+    return best
+
+
+def _print_status(status: Dict[str, object], epochs: Optional[int] = None) -> None:
+    counts = status["counts"]
+    budget = f"/{epochs}" if epochs else ""
+    best = "-" if status["best_loss"] is None else f"{status['best_loss']:.5f} (trial {status['best_trial']})"
+    print(
+        f"{status['study']}: {counts['complete']}{budget} complete, {counts['running']} running, "
+        f"{counts['duplicate']} duplicates skipped, {counts['fail']} failed; best loss {best}"
+    )
+
+
+def run(settings: dict, workers: int, seed: Optional[int]) -> int:
+    store = Path(settings["store"])
+    store.parent.mkdir(parents=True, exist_ok=True)
+    study = optuna.create_study(
+        study_name=settings["study"], storage=_storage(store), direction="minimize", load_if_exists=True
+    )
+    stale = _fail_stale(study)
+    if stale:
+        print(f"Marked {stale} trial(s) of an interrupted run as failed")
+    done = len(study.get_trials(deepcopy=False, states=(TrialState.COMPLETE,)))
+    print(f"Study {settings['study']} in {store}: {done}/{settings['epochs']} epochs done, {workers} workers")
+
+    if done < settings["epochs"]:
+        seed = random.randint(1, 2**16 - 1) if seed is None else seed
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(target=run_worker, args=(number, settings, seed), name=f"hyperopt-shard-{number}")
+            for number in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            last = None
+            while any(process.is_alive() for process in processes):
+                time.sleep(PROGRESS_SECONDS)
+                status = study_status(study)
+                line = (status["counts"]["complete"], status["best_loss"])
+                if line != last:
+                    _print_status(status, settings["epochs"])
+                    last = line
+        except KeyboardInterrupt:
+            print("Interrupted, waiting for workers to stop (run again to resume)...")
+        for process in processes:
+            process.join()
+
+    _print_status(study_status(study), settings["epochs"])
+    config = build_config(settings)
+    best = export_results(study, config["user_data_dir"] / "hyperopt_results", settings["strategy"], settings["epochs"])
+    if best is None:
+        print("No epochs evaluated yet, no best result.")
+        return 0
+
+    from freqtrade.optimize.hyperopt_tools import HyperoptTools
+
+    HyperoptTools.try_export_params(dict(config, disableparamexport=False), settings["strategy"], best)
+    HyperoptTools.show_epoch_details(best, settings["epochs"], False)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (
+        ("run", "Run (or resume) a sharded hyperopt"),
+        ("status", "Show progress and the best trial of a study"),
+        ("export", "Export completed trials as a .fthypt file and write the best parameters"),
+    ):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--strategy", required=True, help="Strategy name (e.g. Markov)")
+        command.add_argument("--config", help="Config file (default: the strategy folder's config.json)")
+        command.add_argument("--userdir", help="Freqtrade user data dir (default: the strategy folder's user_data)")
+        command.add_argument("--datadir", help="Candle data directory")
+        command.add_argument("--spaces", nargs="+", default=list(DEFAULT_SPACES))
+        command.add_argument("--hyperopt-loss", default=DEFAULT_LOSS)
+        command.add_argument("--timerange")
+        command.add_argument("--min-trades", type=int, default=1, help="Minimum trades for a trial to count")
+        command.add_argument("--epochs", type=int, default=200, help="Total completed trials for the study")
+        command.add_argument("--store", help=f"SQLite results store (default: <userdir>/hyperopt_results/{STORE_NAME})")
+        command.add_argument("--study", help="Study name (default: <Strategy>-<spaces>)")
+        if name == "run":
+            command.add_argument("--workers", type=int, default=max(multiprocessing.cpu_count() - 1, 1))
+            command.add_argument("--seed", type=int, help="Sampler seed (worker n uses seed + n)")
+    args = parser.parse_args(argv)
+
+    packages = discover([args.strategy])
+    if len(packages) != 1:
+        parser.error(f"Unknown strategy {args.strategy}")
+    settings = _settings(args, packages[0])
+
+    if args.command == "run":
+        return run(settings, args.workers, args.seed)
+
+    study = optuna.load_study(study_name=settings["study"], storage=_storage(Path(settings["store"])))
+    if args.command == "status":
+        status = study_status(study)
+        _print_status(status, settings["epochs"])
+        for key, value in sorted(status["best_params"].items()):
+            print(f"    {key}: {value}")
+        return 0
+
+    config = build_config(settings)
+    best = export_results(study, config["user_data_dir"] / "hyperopt_results", settings["strategy"], settings["epochs"])
+    if best is not None:
+        from freqtrade.optimize.hyperopt_tools import HyperoptTools
+
+        HyperoptTools.try_export_params(dict(config, disableparamexport=False), settings["strategy"], best)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,75 @@
+"""
+Inspect and prune the on-disk indicator cache used in backtests.
+
+    python -m tools.indicator_cache list
+    python -m tools.indicator_cache stats
+    python -m tools.indicator_cache prune --max-size-mb 512
+    python -m tools.indicator_cache prune --older-than-days 14
+    python -m tools.indicator_cache clear
+
+The directory defaults to the one used by the strategies
+(`freqhub.indicator_cache.directory`, `user_data/data/indicator_cache`).
+"""
+
+import argparse
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from freqhub_common.indicator_cache import DEFAULT_DIRECTORY, IndicatorCache
+
+
+def _mb(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--directory", type=Path, default=Path(DEFAULT_DIRECTORY), help="Cache directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List entries, least recently used first")
+    commands.add_parser("stats", help="Summarize entries per strategy and pair")
+    prune = commands.add_parser("prune", help="Evict least recently used entries")
+    prune.add_argument("--max-size-mb", type=float, help="Keep the cache below this size")
+    prune.add_argument("--older-than-days", type=float, help="Evict entries unused for this many days")
+    commands.add_parser("clear", help="Remove all entries")
+    args = parser.parse_args(argv)
+
+    cache = IndicatorCache(args.directory)
+
+    if args.command == "list":
+        for entry in cache.entries():
+            meta = entry.meta
+            print(
+                f"{entry.key[:16]}  {_mb(entry.size):>10}  "
+                f"{datetime.fromtimestamp(entry.last_used):%Y-%m-%d %H:%M}  "
+                f"{meta.get('strategy', '?'):<28} {meta.get('pair', '?'):<14} "
+                f"{meta.get('rows', '?'):>8} rows  {meta.get('first', '')} .. {meta.get('last', '')}"
+            )
+    elif args.command == "stats":
+        entries = cache.entries()
+        groups = defaultdict(lambda: [0, 0])
+        for entry in entries:
+            group = groups[(entry.meta.get("strategy", "?"), entry.meta.get("pair", "?"))]
+            group[0] += 1
+            group[1] += entry.size
+        for (strategy, pair), (count, size) in sorted(groups.items()):
+            print(f"{strategy:<28} {pair:<14} {count:>5} entries  {_mb(size):>10}")
+        print(f"Total: {len(entries)} entries, {_mb(sum(e.size for e in entries))} in {args.directory}")
+    elif args.command == "prune":
+        if args.max_size_mb is None and args.older_than_days is None:
+            parser.error("prune needs --max-size-mb and/or --older-than-days")
+        evicted = cache.prune(
+            max_bytes=int(args.max_size_mb * 1024 * 1024) if args.max_size_mb is not None else None,
+            older_than=args.older_than_days * 86400 if args.older_than_days is not None else None,
+        )
+        print(f"Evicted {len(evicted)} entries ({_mb(sum(e.size for e in evicted))}), {_mb(cache.size())} left")
+    elif args.command == "clear":
+        evicted = cache.clear()
+        print(f"Removed {len(evicted)} entries ({_mb(sum(e.size for e in evicted))})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
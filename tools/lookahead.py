@@ -0,0 +1,196 @@
+"""
+Detect lookahead bias by re-running strategies on truncated prefixes of the data.
+
+Analyzes the full dataset once, then sampled prefixes of it (what a live bot
+would have seen at that candle), and reports every indicator and signal
+column whose past values change once later candles are appended, with the
+number of candles it looks ahead. Exits with status 1 if any column leaks.
+
+    python -m tools.lookahead
+    python -m tools.lookahead --strategies IchiV1 MandelbrotFibonacci --candles 3000 --cuts 20
+    python -m tools.lookahead --datadir user_data/data/binance --pair BTC/USDT
+
+Candles are synthetic unless `--datadir` points at downloaded history.
+`--cache DIR` turns on the strategies' indicator cache, so repeated runs
+reuse the analyzed prefixes instead of recomputing them.
+"""
+
+import argparse
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from tools.fixtures import FixtureDataProvider, load_candles, truncate_candles
+from tools.strategy_loader import (
+    StrategyPackage,
+    analyze,
+    create_strategy,
+    discover,
+    offline_config,
+    strategy_timeframes,
+)
+
+SIGNAL_PREFIXES = ("enter_", "exit_")
+
+
+@dataclass
+class Leak:
+    """
+    One column whose historical values depend on later candles.
+    """
+
+    column: str
+    kind: str
+    cuts: int = 0
+    rows: int = 0
+    depth: int = 0
+    example: Dict[str, str] = field(default_factory=dict)
+
+
+def _kind(column: str) -> str:
+    return "signal" if column.startswith(SIGNAL_PREFIXES) else "indicator"
+
+
+def _differs(prefix: pd.Series, full: pd.Series, rtol: float) -> np.ndarray:
+    """
+    Rows where the two columns disagree; NaN/None on both sides are equal.
+    """
+    if pd.api.types.is_numeric_dtype(prefix) and pd.api.types.is_numeric_dtype(full):
+        a = prefix.to_numpy(dtype="float64", na_value=np.nan)
+        b = full.to_numpy(dtype="float64", na_value=np.nan)
+        return ~np.isclose(a, b, rtol=rtol, atol=1e-12, equal_nan=True)
+    a_missing = prefix.isna().to_numpy()
+    b_missing = full.isna().to_numpy()
+    same = prefix.astype(str).to_numpy() == full.astype(str).to_numpy()
+    return ~((a_missing & b_missing) | (~a_missing & ~b_missing & same))
+
+
+def check_strategy(
+    package: StrategyPackage,
+    pair: str,
+    candles: int,
+    cuts: int,
+    rtol: float = 1e-9,
+    datadir: Optional[str] = None,
+    data_format: Optional[str] = None,
+    cache: Optional[str] = None,
+    seed: int = 0,
+) -> dict:
+    """
+    Compare the full analysis with `cuts` truncated re-analyses.
+    """
+    config = offline_config(package, cache)
+    probe = create_strategy(package, config, dp=FixtureDataProvider({}, whitelist=[pair]))
+    timeframe = probe.timeframe
+    data = load_candles(
+        pair, strategy_timeframes(probe, pair), candles, datadir=datadir, data_format=data_format, seed=seed
+    )
+    rows = len(data[(pair, timeframe)])
+
+    started = time.perf_counter()
+    full = analyze(create_strategy(package, config, dp=FixtureDataProvider(data, whitelist=[pair])), data, pair)
+
+    first_cut = min(max(int(probe.startup_candle_count), 30) + 1, rows)
+    points = sorted({int(k) for k in np.linspace(first_cut, rows - 1, cuts)})
+    leaks: Dict[str, Leak] = {}
+    for k in points:
+        prefix_data = truncate_candles(data, timeframe, k)
+        strategy = create_strategy(package, config, dp=FixtureDataProvider(prefix_data, whitelist=[pair]))
+        prefix = analyze(strategy, prefix_data, pair).reset_index(drop=True)
+        reference = full.iloc[:k].reset_index(drop=True)
+
+        for column in sorted(set(reference.columns) | set(prefix.columns), key=str):
+            name = str(column)
+            if column not in prefix.columns or column not in reference.columns:
+                changed = np.arange(k)
+            else:
+                changed = np.flatnonzero(_differs(prefix[column], reference[column], rtol))
+            if not len(changed):
+                continue
+            leak = leaks.setdefault(name, Leak(name, _kind(name)))
+            leak.cuts += 1
+            leak.rows += len(changed)
+            leak.depth = max(leak.depth, int(k - changed[0]))
+            if not leak.example:
+                row = int(changed[0])
+                leak.example = {
+                    "cut": str(reference["date"].iloc[k - 1]),
+                    "date": str(reference["date"].iloc[row]),
+                    "prefix": str(prefix[column].iloc[row]) if column in prefix.columns else "<missing>",
+                    "full": str(reference[column].iloc[row]) if column in reference.columns else "<missing>",
+                }
+
+    return {
+        "strategy": package.name,
+        "pair": pair,
+        "timeframe": timeframe,
+        "candles": rows,
+        "cuts": len(points),
+        "seconds": time.perf_counter() - started,
+        "leaks": [asdict(leak) for leak in sorted(leaks.values(), key=lambda l: (l.kind != "signal", l.column))],
+    }
+
+
+def _print_result(result: dict, examples: bool) -> None:
+    leaks = result["leaks"]
+    status = f"{len(leaks)} leaking column(s)" if leaks else "no lookahead"
+    print(
+        f"{result['strategy']:<22} {result['pair']} {result['timeframe']:<4} {result['candles']} candles, "
+        f"{result['cuts']} cuts, {result['seconds']:.1f}s: {status}"
+    )
+    for leak in leaks:
+        print(
+            f"  {leak['kind']:<9} {leak['column']:<28} ahead {leak['depth']:>4} candles  "
+            f"({leak['cuts']}/{result['cuts']} cuts, {leak['rows']} rows)"
+        )
+        if examples:
+            example = leak["example"]
+            print(
+                f"            at {example['date']} (cut {example['cut']}): "
+                f"prefix={example['prefix']} full={example['full']}"
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--strategies", nargs="*", help="Strategy names (default: all)")
+    parser.add_argument("--pair", default="BTC/USDT")
+    parser.add_argument("--candles", type=int, default=3000, help="Candles of the strategy timeframe")
+    parser.add_argument("--cuts", type=int, default=24, help="Number of truncated prefixes to re-analyze")
+    parser.add_argument("--rtol", type=float, default=1e-9, help="Relative tolerance for float columns")
+    parser.add_argument("--datadir", help="Use downloaded candles instead of synthetic ones")
+    parser.add_argument("--data-format", help="Candle format in --datadir (default: feather)")
+    parser.add_argument("--cache", help="Indicator cache directory to reuse analyzed prefixes across runs")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for synthetic candles")
+    parser.add_argument("--examples", action="store_true", help="Show the first changed value per column")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    for package in discover(args.strategies):
+        result = check_strategy(
+            package,
+            args.pair,
+            args.candles,
+            args.cuts,
+            rtol=args.rtol,
+            datadir=args.datadir,
+            data_format=args.data_format,
+            cache=args.cache,
+            seed=args.seed,
+        )
+        results.append(result)
+        if not args.json:
+            _print_result(result, args.examples)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    return 1 if any(result["leaks"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,244 @@
+"""
+Stand-in notification receiver and latency report for the message load generator.
+
+Run the receiver, point the MessageTest bot's webhook at it, enable
+`freqhub.message_load` and let the bot run in dry-run; then compare the
+generator's ledger with what arrived:
+
+    python -m tools.message_load receive --port 8765 --output received.jsonl
+    python -m tools.message_load report --ledger user_data/logs/message_load.jsonl --received received.jsonl
+
+The receiver accepts webhook POSTs (json or form) on any path and Telegram
+Bot API style `/bot<token>/sendMessage` calls. `--delay-ms` and
+`--fail-every` simulate a slow or flaky endpoint.
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl
+
+import numpy as np
+
+from freqhub_common.message_load import parse_entry_tag, parse_load_message
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def _payload_text(payload: dict) -> str:
+    for key in ("msg", "text", "message", "data", "status"):
+        if isinstance(payload.get(key), str):
+            return payload[key]
+    return ""
+
+
+class _Receiver(BaseHTTPRequestHandler):
+    server_version = "FreqHubReceiver/1.0"
+    # Set on the server instance: output file, lock, delay, fail_every, counter
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        received = time.time()
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode("utf-8", "replace")
+        content_type = self.headers.get("Content-Type", "")
+        if "json" in content_type:
+            try:
+                payload = json.loads(body or "{}")
+            except ValueError:
+                payload = {"data": body}
+        elif "x-www-form-urlencoded" in content_type:
+            payload = dict(parse_qsl(body))
+        else:
+            payload = {"data": body}
+
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            number = server.requests
+        if server.delay:
+            time.sleep(server.delay)
+
+        if server.fail_every and number % server.fail_every == 0:
+            self.send_response(500)
+            self.end_headers()
+            status = 500
+        else:
+            response = b"{}"
+            if self.path.endswith("/sendMessage"):
+                response = json.dumps({"ok": True, "result": {"message_id": number}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+            status = 200
+
+        record = {"received": received, "status": status, "path": self.path, "payload": payload}
+        with server.lock:
+            server.output.write(json.dumps(record) + "\n")
+
+
+def receive(host: str, port: int, output: Path, delay_ms: float = 0.0, fail_every: int = 0) -> None:
+    server = ThreadingHTTPServer((host, port), _Receiver)
+    server.output = output.open("a", buffering=1)
+    server.lock = threading.Lock()
+    server.delay = delay_ms / 1000.0
+    server.fail_every = fail_every
+    server.requests = 0
+    print(f"Receiving on http://{host}:{port}/ -> {output} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.output.close()
+        print(f"{server.requests} requests received")
+
+
+def _read_jsonl(path: Path) -> List[dict]:
+    with path.open() as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    data = np.asarray(values) * 1000.0
+    result = {f"p{p}": float(np.percentile(data, p)) for p in PERCENTILES}
+    result["max"] = float(data.max())
+    result["mean"] = float(data.mean())
+    return result
+
+
+def build_report(ledger: List[dict], received: List[dict]) -> dict:
+    """
+    Join the generator ledger (last run) with received notifications.
+    Latencies are enqueue-to-delivery, in milliseconds.
+    """
+    starts = [i for i, entry in enumerate(ledger) if entry.get("kind") == "start"]
+    session = ledger[starts[-1]:] if starts else ledger
+    started = session[0]["created"] if session else 0.0
+
+    sent = {entry["seq"]: entry for entry in session if entry.get("kind") == "message"}
+    duplicates_sent = sum(1 for entry in session if entry.get("kind") == "duplicate")
+
+    arrivals: Dict[int, List[float]] = {}
+    entry_latencies: List[float] = []
+    other = Counter()
+    failed = 0
+    for record in received:
+        if record["received"] < started:
+            continue
+        if record.get("status", 200) != 200:
+            failed += 1
+            continue
+        payload = record.get("payload", {})
+        message = parse_load_message(_payload_text(payload))
+        if message is not None:
+            arrivals.setdefault(message["seq"], []).append(record["received"])
+            continue
+        created = parse_entry_tag(payload.get("enter_tag"))
+        if created is not None and str(payload.get("type", "")).startswith("entry"):
+            entry_latencies.append(record["received"] - created)
+        else:
+            other[str(payload.get("type", "other"))] += 1
+
+    latencies = {"steady": [], "burst": []}
+    for seq, entry in sent.items():
+        if seq in arrivals:
+            latencies["burst" if entry.get("burst") else "steady"].append(arrivals[seq][0] - entry["created"])
+
+    delivered = [seq for seq in sent if seq in arrivals]
+    duplicates_delivered = sum(len(times) - 1 for times in arrivals.values())
+    all_arrivals = sorted(t for times in arrivals.values() for t in times)
+    duration = (all_arrivals[-1] - started) if all_arrivals else 0.0
+    per_second = Counter(int(t) for t in all_arrivals)
+
+    return {
+        "config": session[0].get("config", {}) if session else {},
+        "messages_sent": len(sent),
+        "messages_delivered": len(delivered),
+        "messages_dropped": len(sent) - len(delivered),
+        "duplicates_sent": duplicates_sent,
+        "duplicates_delivered": duplicates_delivered,
+        "duplicates_suppressed": max(duplicates_sent - duplicates_delivered, 0),
+        "failed_requests": failed,
+        "entries_delivered": len(entry_latencies),
+        "other_notifications": dict(other),
+        "duration_seconds": duration,
+        "delivered_per_minute": len(all_arrivals) * 60.0 / duration if duration > 0 else 0.0,
+        "peak_per_second": max(per_second.values()) if per_second else 0,
+        "latency_ms": {
+            "messages": _percentiles(latencies["steady"] + latencies["burst"]),
+            "steady": _percentiles(latencies["steady"]),
+            "burst": _percentiles(latencies["burst"]),
+            "entries": _percentiles(entry_latencies),
+        },
+    }
+
+
+def _print_report(report: dict) -> None:
+    print(f"Config: {report['config']}")
+    print(
+        f"Messages: {report['messages_sent']} sent, {report['messages_delivered']} delivered, "
+        f"{report['messages_dropped']} dropped"
+    )
+    print(
+        f"Duplicates: {report['duplicates_sent']} sent, {report['duplicates_suppressed']} suppressed, "
+        f"{report['duplicates_delivered']} delivered"
+    )
+    print(f"Entry notifications: {report['entries_delivered']}, failed requests: {report['failed_requests']}")
+    if report["other_notifications"]:
+        print(f"Other notifications: {report['other_notifications']}")
+    print(
+        f"Throughput: {report['delivered_per_minute']:.1f}/min over {report['duration_seconds']:.0f}s, "
+        f"peak {report['peak_per_second']}/s"
+    )
+    print()
+    header = "".join(f"{name:>10}" for name in [f"p{p}" for p in PERCENTILES] + ["max", "mean"])
+    print(f"{'latency (ms)':<14}{header}")
+    for name, values in report["latency_ms"].items():
+        if not values:
+            print(f"{name:<14}{'-':>10}")
+            continue
+        row = "".join(f"{values[key]:>10.1f}" for key in [f"p{p}" for p in PERCENTILES] + ["max", "mean"])
+        print(f"{name:<14}{row}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    receiver = commands.add_parser("receive", help="Run the stand-in webhook/Telegram receiver")
+    receiver.add_argument("--host", default="0.0.0.0")
+    receiver.add_argument("--port", type=int, default=8765)
+    receiver.add_argument("--output", type=Path, default=Path("received.jsonl"), help="Received messages (JSONL)")
+    receiver.add_argument("--delay-ms", type=float, default=0.0, help="Delay every response")
+    receiver.add_argument("--fail-every", type=int, default=0, help="Answer every Nth request with HTTP 500")
+    report = commands.add_parser("report", help="Latency, drop and duplicate report")
+    report.add_argument("--ledger", type=Path, default=Path("user_data/logs/message_load.jsonl"))
+    report.add_argument("--received", type=Path, default=Path("received.jsonl"))
+    report.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "receive":
+        receive(args.host, args.port, args.output, delay_ms=args.delay_ms, fail_every=args.fail_every)
+        return 0
+
+    result = build_report(_read_jsonl(args.ledger), _read_jsonl(args.received))
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        _print_report(result)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
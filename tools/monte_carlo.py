@@ -0,0 +1,359 @@
+"""
+Monte Carlo robustness analysis of a backtest's trade list.
+
+Resamples the trades of an exported backtest thousands of times as NumPy
+matrices (one row per resample) and reports the distribution of the final
+profit and maximum drawdown and the probability of ruin:
+
+- `bootstrap` draws the trades with replacement (kept in time order),
+- `shuffle` permutes them, so the same profits arrive in another order.
+
+By default every trade is staked like the config does (`stake_amount`,
+`unlimited` = wallet x `tradable_balance_ratio` / `max_open_trades`) one
+after the other. `--constraints` replays the resampled trades on their
+open/close times instead: a trade only opens if one of `max_open_trades`
+slots and enough free stake are available. `--daily-guard` additionally
+skips trades opened after the day's closed trades are in profit (the
+Markov strategies' entry guard) and reports the result next to the
+unguarded run.
+
+    python -m tools.monte_carlo --strategy Markov
+    python -m tools.monte_carlo --strategy Markov --resamples 20000 --constraints --daily-guard
+    python -m tools.monte_carlo --strategy IchiV1 --results user_data/backtest_results/backtest-result.zip
+
+Trades are read with Freqtrade's `load_backtest_data` from `--results`
+(default: the last result in the strategy folder's
+`user_data/backtest_results`); limits default to the strategy's
+`config.json.example`.
+"""
+
+import argparse
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from tools.strategy_loader import StrategyPackage, discover
+
+METHODS = ("bootstrap", "shuffle")
+PERCENTILES = (5, 25, 50, 75, 95)
+BATCH = 2000
+SECONDS_PER_DAY = 86400
+
+
+@dataclass
+class Stake:
+    """
+    Stake sizing from the config: a fixed `amount`, or None for
+    `unlimited` (free balance split over the free trade slots).
+    """
+
+    wallet: float
+    amount: Optional[float]
+    max_open_trades: int
+    tradable_ratio: float = 0.99
+
+    @classmethod
+    def from_config(cls, config: dict) -> "Stake":
+        amount = config.get("stake_amount", "unlimited")
+        return cls(
+            wallet=float(config.get("dry_run_wallet", 1000)),
+            amount=None if amount == "unlimited" else float(amount),
+            max_open_trades=int(config.get("max_open_trades", 1)),
+            tradable_ratio=float(config.get("tradable_balance_ratio", 0.99)),
+        )
+
+
+def load_trades(package: StrategyPackage, results: Optional[str] = None) -> DataFrame:
+    """
+    The trades of the strategy's exported backtest, sorted by open date.
+    """
+    from freqtrade.data.btanalysis import load_backtest_data
+
+    location = Path(results) if results else package.folder / "user_data" / "backtest_results"
+    trades = load_backtest_data(location, package.class_name)
+    if trades.empty:
+        raise ValueError(f"{package.name}: no trades in {location}")
+    return trades.sort_values("open_date", kind="stable").reset_index(drop=True)
+
+
+def _seconds(dates: pd.Series) -> np.ndarray:
+    return pd.to_datetime(dates, utc=True).dt.tz_localize(None).to_numpy().astype("datetime64[s]").astype("int64")
+
+
+def resample(n: int, resamples: int, method: str, rng: np.random.Generator) -> np.ndarray:
+    """
+    (resamples, n) trade indices; bootstrap rows are sorted so trades stay
+    in time order.
+    """
+    if method == "bootstrap":
+        return np.sort(rng.integers(0, n, size=(resamples, n)), axis=1)
+    return rng.permuted(np.broadcast_to(np.arange(n), (resamples, n)), axis=1)
+
+
+def sequential_pnl(profits: np.ndarray, stake: Stake) -> np.ndarray:
+    """
+    Absolute profit of every trade, taken one after the other: a fixed
+    stake, or the `unlimited` share of the compounding wallet.
+    """
+    if stake.amount is not None:
+        return profits * stake.amount
+    fraction = stake.tradable_ratio / stake.max_open_trades
+    equity = stake.wallet * np.cumprod(1 + fraction * profits, axis=1)
+    before = np.concatenate((np.full((len(profits), 1), stake.wallet), equity[:, :-1]), axis=1)
+    return before * fraction * profits
+
+
+def replay_pnl(
+    profits: np.ndarray, opens: np.ndarray, closes: np.ndarray, stake: Stake, daily_guard: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Absolute profit of every trade replayed on its open/close times with
+    `max_open_trades` slots (0 for skipped trades), and which trades were
+    taken. Loops over the trade columns; every step is vectorized over the
+    resamples.
+    """
+    rows, n = profits.shape
+    slots = stake.max_open_trades
+    index = np.arange(rows)
+    slot_close = np.zeros((rows, slots), dtype="int64")
+    slot_stake = np.zeros((rows, slots))
+    slot_pnl = np.zeros((rows, slots))
+    occupied = np.zeros((rows, slots), dtype=bool)
+    realized = np.zeros(rows)
+    day = np.full(rows, -1, dtype="int64")
+    day_profit = np.zeros(rows)
+    pnl = np.zeros((rows, n))
+    taken = np.zeros((rows, n), dtype=bool)
+
+    for column in range(n):
+        opened = opens[:, column]
+        today = opened // SECONDS_PER_DAY
+        new_day = today != day
+        day = np.where(new_day, today, day)
+        day_profit[new_day] = 0.0
+
+        closed = occupied & (slot_close <= opened[:, None])
+        realized += (slot_pnl * closed).sum(axis=1)
+        same_day = closed & (slot_close // SECONDS_PER_DAY == today[:, None])
+        day_profit += (slot_pnl * same_day).sum(axis=1)
+        occupied &= ~closed
+
+        free_slots = slots - occupied.sum(axis=1)
+        free_balance = (stake.wallet + realized) * stake.tradable_ratio - (slot_stake * occupied).sum(axis=1)
+        if stake.amount is None:
+            amount = free_balance / np.maximum(free_slots, 1)
+            accept = (free_slots > 0) & (amount > 0)
+        else:
+            amount = np.full(rows, stake.amount)
+            accept = (free_slots > 0) & (free_balance >= stake.amount)
+        if daily_guard:
+            accept &= day_profit <= 0
+
+        slot = np.argmin(occupied, axis=1)
+        target = index[accept], slot[accept]
+        taken[:, column] = accept
+        pnl[:, column] = np.where(accept, amount * profits[:, column], 0.0)
+        slot_close[target] = closes[accept, column]
+        slot_stake[target] = amount[accept]
+        slot_pnl[target] = pnl[accept, column]
+        occupied[target] = True
+    return pnl, taken
+
+
+def equity_metrics(
+    pnl: np.ndarray, taken: Optional[np.ndarray], order: Optional[np.ndarray], wallet: float, ruin: float
+) -> Dict[str, np.ndarray]:
+    """
+    Per resample: final profit and maximum drawdown (ratios of the wallet
+    and of the running peak), trades taken and whether the equity ever fell
+    to `1 - ruin` of the starting wallet. `order` sorts the trades by close.
+    """
+    realized = pnl if order is None else np.take_along_axis(pnl, order, axis=1)
+    equity = wallet + np.cumsum(realized, axis=1)
+    equity = np.concatenate((np.full((len(equity), 1), wallet), equity), axis=1)
+    peak = np.maximum.accumulate(equity, axis=1)
+    return {
+        "profit": equity[:, -1] / wallet - 1,
+        "drawdown": ((peak - equity) / peak).max(axis=1),
+        "trades": taken.sum(axis=1) if taken is not None else np.full(len(pnl), pnl.shape[1]),
+        "ruined": equity.min(axis=1) <= wallet * (1 - ruin),
+    }
+
+
+def simulate(
+    trades: DataFrame,
+    stake: Stake,
+    method: str,
+    resamples: int,
+    constraints: bool = False,
+    daily_guard: bool = False,
+    ruin: float = 0.5,
+    seed: int = 0,
+) -> Dict[str, np.ndarray]:
+    """
+    Metrics of `resamples` resamples of `trades`, computed in batches of
+    BATCH rows; the first row is always the trade list as backtested.
+    """
+    profits = trades["profit_ratio"].to_numpy(dtype="float64")
+    opens = _seconds(trades["open_date"])
+    closes = _seconds(trades["close_date"])
+    rng = np.random.default_rng(seed)
+    replay = constraints or daily_guard
+
+    batches = []
+    for start in range(0, resamples + 1, BATCH):
+        rows = min(BATCH, resamples + 1 - start)
+        index = resample(len(profits), rows, method, rng)
+        if start == 0:
+            index[0] = np.arange(len(profits))
+        sampled = profits[index]
+        if not replay:
+            batches.append(equity_metrics(sequential_pnl(sampled, stake), None, None, stake.wallet, ruin))
+            continue
+        # Bootstrap keeps each drawn trade's own times; shuffle deals the
+        # profits out over the backtest's trade times.
+        row_opens = opens[index] if method == "bootstrap" else np.broadcast_to(opens, index.shape)
+        row_closes = closes[index] if method == "bootstrap" else np.broadcast_to(closes, index.shape)
+        pnl, taken = replay_pnl(sampled, row_opens, row_closes, stake, daily_guard)
+        order = np.argsort(row_closes, axis=1, kind="stable")
+        batches.append(equity_metrics(pnl, taken, order, stake.wallet, ruin))
+    return {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]}
+
+
+def summarize(metrics: Dict[str, np.ndarray]) -> dict:
+    """
+    Backtested values (row 0) and percentiles over the resamples.
+    """
+    sampled = {key: values[1:] for key, values in metrics.items()}
+    return {
+        "backtest": {key: float(metrics[key][0]) for key in ("profit", "drawdown", "trades")},
+        "percentiles": {
+            key: dict(zip(map(str, PERCENTILES), np.percentile(sampled[key], PERCENTILES).tolist()))
+            for key in ("profit", "drawdown", "trades")
+        },
+        "ruin_probability": float(sampled["ruined"].mean()),
+        "loss_probability": float((sampled["profit"] < 0).mean()),
+    }
+
+
+def analyze_strategy(
+    package: StrategyPackage,
+    results: Optional[str],
+    stake: Stake,
+    methods: List[str],
+    resamples: int,
+    constraints: bool,
+    daily_guard: bool,
+    ruin: float,
+    seed: int,
+) -> dict:
+    trades = load_trades(package, results)
+    scenarios = []
+    for method in methods:
+        for guard in (False, True) if daily_guard else (False,):
+            started = time.perf_counter()
+            metrics = simulate(trades, stake, method, resamples, constraints, guard, ruin, seed)
+            scenarios.append(
+                {
+                    "method": method,
+                    "daily_guard": guard,
+                    "seconds": time.perf_counter() - started,
+                    **summarize(metrics),
+                }
+            )
+    return {
+        "strategy": package.name,
+        "trades": len(trades),
+        "resamples": resamples,
+        "mode": "replay" if constraints or daily_guard else "sequential",
+        "stake": {
+            "wallet": stake.wallet,
+            "stake_amount": "unlimited" if stake.amount is None else stake.amount,
+            "max_open_trades": stake.max_open_trades,
+        },
+        "scenarios": scenarios,
+    }
+
+
+def _print_result(result: dict, ruin: float) -> None:
+    stake = result["stake"]
+    print(
+        f"{result['strategy']}: {result['trades']} trades, {result['resamples']} resamples, {result['mode']} "
+        f"(wallet {stake['wallet']:g}, stake {stake['stake_amount']}, max_open_trades {stake['max_open_trades']})"
+    )
+    header = "  ".join(f"p{p:<6}" for p in PERCENTILES)
+    print(f"  {'scenario':<20} {'metric':<9} {'backtest':>8}  {header}")
+    for scenario in result["scenarios"]:
+        name = scenario["method"] + (" + guard" if scenario["daily_guard"] else "")
+        for key in ("profit", "drawdown", "trades"):
+            values = scenario["percentiles"][key]
+            if key == "trades":
+                cells = "  ".join(f"{values[str(p)]:>7.0f}" for p in PERCENTILES)
+                backtest = f"{scenario['backtest'][key]:>8.0f}"
+            else:
+                cells = "  ".join(f"{values[str(p)]:>7.1%}" for p in PERCENTILES)
+                backtest = f"{scenario['backtest'][key]:>8.1%}"
+            print(f"  {name if key == 'profit' else '':<20} {key:<9} {backtest}  {cells}")
+        print(
+            f"  {'':<20} P(loss) {scenario['loss_probability']:.1%}, "
+            f"P(equity <= {1 - ruin:.0%} of wallet) {scenario['ruin_probability']:.1%}  [{scenario['seconds']:.2f}s]"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--strategy", required=True, help="Strategy name")
+    parser.add_argument("--results", help="Backtest result file or directory")
+    parser.add_argument("--resamples", type=int, default=10000)
+    parser.add_argument("--methods", nargs="+", choices=METHODS, default=list(METHODS))
+    parser.add_argument("--constraints", action="store_true", help="Replay trades with max_open_trades and stake limits")
+    parser.add_argument("--daily-guard", action="store_true", help="Also simulate the daily profit entry guard")
+    parser.add_argument("--max-open-trades", type=int, help="Override max_open_trades from the config")
+    parser.add_argument("--stake-amount", help="Override stake_amount from the config (number or 'unlimited')")
+    parser.add_argument("--wallet", type=float, help="Override dry_run_wallet from the config")
+    parser.add_argument("--ruin", type=float, default=0.5, help="Loss of the starting wallet that counts as ruin")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    packages = discover([args.strategy])
+    if not packages:
+        parser.error(f"unknown strategy {args.strategy}")
+    package = packages[0]
+
+    config = package.load_config(prefer_example=True)
+    for key, value in (
+        ("max_open_trades", args.max_open_trades),
+        ("stake_amount", args.stake_amount),
+        ("dry_run_wallet", args.wallet),
+    ):
+        if value is not None:
+            config[key] = value
+    stake = Stake.from_config(config)
+
+    result = analyze_strategy(
+        package,
+        args.results,
+        stake,
+        args.methods,
+        args.resamples,
+        args.constraints,
+        args.daily_guard,
+        args.ruin,
+        args.seed,
+    )
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        _print_result(result, args.ruin)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,275 @@
+"""
+Plan one deduplicated OHLCV download for all FreqHub strategies.
+
+Each strategy folder has its own pairs, timeframe, informative timeframes and
+startup_candle_count, and running `download-data` per bot fetches the same
+candles many times. This tool loads every strategy with its `config.json`
+(or `config.json.example`), computes the minimal union of
+(exchange, pair, timeframe, timerange including startup candles) and can then
+download it once into a shared data directory.
+
+    python -m tools.plan_downloads --timerange 20240101-20240401
+    python -m tools.plan_downloads --timerange 20240101-20240401 --download --datadir user_data/data
+    python -m tools.plan_downloads --timerange 20240101-20240401 --download --fixture --datadir /tmp/data
+"""
+
+import argparse
+import json
+import logging
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from freqtrade.configuration import TimeRange
+from freqtrade.enums import CandleType
+from freqtrade.exchange import timeframe_to_minutes
+
+from tools.fixtures import FixtureDataProvider, synthetic_ohlcv
+from tools.strategy_loader import StrategyPackage, create_strategy, discover
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CANDLE_LIMIT = 1000
+
+
+@dataclass(frozen=True)
+class DataKey:
+    exchange: str
+    pair: str
+    timeframe: str
+    candle_type: str
+
+
+@dataclass
+class DataRequest:
+    key: DataKey
+    start: datetime
+    end: datetime
+    strategies: List[str] = field(default_factory=list)
+
+    def candles(self) -> int:
+        return max(math.ceil((self.end - self.start) / timedelta(minutes=timeframe_to_minutes(self.key.timeframe))), 0)
+
+    def calls(self, candle_limit: int = DEFAULT_CANDLE_LIMIT) -> int:
+        return max(math.ceil(self.candles() / candle_limit), 1)
+
+
+def _parse_timerange(value: str) -> Tuple[datetime, datetime]:
+    timerange = TimeRange.parse_timerange(value)
+    start = datetime.fromtimestamp(timerange.startts, tz=timezone.utc)
+    if timerange.stopts:
+        end = datetime.fromtimestamp(timerange.stopts, tz=timezone.utc)
+    else:
+        end = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    return start, end
+
+
+def strategy_requests(
+    package: StrategyPackage, start: datetime, end: datetime, prefer_example: bool = False
+) -> List[DataRequest]:
+    """
+    Data needed to backtest one strategy over [start, end).
+    Every timeframe is extended by `startup_candle_count` candles of that
+    timeframe, like Freqtrade does when loading history.
+    """
+    config = package.load_config(prefer_example=prefer_example)
+    exchange = config.get("exchange", {}).get("name", "binance")
+    pairs = config.get("exchange", {}).get("pair_whitelist", [])
+    candle_type = CandleType.get_default(config.get("trading_mode", "spot"))
+    config["candle_type_def"] = candle_type
+
+    strategy = create_strategy(package, config, dp=FixtureDataProvider({}, whitelist=pairs))
+    startup = int(getattr(strategy, "startup_candle_count", 0) or 0)
+
+    wanted = {(pair, strategy.timeframe, candle_type) for pair in pairs}
+    wanted.update(strategy.gather_informative_pairs())
+
+    requests = []
+    for pair, timeframe, pair_candle_type in sorted(wanted):
+        warmup = timedelta(minutes=timeframe_to_minutes(timeframe) * startup)
+        requests.append(
+            DataRequest(
+                key=DataKey(exchange, pair, timeframe, str(pair_candle_type)),
+                start=start - warmup,
+                end=end,
+                strategies=[package.name],
+            )
+        )
+    return requests
+
+
+def build_plan(requests: List[DataRequest]) -> List[DataRequest]:
+    """
+    Merge per-strategy requests into one request per data key, covering the
+    earliest start and latest end asked for.
+    """
+    merged: Dict[DataKey, DataRequest] = {}
+    for request in requests:
+        current = merged.get(request.key)
+        if current is None:
+            merged[request.key] = DataRequest(request.key, request.start, request.end, list(request.strategies))
+            continue
+        current.start = min(current.start, request.start)
+        current.end = max(current.end, request.end)
+        current.strategies.extend(s for s in request.strategies if s not in current.strategies)
+    return [merged[key] for key in sorted(merged, key=lambda k: (k.exchange, k.timeframe, k.pair))]
+
+
+def summarize(requests: List[DataRequest], plan: List[DataRequest], candle_limit: int) -> dict:
+    naive_calls = sum(r.calls(candle_limit) for r in requests)
+    plan_calls = sum(r.calls(candle_limit) for r in plan)
+    return {
+        "per_strategy_downloads": len(requests),
+        "per_strategy_calls": naive_calls,
+        "per_strategy_candles": sum(r.candles() for r in requests),
+        "planned_downloads": len(plan),
+        "planned_calls": plan_calls,
+        "planned_candles": sum(r.candles() for r in plan),
+        "calls_saved": naive_calls - plan_calls,
+    }
+
+
+def _group_for_download(plan: List[DataRequest]) -> Dict[tuple, List[str]]:
+    groups: Dict[tuple, List[str]] = {}
+    for request in plan:
+        key = (request.key.exchange, request.key.timeframe, request.key.candle_type, request.start, request.end)
+        groups.setdefault(key, []).append(request.key.pair)
+    return groups
+
+
+def execute_plan(
+    plan: List[DataRequest],
+    datadir: Path,
+    configs: Dict[str, dict],
+    fixture: bool = False,
+    data_format: Optional[str] = None,
+) -> List[str]:
+    """
+    Download the plan into `datadir/<exchange>/`.
+
+    With `fixture=True` deterministic synthetic candles are written instead
+    of contacting the exchange (for local dry runs of the pipeline).
+    Returns the pairs that could not be downloaded.
+    """
+    from freqtrade.data.history import get_datahandler, refresh_backtest_ohlcv_data
+    from freqtrade.resolvers import ExchangeResolver
+
+    missing: List[str] = []
+    exchanges = {}
+    for (exchange_name, timeframe, candle_type, start, end), pairs in _group_for_download(plan).items():
+        target = datadir / exchange_name
+        target.mkdir(parents=True, exist_ok=True)
+        logger.info(
+            "Downloading %d pairs %s %s from %s to %s", len(pairs), exchange_name, timeframe, start, end
+        )
+
+        if fixture:
+            handler = get_datahandler(target, data_format)
+            for pair in pairs:
+                data = synthetic_ohlcv(pair, timeframe, start=start.isoformat(), end=end.isoformat())
+                handler.ohlcv_store(pair, timeframe, data, CandleType.from_string(candle_type))
+            continue
+
+        config = configs[exchange_name]
+        if exchange_name not in exchanges:
+            exchange_config = dict(config, dry_run=True)
+            exchanges[exchange_name] = ExchangeResolver.load_exchange(exchange_config, validate=False)
+        timerange = TimeRange("date", "date", int(start.timestamp()), int(end.timestamp()))
+        missing += refresh_backtest_ohlcv_data(
+            exchanges[exchange_name],
+            pairs=pairs,
+            timeframes=[timeframe],
+            datadir=target,
+            trading_mode=config.get("trading_mode", "spot"),
+            timerange=timerange,
+            data_format=data_format,
+            candle_types=[CandleType.from_string(candle_type)],
+        )
+    return missing
+
+
+def _print_plan(plan: List[DataRequest], summary: dict, candle_limit: int) -> None:
+    print(f"{'exchange':<10} {'pair':<14} {'tf':<5} {'start':<17} {'end':<17} {'calls':>6}  strategies")
+    for request in plan:
+        print(
+            f"{request.key.exchange:<10} {request.key.pair:<14} {request.key.timeframe:<5} "
+            f"{request.start:%Y-%m-%d %H:%M} {request.end:%Y-%m-%d %H:%M} "
+            f"{request.calls(candle_limit):>6}  {', '.join(request.strategies)}"
+        )
+    print()
+    print(
+        f"Per-strategy: {summary['per_strategy_downloads']} downloads, "
+        f"{summary['per_strategy_calls']} requests, {summary['per_strategy_candles']} candles"
+    )
+    print(
+        f"Planned:      {summary['planned_downloads']} downloads, "
+        f"{summary['planned_calls']} requests, {summary['planned_candles']} candles"
+    )
+    print(f"Requests saved: {summary['calls_saved']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--timerange", required=True, help="Backtest timerange, e.g. 20240101-20240401")
+    parser.add_argument("--strategies", nargs="*", help="Limit to these strategies (default: all)")
+    parser.add_argument("--examples", action="store_true", help="Prefer config.json.example over config.json")
+    parser.add_argument("--candle-limit", type=int, default=DEFAULT_CANDLE_LIMIT, help="Candles per exchange request")
+    parser.add_argument("--output", type=Path, help="Write the plan as JSON")
+    parser.add_argument("--download", action="store_true", help="Run the deduplicated download")
+    parser.add_argument("--datadir", type=Path, default=Path("user_data/data"), help="Shared data directory")
+    parser.add_argument("--data-format", default=None, help="OHLCV data format (default: Freqtrade's)")
+    parser.add_argument("--fixture", action="store_true", help="Write synthetic candles instead of downloading")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    start, end = _parse_timerange(args.timerange)
+
+    requests: List[DataRequest] = []
+    configs: Dict[str, dict] = {}
+    for package in discover(args.strategies):
+        try:
+            package_requests = strategy_requests(package, start, end, prefer_example=args.examples)
+        except Exception as e:
+            logger.warning("Skipping %s: %s", package.name, e)
+            continue
+        requests += package_requests
+        config = package.load_config(prefer_example=args.examples)
+        configs.setdefault(config.get("exchange", {}).get("name", "binance"), config)
+
+    plan = build_plan(requests)
+    summary = summarize(requests, plan, args.candle_limit)
+    _print_plan(plan, summary, args.candle_limit)
+
+    if args.output:
+        args.output.write_text(
+            json.dumps(
+                {
+                    "summary": summary,
+                    "plan": [
+                        {
+                            "exchange": r.key.exchange,
+                            "pair": r.key.pair,
+                            "timeframe": r.key.timeframe,
+                            "candle_type": r.key.candle_type,
+                            "start": r.start.isoformat(),
+                            "end": r.end.isoformat(),
+                            "strategies": r.strategies,
+                        }
+                        for r in plan
+                    ],
+                },
+                indent=2,
+            )
+        )
+
+    if args.download:
+        missing = execute_plan(plan, args.datadir, configs, fixture=args.fixture, data_format=args.data_format)
+        if missing:
+            logger.warning("Pairs not available: %s", ", ".join(sorted(set(missing))))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,690 @@
+"""
+Candle-replay exchange stand-in and loop latency report for dry-run bots.
+
+`serve` runs a Binance-compatible REST stand-in (markets, klines, tickers,
+order books) that replays stored candles (synthetic where none are stored)
+from `--start` on a virtual clock running `--speed` times real time.
+`prepare` writes, for every strategy, a replay config that points the
+exchange at the stand-in (`user_data/replay/config.json`) and a compose
+override that mounts it, so the unmodified bots run against it:
+
+    python -m tools.replay_exchange prepare --speed 60 --start 2024-01-15
+    python -m tools.replay_exchange serve --datadir user_data/data/binance --speed 60 --start 2024-01-15
+    COMPOSE_OVERRIDE=user_data/replay/docker-compose.replay.yml scripts/bots up
+    python -m tools.replay_exchange report --log replay.jsonl
+
+Every bot gets its own URL prefix, so the stand-in logs each request per bot,
+and `serve` polls every bot's REST API (`/api/v1/health`) for the end of
+each loop iteration. `report` turns both into per-iteration latencies
+(candle refresh, analysis up to the first pricing request, pricing and
+orders) and the lag from a candle closing to the bot having processed it.
+
+With `--speed` above 1 the bots' clocks must run at the same speed: the
+override preloads libfaketime (`--faketime-lib`, mounted from the host)
+with `FAKETIME="@<start> x<speed>"`. At `--speed 1` no clock is faked and
+the stored history is shifted to end at the current time instead.
+"""
+
+import argparse
+import base64
+import copy
+import json
+import re
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from freqtrade.exchange import timeframe_to_minutes, timeframe_to_msecs
+
+from tools.fixtures import synthetic_ohlcv
+from tools.strategy_loader import discover
+
+REPLAY_DIR = Path("user_data") / "replay"
+OVERRIDE_NAME = "docker-compose.replay.yml"
+FAKETIME_LIB = "/usr/lib/x86_64-linux-gnu/faketime/libfaketime.so.1"
+FAKETIME_MOUNT = "/opt/faketime/libfaketime.so.1"
+# ccxt binance API roots the stand-in answers (path under the bot prefix).
+API_ROOTS = {
+    "public": "/api/v3",
+    "private": "/api/v3",
+    "v1": "/api/v1",
+    "sapi": "/sapi/v1",
+    "sapiV2": "/sapi/v2",
+    "sapiV3": "/sapi/v3",
+    "sapiV4": "/sapi/v4",
+}
+PRICING_ENDPOINTS = ("depth", "ticker/bookTicker", "ticker/price", "ticker/24hr")
+# One tick for every symbol, so exchangeInfo does not need to load candles.
+PRICE_TICK = "0.00000001"
+SYNTHETIC_HISTORY_DAYS = 120
+KLINES_LIMIT = 1000
+PERCENTILES = (50, 90, 99)
+DAY_MS = 86400 * 1000
+
+
+def _symbol(pair: str) -> str:
+    return pair.split(":")[0].replace("/", "")
+
+
+class ReplayData:
+    """
+    Candles per (pair, timeframe): stored history from `datadir`, resampled
+    from a finer stored timeframe, or synthetic. Loaded on first use.
+    """
+
+    def __init__(self, pairs: List[str], start: pd.Timestamp, days: int, datadir: Optional[Path], data_format=None):
+        self.pairs = pairs
+        self.start = start
+        self.days = days
+        self.datadir = datadir
+        self.data_format = data_format
+        self._candles: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def _stored(self, pair: str, timeframe: str) -> DataFrame:
+        if self.datadir is None:
+            return DataFrame()
+        from freqtrade.data.history import load_pair_history
+
+        return load_pair_history(pair, timeframe, self.datadir, data_format=self.data_format)
+
+    def _load(self, pair: str, timeframe: str) -> DataFrame:
+        candles = self._stored(pair, timeframe)
+        if not candles.empty:
+            return candles
+        minutes = timeframe_to_minutes(timeframe)
+        for finer in ("1m", "3m", "5m", "15m", "30m", "1h", "2h", "4h"):
+            finer_minutes = timeframe_to_minutes(finer)
+            if finer_minutes >= minutes or minutes % finer_minutes:
+                continue
+            stored = self._stored(pair, finer)
+            if not stored.empty:
+                return (
+                    stored.resample(f"{minutes}min", on="date")
+                    .agg({"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"})
+                    .dropna()
+                    .reset_index()
+                )
+        first = (self.start - pd.Timedelta(days=SYNTHETIC_HISTORY_DAYS)).floor("D")
+        return synthetic_ohlcv(pair, timeframe, start=str(first), end=str(self.start + pd.Timedelta(days=self.days)))
+
+    def candles(self, pair: str, timeframe: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (open times in ms, [open, high, low, close, volume] rows).
+        """
+        key = (pair, timeframe)
+        with self._lock:
+            if key not in self._candles:
+                candles = self._load(pair, timeframe)
+                times = candles["date"].dt.tz_localize(None).to_numpy().astype("datetime64[ms]").astype("int64")
+                values = candles[["open", "high", "low", "close", "volume"]].to_numpy(dtype="float64")
+                self._candles[key] = (times, values)
+            return self._candles[key]
+
+    def price(self, pair: str, now_ms: int) -> float:
+        """
+        Price at `now_ms`: interpolated through the finest loaded candle
+        of `pair` that is in progress.
+        """
+        with self._lock:
+            loaded = sorted(
+                (timeframe_to_msecs(tf), tf) for (p, tf) in self._candles if p == pair
+            )
+        timeframe = loaded[0][1] if loaded else "1h"
+        times, values = self.candles(pair, timeframe)
+        index = int(np.searchsorted(times, now_ms, side="right")) - 1
+        if index < 0:
+            return float(values[0, 0])
+        open_, close = values[index, 0], values[index, 3]
+        progress = min(max((now_ms - times[index]) / timeframe_to_msecs(timeframe), 0.0), 1.0)
+        return float(open_ + (close - open_) * progress)
+
+
+class Clock:
+    """
+    Virtual time of one bot. Fake mode (speed > 1): `start` at the bot's
+    first request, running `speed` times real time, served unshifted.
+    Real mode: the replay is shifted by whole days to run on real time.
+    """
+
+    def __init__(self, start: pd.Timestamp, speed: float, real: float):
+        self.speed = speed
+        self.real = real
+        start_ms = int(start.timestamp() * 1000)
+        if speed == 1:
+            now_ms = int(real * 1000)
+            self.shift_ms = (now_ms // DAY_MS - start_ms // DAY_MS) * DAY_MS
+            self.start_ms = now_ms - self.shift_ms
+        else:
+            self.shift_ms = 0
+            self.start_ms = start_ms
+
+    def now_ms(self, real: Optional[float] = None) -> int:
+        """
+        Virtual time in the replayed data's time frame.
+        """
+        elapsed = (time.time() if real is None else real) - self.real
+        return self.start_ms + int(elapsed * self.speed * 1000)
+
+    def to_real(self, data_ms: int) -> float:
+        return self.real + (data_ms - self.start_ms) / 1000 / self.speed
+
+    def as_dict(self) -> dict:
+        return {"real": self.real, "start_ms": self.start_ms, "speed": self.speed, "shift_ms": self.shift_ms}
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    server_version = "FreqHubReplay/1.0"
+    # Set on the server instance: data, start, speed, clocks, lock, output, spread, levels
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        received = time.time()
+        url = urlsplit(self.path)
+        parts = url.path.strip("/").split("/", 1)
+        if len(parts) < 2:
+            return self._send(404, {"code": -1121, "msg": "Unknown bot"}, None, None, received)
+        bot, path = parts
+        query = dict(parse_qsl(url.query))
+        clock = self.server.clock(bot, received)
+        endpoint = re.sub(r"^(api|sapi)/v\d+/", "", path)
+        handler = getattr(self, "_" + endpoint.replace("/", "_"), None)
+        extra = {}
+        if handler is None:
+            status, body = 404, {"code": -1000, "msg": f"Not served by the replay stand-in: {path}"}
+        else:
+            try:
+                status, body = 200, handler(query, clock, extra)
+            except (KeyError, ValueError) as e:
+                status, body = 400, {"code": -1100, "msg": str(e)}
+        self._send(status, body, bot, endpoint, received, query.get("symbol"), extra)
+
+    def _send(self, status, body, bot, endpoint, received, symbol=None, extra=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        if bot is not None:
+            self.server.record(
+                {
+                    "kind": "request",
+                    "bot": bot,
+                    "endpoint": endpoint,
+                    "symbol": symbol,
+                    "status": status,
+                    "received": received,
+                    "sent": time.time(),
+                    **(extra or {}),
+                }
+            )
+
+    # --- Binance spot endpoints -------------------------------------------
+
+    def _ping(self, query, clock, extra):
+        return {}
+
+    def _time(self, query, clock, extra):
+        return {"serverTime": clock.now_ms() + clock.shift_ms}
+
+    def _exchangeInfo(self, query, clock, extra):
+        symbols = []
+        for pair in self.server.data.pairs:
+            base, quote = pair.split(":")[0].split("/")
+            symbols.append(
+                {
+                    "symbol": _symbol(pair),
+                    "status": "TRADING",
+                    "baseAsset": base,
+                    "baseAssetPrecision": 8,
+                    "quoteAsset": quote,
+                    "quotePrecision": 8,
+                    "quoteAssetPrecision": 8,
+                    "orderTypes": ["LIMIT", "LIMIT_MAKER", "MARKET", "STOP_LOSS_LIMIT", "TAKE_PROFIT_LIMIT"],
+                    "icebergAllowed": True,
+                    "ocoAllowed": True,
+                    "isSpotTradingAllowed": True,
+                    "isMarginTradingAllowed": False,
+                    "filters": [
+                        {"filterType": "PRICE_FILTER", "minPrice": PRICE_TICK, "maxPrice": "1000000.0",
+                         "tickSize": PRICE_TICK},
+                        {"filterType": "LOT_SIZE", "minQty": "0.00000100", "maxQty": "900000.0",
+                         "stepSize": "0.00000100"},
+                        {"filterType": "NOTIONAL", "minNotional": "5.0", "applyMinToMarket": True,
+                         "maxNotional": "9000000.0", "applyMaxToMarket": False, "avgPriceMins": 5},
+                    ],
+                    "permissions": [],
+                    "permissionSets": [["SPOT"]],
+                    "defaultSelfTradePreventionMode": "EXPIRE_MAKER",
+                    "allowedSelfTradePreventionModes": ["EXPIRE_TAKER", "EXPIRE_MAKER", "EXPIRE_BOTH"],
+                }
+            )
+        return {
+            "timezone": "UTC",
+            "serverTime": clock.now_ms() + clock.shift_ms,
+            "rateLimits": [],
+            "exchangeFilters": [],
+            "symbols": symbols,
+        }
+
+    def _pair(self, symbol: str) -> str:
+        for pair in self.server.data.pairs:
+            if _symbol(pair) == symbol:
+                return pair
+        raise KeyError(f"Invalid symbol {symbol}")
+
+    def _klines(self, query, clock, extra):
+        pair = self._pair(query["symbol"])
+        interval = query["interval"]
+        interval_ms = timeframe_to_msecs(interval)
+        now_ms = clock.now_ms()
+        times, values = self.server.data.candles(pair, interval)
+        limit = min(int(query.get("limit", 500)), KLINES_LIMIT)
+        last = int(np.searchsorted(times, now_ms, side="right"))
+        first = 0
+        if "startTime" in query:
+            first = int(np.searchsorted(times, int(query["startTime"]) - clock.shift_ms))
+        if "endTime" in query:
+            last = min(last, int(np.searchsorted(times, int(query["endTime"]) - clock.shift_ms, side="right")))
+        first = max(first, last - limit) if "startTime" not in query else first
+        last = min(last, first + limit)
+
+        rows = []
+        for index in range(first, last):
+            opened = int(times[index])
+            open_, high, low, close, volume = values[index]
+            if opened + interval_ms > now_ms:
+                # In progress: only the open is known.
+                high = low = close = open_
+                volume = 0.0
+            served = opened + clock.shift_ms
+            rows.append(
+                [served, f"{open_:.8f}", f"{high:.8f}", f"{low:.8f}", f"{close:.8f}", f"{volume:.8f}",
+                 served + interval_ms - 1, f"{volume * close:.8f}", 0, "0", "0", "0"]
+            )
+        closed = [row[0] for row in rows if row[6] < now_ms + clock.shift_ms]
+        extra.update({"interval": interval, "rows": len(rows), "closed": closed[-1] + interval_ms if closed else None})
+        return rows
+
+    def _book(self, pair: str, clock) -> Tuple[float, float]:
+        price = self.server.data.price(pair, clock.now_ms())
+        half_spread = price * self.server.spread / 2
+        return price - half_spread, price + half_spread
+
+    def _depth(self, query, clock, extra):
+        pair = self._pair(query["symbol"])
+        bid, ask = self._book(pair, clock)
+        levels = min(int(query.get("limit", 100)), self.server.levels)
+        step = (ask - bid) or bid * 1e-4
+        return {
+            "lastUpdateId": clock.now_ms(),
+            "bids": [[f"{bid - step * i:.8f}", f"{1.0 + i:.8f}"] for i in range(levels)],
+            "asks": [[f"{ask + step * i:.8f}", f"{1.0 + i:.8f}"] for i in range(levels)],
+        }
+
+    def _tickers(self, query, clock, builder):
+        if "symbol" in query:
+            return builder(self._pair(query["symbol"]))
+        return [builder(pair) for pair in self.server.data.pairs]
+
+    def _ticker_price(self, query, clock, extra):
+        return self._tickers(
+            query, clock, lambda pair: {"symbol": _symbol(pair), "price": f"{sum(self._book(pair, clock)) / 2:.8f}"}
+        )
+
+    def _ticker_bookTicker(self, query, clock, extra):
+        def ticker(pair):
+            bid, ask = self._book(pair, clock)
+            return {"symbol": _symbol(pair), "bidPrice": f"{bid:.8f}", "bidQty": "1.0",
+                    "askPrice": f"{ask:.8f}", "askQty": "1.0"}
+
+        return self._tickers(query, clock, ticker)
+
+    def _ticker_24hr(self, query, clock, extra):
+        now_ms = clock.now_ms()
+
+        def ticker(pair):
+            bid, ask = self._book(pair, clock)
+            last = (bid + ask) / 2
+            times, values = self.server.data.candles(pair, "1h")
+            window = values[(times > now_ms - DAY_MS) & (times <= now_ms - 3600 * 1000)]
+            opened = window[0, 0] if len(window) else last
+            high = max(window[:, 1].max(), last) if len(window) else last
+            low = min(window[:, 2].min(), last) if len(window) else last
+            volume = float(window[:, 4].sum()) if len(window) else 0.0
+            return {
+                "symbol": _symbol(pair), "priceChange": f"{last - opened:.8f}",
+                "priceChangePercent": f"{(last / opened - 1) * 100:.3f}", "weightedAvgPrice": f"{last:.8f}",
+                "prevClosePrice": f"{opened:.8f}", "lastPrice": f"{last:.8f}", "lastQty": "1.0",
+                "bidPrice": f"{bid:.8f}", "bidQty": "1.0", "askPrice": f"{ask:.8f}", "askQty": "1.0",
+                "openPrice": f"{opened:.8f}", "highPrice": f"{high:.8f}", "lowPrice": f"{low:.8f}",
+                "volume": f"{volume:.8f}", "quoteVolume": f"{volume * last:.8f}",
+                "openTime": now_ms + clock.shift_ms - DAY_MS, "closeTime": now_ms + clock.shift_ms,
+                "firstId": 0, "lastId": 0, "count": 0,
+            }
+
+        return self._tickers(query, clock, ticker)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, data: ReplayData, speed: float, output, spread_bps: float, levels: int):
+        super().__init__(address, _StandIn)
+        self.data = data
+        self.speed = speed
+        self.output = output
+        self.spread = spread_bps / 10000
+        self.levels = levels
+        self.lock = threading.Lock()
+        self.clocks: Dict[str, Clock] = {}
+
+    def clock(self, bot: str, real: float) -> Clock:
+        with self.lock:
+            if bot not in self.clocks:
+                self.clocks[bot] = Clock(self.data.start, self.speed, real)
+                self.output.write(json.dumps({"kind": "clock", "bot": bot, **self.clocks[bot].as_dict()}) + "\n")
+            return self.clocks[bot]
+
+    def record(self, record: dict) -> None:
+        with self.lock:
+            self.output.write(json.dumps(record) + "\n")
+
+
+def _poll_health(server: ReplayServer, bot: dict, interval: float, stop: threading.Event) -> None:
+    """
+    Record every change of the bot's `last_process` (end of a loop iteration).
+    """
+    credentials = base64.b64encode(f"{bot['username']}:{bot['password']}".encode()).decode()
+    request = urllib.request.Request(
+        bot["api_url"].rstrip("/") + "/api/v1/health", headers={"Authorization": f"Basic {credentials}"}
+    )
+    last = None
+    while not stop.wait(interval):
+        try:
+            with urllib.request.urlopen(request, timeout=2) as response:
+                health = json.load(response)
+        except (OSError, ValueError):
+            continue
+        observed = time.time()
+        if health.get("last_process") and health["last_process"] != last:
+            last = health["last_process"]
+            server.record({"kind": "iteration", "bot": bot["name"], "observed": observed, "last_process": last})
+
+
+def serve(args) -> None:
+    packages = discover(args.strategies)
+    pairs = args.pairs or sorted(
+        {pair for package in packages for pair in package.load_config().get("exchange", {}).get("pair_whitelist", [])}
+    )
+    start = pd.Timestamp(args.start, tz="UTC")
+    data = ReplayData(pairs, start, args.days, Path(args.datadir) if args.datadir else None, args.data_format)
+    output = Path(args.log).open("a", buffering=1)
+    server = ReplayServer((args.host, args.port), data, args.speed, output, args.spread_bps, args.levels)
+
+    stop = threading.Event()
+    bots = json.loads(Path(args.manifest).read_text()) if Path(args.manifest).is_file() else []
+    for bot in bots:
+        threading.Thread(target=_poll_health, args=(server, bot, args.poll, stop), daemon=True).start()
+
+    print(
+        f"Replaying {len(pairs)} pairs from {start} at {args.speed:g}x on http://{args.host}:{args.port}/<bot>/ "
+        f"-> {args.log}, polling {len(bots)} bots (Ctrl+C to stop)"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+        output.close()
+
+
+# --- prepare ---------------------------------------------------------------
+
+
+def _service_name(compose_file: Path) -> Optional[str]:
+    import yaml
+
+    services = (yaml.safe_load(compose_file.read_text()) or {}).get("services") or {}
+    return next(iter(services), None)
+
+
+def _api_port(compose_file: Path) -> Optional[int]:
+    import yaml
+
+    services = (yaml.safe_load(compose_file.read_text()) or {}).get("services") or {}
+    for service in services.values():
+        for mapping in service.get("ports", []):
+            host, _, container = str(mapping).rpartition(":")
+            if container == "8080" and host:
+                return int(host.rsplit(":", 1)[-1])
+    return None
+
+
+def replay_config(config: dict, bot: str, url: str) -> dict:
+    """
+    `config` in dry-run against the stand-in (REST only, no websockets).
+    """
+    config = copy.deepcopy(config)
+    config["dry_run"] = True
+    exchange = config.setdefault("exchange", {})
+    exchange.update({"name": "binance", "key": "", "secret": "", "enable_ws": False})
+    ccxt_config = exchange.setdefault("ccxt_config", {})
+    ccxt_config["urls"] = {"api": {name: f"{url.rstrip('/')}/{bot}{root}" for name, root in API_ROOTS.items()}}
+    ccxt_config.setdefault("options", {})["fetchMarkets"] = {"types": ["spot"]}
+    return config
+
+
+def _override(service: str, speed: float, start: pd.Timestamp, faketime_lib: str) -> str:
+    lines = [
+        "# Generated by `python -m tools.replay_exchange prepare`; runs the bot against the replay stand-in.",
+        "services:",
+        f"  {service}:",
+        "    extra_hosts:",
+        '      - "host.docker.internal:host-gateway"',
+        "    volumes:",
+        f"      - ./{REPLAY_DIR.as_posix()}/config.json:/freqtrade/user_data/config.json:ro",
+    ]
+    if speed != 1:
+        lines += [
+            f"      - {faketime_lib}:{FAKETIME_MOUNT}:ro",
+            "    environment:",
+            f"      LD_PRELOAD: {FAKETIME_MOUNT}",
+            f'      FAKETIME: "@{start:%Y-%m-%d %H:%M:%S} x{speed:g}"',
+            '      FAKETIME_DONT_FAKE_MONOTONIC: "1"',
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def prepare(args) -> None:
+    start = pd.Timestamp(args.start, tz="UTC")
+    bots = []
+    for package in discover(args.strategies):
+        compose_file = package.folder / "docker-compose.yml"
+        service = _service_name(compose_file) if compose_file.is_file() else None
+        if service is None:
+            print(f"Skipping {package.name}: no docker-compose.yml service")
+            continue
+        config = package.load_config()
+        folder = package.folder / REPLAY_DIR
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / "config.json").write_text(json.dumps(replay_config(config, package.name, args.url), indent=2) + "\n")
+        (folder / OVERRIDE_NAME).write_text(_override(service, args.speed, start, args.faketime_lib))
+
+        api = config.get("api_server", {})
+        port = _api_port(compose_file)
+        if api.get("enabled") and port:
+            bots.append(
+                {
+                    "name": package.name,
+                    "api_url": f"http://127.0.0.1:{port}",
+                    "username": api.get("username", ""),
+                    "password": api.get("password", ""),
+                }
+            )
+        print(f"{package.name}: {folder / OVERRIDE_NAME}")
+
+    Path(args.manifest).write_text(json.dumps(bots, indent=2) + "\n")
+    print(f"{len(bots)} bots with an API server -> {args.manifest}")
+    print(f"Run: COMPOSE_OVERRIDE={REPLAY_DIR.as_posix()}/{OVERRIDE_NAME} scripts/bots up")
+
+
+# --- report ----------------------------------------------------------------
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    data = np.asarray(values) * 1000.0
+    result = {f"p{p}": float(np.percentile(data, p)) for p in PERCENTILES}
+    result["max"] = float(data.max())
+    result["mean"] = float(data.mean())
+    return result
+
+
+def bot_report(records: List[dict]) -> dict:
+    """
+    Latencies of one bot, in milliseconds of real time.
+
+    An iteration ends when the bot's `last_process` changed (first poll
+    that saw it). Iterations that fetched candles are split into refresh
+    (first to last klines request), analysis (until the first pricing
+    request, or the end) and pricing/orders (the rest).
+    """
+    clock = next((r for r in records if r["kind"] == "clock"), None)
+    requests = sorted((r for r in records if r["kind"] == "request"), key=lambda r: r["received"])
+    ends = sorted(r["observed"] for r in records if r["kind"] == "iteration")
+    phases = {"refresh": [], "analysis": [], "orders": [], "total": []}
+    previous = 0.0
+    window_start = 0
+    for end in ends:
+        window = []
+        while window_start < len(requests) and requests[window_start]["received"] <= end:
+            if requests[window_start]["received"] > previous:
+                window.append(requests[window_start])
+            window_start += 1
+        previous = end
+        klines = [r for r in window if r["endpoint"] == "klines"]
+        if not klines:
+            continue
+        refreshed = max(r["sent"] for r in klines)
+        pricing = [r["received"] for r in window if r["endpoint"] in PRICING_ENDPOINTS and r["received"] >= refreshed]
+        analyzed = min(pricing) if pricing else end
+        phases["refresh"].append(refreshed - min(r["received"] for r in klines))
+        phases["analysis"].append(analyzed - refreshed)
+        phases["orders"].append(end - analyzed)
+        phases["total"].append(end - min(r["received"] for r in klines))
+
+    lags = {"fetch": [], "processed": []}
+    fetched = [r for r in requests if r["endpoint"] == "klines" and r.get("closed")]
+    if clock and fetched:
+        intervals = [r["interval"] for r in fetched]
+        base = max(set(intervals), key=intervals.count)
+        base_fetches = [r for r in fetched if r["interval"] == base]
+        closes = sorted({r["closed"] for r in base_fetches})
+        for close in closes[1:]:
+            first = next(r for r in base_fetches if r["closed"] >= close)
+            available = clock["real"] + (close - clock["shift_ms"] - clock["start_ms"]) / 1000 / clock["speed"]
+            done = next((end for end in ends if end >= first["sent"]), None)
+            lags["fetch"].append(first["sent"] - available)
+            if done is not None:
+                lags["processed"].append(done - available)
+
+    endpoints: Dict[str, int] = {}
+    for request in requests:
+        endpoints[request["endpoint"]] = endpoints.get(request["endpoint"], 0) + 1
+    return {
+        "speed": clock["speed"] if clock else None,
+        "iterations": len(ends),
+        "iterations_with_candles": len(phases["total"]),
+        "requests": endpoints,
+        "errors": sum(1 for r in requests if r["status"] != 200),
+        "latency_ms": {name: _percentiles(values) for name, values in phases.items()},
+        "candle_lag_ms": {name: _percentiles(values) for name, values in lags.items()},
+    }
+
+
+def build_report(records: List[dict]) -> Dict[str, dict]:
+    bots = sorted({r["bot"] for r in records if "bot" in r})
+    return {bot: bot_report([r for r in records if r.get("bot") == bot]) for bot in bots}
+
+
+def _print_report(report: Dict[str, dict]) -> None:
+    header = "".join(f"{name:>10}" for name in [f"p{p}" for p in PERCENTILES] + ["max", "mean"])
+    for bot, result in report.items():
+        print(
+            f"{bot}: {result['iterations']} iterations ({result['iterations_with_candles']} with new candles), "
+            f"{sum(result['requests'].values())} requests, {result['errors']} errors, speed {result['speed']}"
+        )
+        print(f"  {'(ms, real time)':<20}{header}")
+        for group in ("latency_ms", "candle_lag_ms"):
+            for name, values in result[group].items():
+                label = name if group == "latency_ms" else f"lag {name}"
+                if not values:
+                    print(f"  {label:<20}{'-':>10}")
+                    continue
+                row = "".join(f"{values[key]:>10.1f}" for key in [f"p{p}" for p in PERCENTILES] + ["max", "mean"])
+                print(f"  {label:<20}{row}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    server = commands.add_parser("serve", help="Run the exchange stand-in")
+    server.add_argument("--host", default="0.0.0.0")
+    server.add_argument("--port", type=int, default=8790)
+    server.add_argument("--strategies", nargs="*", help="Strategies whose whitelists to serve (default: all)")
+    server.add_argument("--pairs", nargs="+", help="Pairs to serve (default: the strategies' whitelists)")
+    server.add_argument("--datadir", help="Stored candles to replay (default: synthetic)")
+    server.add_argument("--data-format", help="Candle format in --datadir (default: feather)")
+    server.add_argument("--days", type=int, default=30, help="Synthetic candles after --start, in days")
+    server.add_argument("--spread-bps", type=float, default=2.0, help="Bid/ask spread of tickers and order books")
+    server.add_argument("--levels", type=int, default=20, help="Order book levels per side")
+    server.add_argument("--log", default="replay.jsonl", help="Request and iteration log (JSONL)")
+    server.add_argument("--poll", type=float, default=0.2, help="Seconds between bot health polls")
+
+    setup = commands.add_parser("prepare", help="Write replay configs and compose overrides for the bots")
+    setup.add_argument("--strategies", nargs="*", help="Strategy names (default: all)")
+    setup.add_argument("--url", default="http://host.docker.internal:8790", help="Stand-in URL seen from the bots")
+    setup.add_argument("--faketime-lib", default=FAKETIME_LIB, help="libfaketime on the Docker host")
+
+    for command in (server, setup):
+        command.add_argument("--start", default="2024-01-15", help="Replay start (UTC)")
+        command.add_argument("--speed", type=float, default=1.0, help="Virtual seconds per real second")
+        command.add_argument("--manifest", default="replay-bots.json", help="Bots to poll (written by prepare)")
+
+    report = commands.add_parser("report", help="Per-bot iteration latency and candle lag report")
+    report.add_argument("--log", default="replay.jsonl")
+    report.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args)
+    elif args.command == "prepare":
+        prepare(args)
+    else:
+        with open(args.log) as f:
+            result = build_report([json.loads(line) for line in f if line.strip()])
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            _print_report(result)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,203 @@
+"""
+Fast single-pair trade simulation on analyzed candles, for offline tools.
+
+An approximation of Freqtrade's backtesting for long-only strategies that
+trade one position per pair: entries fill at the open after an entry
+signal, and a trade closes on the first candle where
+
+1. the previous candle had an exit signal and no entry signal (at the open),
+2. the low reaches the stoploss (at the stop, or the open if it gapped below),
+3. the high reaches the ROI target for the trade duration (at the target,
+   or the open if it gapped above),
+
+in that order. With `trailing` the stoploss follows the highs
+(`freqhub_common.kernels.trailing_stop`). Custom exits and position
+adjustment are not simulated. Trades still open at the end are closed at
+the last close.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from freqhub_common.kernels import trailing_stop
+from freqhub_common.parameters import RoiTable
+
+DEFAULT_FEE = 0.001
+SCAN_CHUNK = 256
+
+TRADE_COLUMNS = (
+    "pair",
+    "open_date",
+    "close_date",
+    "open_rate",
+    "close_rate",
+    "profit_ratio",
+    "exit_reason",
+    "candles",
+)
+
+
+@dataclass(frozen=True)
+class TrailingStop:
+    """
+    A strategy's trailing stop settings (Freqtrade's `trailing_stop_*`).
+    """
+
+    positive: Optional[float] = None
+    offset: float = 0.0
+    only_offset_is_reached: bool = False
+
+    @classmethod
+    def from_strategy(cls, strategy) -> Optional["TrailingStop"]:
+        if not strategy.trailing_stop:
+            return None
+        return cls(
+            positive=strategy.trailing_stop_positive,
+            offset=float(strategy.trailing_stop_positive_offset or 0.0),
+            only_offset_is_reached=bool(strategy.trailing_only_offset_is_reached),
+        )
+
+
+def roi_targets(roi: RoiTable, durations: np.ndarray) -> np.ndarray:
+    """
+    ROI ratio for every trade duration in minutes; inf before the first step.
+    """
+    minutes = np.asarray(roi.minutes, dtype="int64")
+    ratios = np.asarray(roi.ratios + (np.inf,), dtype="float64")
+    index = np.searchsorted(minutes, durations, side="right") - 1
+    return ratios[np.where(index >= 0, index, -1)]
+
+
+def simulate_trades(
+    dataframe: DataFrame,
+    roi: RoiTable,
+    stoploss: float,
+    timeframe_minutes: int,
+    pair: str = "",
+    fee: float = DEFAULT_FEE,
+    start: int = 0,
+    end: Optional[int] = None,
+    trailing: Optional[TrailingStop] = None,
+) -> DataFrame:
+    """
+    Trades of one pair from an analyzed dataframe (`enter_long`,
+    `exit_long`). Only entry signals on rows [start, end) open trades, and
+    trades are closed by row `end - 1` at the latest.
+    """
+    end = len(dataframe) if end is None else end
+    dates = dataframe["date"].to_numpy()
+    open_ = dataframe["open"].to_numpy(dtype="float64")
+    high = dataframe["high"].to_numpy(dtype="float64")
+    low = dataframe["low"].to_numpy(dtype="float64")
+    close = dataframe["close"].to_numpy(dtype="float64")
+    enter = _flags(dataframe, "enter_long")
+    exit_ = _flags(dataframe, "exit_long")
+    entries = np.flatnonzero(enter & ~exit_)
+    entries = entries[(entries >= start) & (entries < end - 1)]
+
+    fee_factor = (1 - fee) / (1 + fee)
+    rows = []
+    position = start
+    for signal in entries:
+        if signal < position:
+            continue
+        entry = signal + 1
+        rate = open_[entry]
+        initial_stop = stop = rate * (1 + stoploss)
+
+        close_row, close_rate, reason = end - 1, close[end - 1], "force_exit"
+        for first in range(entry, end, SCAN_CHUNK):
+            last = min(first + SCAN_CHUNK, end)
+            rows_ = np.arange(first, last)
+            signalled = (rows_ > entry) & exit_[rows_ - 1] & ~enter[rows_ - 1]
+            if trailing is None:
+                stopped = low[first:last] <= stop
+            else:
+                hit, stop = trailing_stop(
+                    high[first:last],
+                    low[first:last],
+                    stop,
+                    rate,
+                    fee_factor,
+                    abs(stoploss),
+                    trailing.positive,
+                    trailing.offset,
+                    trailing.only_offset_is_reached,
+                )
+                stopped = np.zeros(last - first, dtype=bool)
+                if hit >= 0:
+                    stopped[hit] = True
+            target = rate * (1 + roi_targets(roi, (rows_ - entry) * timeframe_minutes)) / fee_factor
+            reached = high[first:last] >= target
+            hits = np.flatnonzero(signalled | stopped | reached)
+            if not len(hits):
+                continue
+            hit = hits[0]
+            close_row = first + hit
+            if signalled[hit]:
+                close_rate, reason = open_[close_row], "exit_signal"
+            elif stopped[hit] and trailing is not None:
+                # As in Freqtrade: this candle's high may have moved the stop above its open.
+                close_rate = open_[close_row] if stop > high[close_row] else stop
+                reason = "trailing_stop_loss" if stop > initial_stop else "stop_loss"
+            elif stopped[hit]:
+                close_rate, reason = min(stop, open_[close_row]), "stop_loss"
+            else:
+                gapped = close_row > entry and open_[close_row] > target[hit]
+                close_rate, reason = (open_[close_row] if gapped else target[hit]), "roi"
+            break
+
+        rows.append(
+            (
+                pair,
+                dates[entry],
+                dates[close_row],
+                rate,
+                close_rate,
+                close_rate / rate * fee_factor - 1,
+                reason,
+                close_row - entry,
+            )
+        )
+        # Freqtrade checks entries before exits, so the next trade opens
+        # after the candle this one closed on at the earliest.
+        position = close_row
+
+    trades = DataFrame.from_records(rows, columns=list(TRADE_COLUMNS))
+    return trades.astype({"profit_ratio": "float64", "candles": "int64"})
+
+
+def _flags(dataframe: DataFrame, column: str) -> np.ndarray:
+    if column not in dataframe.columns:
+        return np.zeros(len(dataframe), dtype=bool)
+    return dataframe[column].fillna(0).to_numpy() == 1
+
+
+def trade_metrics(trades: DataFrame) -> dict:
+    """
+    Summary of a trade list: count, summed and mean profit ratio, win
+    rate, per-trade Sharpe ratio and the largest drawdown of the summed
+    profit curve (all as ratios of the stake).
+    """
+    if trades.empty:
+        return {"trades": 0, "profit": 0.0, "mean": 0.0, "win_rate": 0.0, "sharpe": 0.0, "drawdown": 0.0}
+    profits = trades.sort_values("close_date")["profit_ratio"].to_numpy()
+    curve = np.concatenate(([0.0], np.cumsum(profits)))
+    std = profits.std(ddof=1) if len(profits) > 1 else 0.0
+    return {
+        "trades": int(len(profits)),
+        "profit": float(curve[-1]),
+        "mean": float(profits.mean()),
+        "win_rate": float((profits > 0).mean()),
+        "sharpe": float(profits.mean() / std * np.sqrt(len(profits))) if std > 0 else 0.0,
+        "drawdown": float((np.maximum.accumulate(curve) - curve).max()),
+    }
+
+
+def concat_trades(*trades: DataFrame) -> DataFrame:
+    frames = [t for t in trades if not t.empty]
+    return pd.concat(frames, ignore_index=True) if frames else DataFrame(columns=list(TRADE_COLUMNS))
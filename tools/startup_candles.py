@@ -0,0 +1,252 @@
+"""
+Find the smallest startup_candle_count after which strategy columns converge.
+
+For each strategy, analyzes a long history once as the reference, then
+re-analyzes the same evaluation window with only `w` candles of warm-up for
+every `w` on a grid. A column has converged at `w` when it matches the
+reference within the tolerance over the whole window for that and every
+larger warm-up. This is repeated for the default parameters, all numeric
+parameters at their upper bound, and random draws from the hyperopt ranges;
+the recommendation is the largest warm-up any of them needs.
+
+    python -m tools.startup_candles
+    python -m tools.startup_candles --strategies IchiV1 FailureToReturn --rtol 1e-4 --samples 8
+    python -m tools.startup_candles --datadir user_data/data/binance --pair ETH/USDT --columns
+
+Exits with status 1 if a strategy declares fewer startup candles than
+recommended.
+"""
+
+import argparse
+import json
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from tools.fixtures import FixtureDataProvider, load_candles, truncate_candles
+from tools.strategy_loader import (
+    StrategyPackage,
+    analyze,
+    create_strategy,
+    discover,
+    offline_config,
+    sample_parameters,
+    set_parameters,
+    strategy_timeframes,
+)
+
+OHLCV_COLUMNS = ("date", "open", "high", "low", "close", "volume")
+SIGNAL_PREFIXES = ("enter_", "exit_")
+
+
+def parameter_scenarios(strategy, samples: int, rng: np.random.Generator) -> Dict[str, Dict[str, object]]:
+    """
+    Parameter sets to test: defaults, numeric parameters at their upper
+    bound, and `samples` random draws from the hyperopt ranges.
+    """
+    parameters = dict(strategy.enumerate_parameters())
+    scenarios = {"default": {}}
+    if not parameters:
+        return scenarios
+
+    scenarios["high"] = {name: p.high for name, p in parameters.items() if hasattr(p, "high")}
+    for number in range(samples):
+        scenarios[f"sample {number + 1}"] = sample_parameters(strategy, rng)
+    return scenarios
+
+
+def _converged(result: DataFrame, reference: DataFrame, columns: List[str], rtol: float, atol: float) -> np.ndarray:
+    """
+    One flag per column: does `result` match `reference` over every row?
+    Numeric columns are compared as one matrix; NaN matches NaN.
+    """
+    numeric = [c for c in columns if pd.api.types.is_numeric_dtype(reference[c])]
+    flags = dict.fromkeys(columns, False)
+    if numeric:
+        present = [c for c in numeric if c in result.columns and pd.api.types.is_numeric_dtype(result[c])]
+        if present:
+            a = result[present].to_numpy(dtype="float64", na_value=np.nan)
+            b = reference[present].to_numpy(dtype="float64", na_value=np.nan)
+            flags.update(zip(present, np.isclose(a, b, rtol=rtol, atol=atol, equal_nan=True).all(axis=0)))
+    for column in columns:
+        if column in numeric or column not in result.columns:
+            continue
+        a, b = result[column], reference[column]
+        flags[column] = bool(((a.isna() & b.isna()) | (a.astype(str) == b.astype(str))).all())
+    return np.fromiter((flags[c] for c in columns), dtype=bool, count=len(columns))
+
+
+def required_warmup(grid: np.ndarray, converged: np.ndarray) -> np.ndarray:
+    """
+    Per column (axis 1), the smallest warm-up on `grid` (axis 0) from which
+    every larger warm-up also converges; -1 if even the largest does not.
+    """
+    stable = np.logical_and.accumulate(converged[::-1], axis=0)[::-1]
+    first = np.argmax(stable, axis=0)
+    return np.where(stable.any(axis=0), grid[first], -1)
+
+
+def check_strategy(
+    package: StrategyPackage,
+    pair: str,
+    max_startup: int,
+    step: int,
+    reference: int,
+    window: int,
+    rtol: float,
+    atol: float,
+    samples: int,
+    datadir: Optional[str] = None,
+    data_format: Optional[str] = None,
+    seed: int = 0,
+) -> dict:
+    config = offline_config(package)
+    probe = create_strategy(package, config, dp=FixtureDataProvider({}, whitelist=[pair]))
+    timeframe = probe.timeframe
+    declared = int(getattr(type(probe), "startup_candle_count", 0) or 0)
+    configured = config.get("startup_candle_count")
+
+    total = max_startup + reference + window
+    data = load_candles(
+        pair, strategy_timeframes(probe, pair), total, datadir=datadir, data_format=data_format, seed=seed
+    )
+    rows = len(data[(pair, timeframe)])
+    evaluate_from = rows - window
+    if evaluate_from - max_startup < 0:
+        raise ValueError(f"{package.name}: {rows} candles are not enough for the requested warm-up")
+
+    grid = np.arange(0, max_startup + 1, step)
+    rng = np.random.default_rng(seed)
+    started = time.perf_counter()
+
+    def run(values: Dict[str, object], candles) -> DataFrame:
+        strategy = create_strategy(package, config, dp=FixtureDataProvider(candles, whitelist=[pair]))
+        set_parameters(strategy, values)
+        return analyze(strategy, candles, pair).tail(window).reset_index(drop=True)
+
+    scenarios = {}
+    for name, values in parameter_scenarios(probe, samples, rng).items():
+        expected = run(values, data)
+        columns = [str(c) for c in expected.columns if str(c) not in OHLCV_COLUMNS]
+        converged = np.vstack(
+            [
+                _converged(
+                    run(values, truncate_candles(data, timeframe, rows, start=evaluate_from - int(w))),
+                    expected,
+                    columns,
+                    rtol,
+                    atol,
+                )
+                for w in grid
+            ]
+        )
+        needed = required_warmup(grid, converged)
+        scenarios[name] = {"values": values, "columns": dict(zip(columns, needed.tolist()))}
+
+    columns: Dict[str, int] = {}
+    for scenario in scenarios.values():
+        for column, needed in scenario["columns"].items():
+            previous = columns.get(column, 0)
+            columns[column] = -1 if -1 in (previous, needed) else max(previous, needed)
+
+    def recommend(names: List[str]) -> Optional[int]:
+        values = [columns[c] for c in names]
+        return None if -1 in values else max(values, default=0)
+
+    recommended = recommend(list(columns))
+    signals = recommend([c for c in columns if c.startswith(SIGNAL_PREFIXES)])
+    effective = int(configured) if configured is not None else declared
+    if recommended is None:
+        verdict = f"does not converge within {max_startup} candles"
+    elif effective < recommended:
+        verdict = "too low"
+    elif effective > recommended + step:
+        verdict = "can be lowered"
+    else:
+        verdict = "ok"
+
+    return {
+        "strategy": package.name,
+        "pair": pair,
+        "timeframe": timeframe,
+        "declared": declared,
+        "configured": configured,
+        "recommended": recommended,
+        "recommended_signals": signals,
+        "verdict": verdict,
+        "columns": columns,
+        "scenarios": scenarios,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def _format(value: Optional[int], limit: int) -> str:
+    return f">{limit}" if value is None or value < 0 else str(value)
+
+
+def _print_result(result: dict, max_startup: int, show_columns: bool) -> None:
+    configured = result["configured"]
+    print(
+        f"{result['strategy']:<22} {result['timeframe']:<4} declared {result['declared']:>4}"
+        f"{'' if configured is None else f' (config {configured})':<14} "
+        f"recommended {_format(result['recommended'], max_startup):>5} "
+        f"(signals {_format(result['recommended_signals'], max_startup)})  "
+        f"{result['verdict']}  [{len(result['scenarios'])} parameter sets, {result['seconds']:.1f}s]"
+    )
+    if not show_columns:
+        return
+    ranked = sorted(result["columns"].items(), key=lambda item: (item[1] >= 0, -item[1] if item[1] >= 0 else 0))
+    for column, needed in ranked:
+        print(f"    {column:<32} {_format(needed, max_startup):>5}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--strategies", nargs="*", help="Strategy names (default: all)")
+    parser.add_argument("--pair", default="BTC/USDT")
+    parser.add_argument("--max-startup", type=int, default=600, help="Largest warm-up to test")
+    parser.add_argument("--step", type=int, default=10, help="Warm-up grid step in candles")
+    parser.add_argument(
+        "--reference", type=int, default=1000, help="Extra warm-up of the reference run beyond --max-startup"
+    )
+    parser.add_argument("--window", type=int, default=300, help="Candles compared after the warm-up")
+    parser.add_argument("--rtol", type=float, default=1e-3, help="Relative tolerance for float columns")
+    parser.add_argument("--atol", type=float, default=1e-8, help="Absolute tolerance for float columns")
+    parser.add_argument("--samples", type=int, default=4, help="Random parameter sets per strategy")
+    parser.add_argument("--datadir", help="Use downloaded candles instead of synthetic ones")
+    parser.add_argument("--data-format", help="Candle format in --datadir (default: feather)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for synthetic candles and parameter draws")
+    parser.add_argument("--columns", action="store_true", help="Show the warm-up each column needs")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    for package in discover(args.strategies):
+        result = check_strategy(
+            package,
+            args.pair,
+            args.max_startup,
+            args.step,
+            args.reference,
+            args.window,
+            args.rtol,
+            args.atol,
+            args.samples,
+            datadir=args.datadir,
+            data_format=args.data_format,
+            seed=args.seed,
+        )
+        results.append(result)
+        if not args.json:
+            _print_result(result, args.max_startup, args.columns)
+
+    if args.json:
+        print(json.dumps(results, indent=2, default=str))
+    return 1 if any(result["verdict"] not in ("ok", "can be lowered") for result in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,179 @@
+import copy
+import importlib.util
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from freqtrade.enums import CandleType, RunMode
+from freqtrade.strategy import IntParameter, IStrategy
+from pandas import DataFrame
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+STRATEGIES_DIR = REPO_ROOT / "strategies"
+FOLDER_PREFIX = "FreqHub.Strategy."
+
+# Config keys Freqtrade copies onto the strategy when present in config.json.
+STRATEGY_OVERRIDES = ("timeframe", "startup_candle_count")
+
+_classes: Dict[Path, type] = {}
+
+
+@dataclass
+class StrategyPackage:
+    """
+    One `strategies/FreqHub.Strategy.<Name>/` folder.
+    """
+
+    name: str
+    folder: Path
+    path: Path
+
+    @property
+    def class_name(self) -> str:
+        return self.path.stem
+
+    def load_config(self, prefer_example: bool = False) -> dict:
+        """
+        Load `config.json`, falling back to `config.json.example`.
+        """
+        candidates = [self.folder / "config.json", self.folder / "config.json.example"]
+        if prefer_example:
+            candidates.reverse()
+        for candidate in candidates:
+            if candidate.is_file():
+                with candidate.open() as handle:
+                    return json.load(handle)
+        return {}
+
+
+def discover(names: Optional[List[str]] = None) -> List[StrategyPackage]:
+    """
+    Find all strategy packages, optionally filtered by name
+    (`IchiV1`, `FreqHub.Strategy.IchiV1` or `IchiV1Strategy` all match).
+    """
+    packages = []
+    for folder in sorted(STRATEGIES_DIR.glob(f"{FOLDER_PREFIX}*")):
+        sources = sorted(folder.glob("*.py"))
+        if not folder.is_dir() or not sources:
+            continue
+        package = StrategyPackage(name=folder.name[len(FOLDER_PREFIX):], folder=folder, path=sources[0])
+        if names and not {package.name, folder.name, package.class_name} & set(names):
+            continue
+        packages.append(package)
+    return packages
+
+
+def load_strategy_class(package: StrategyPackage) -> type:
+    """
+    Import the strategy module from its file, the way Freqtrade does
+    (strategy folder and repo root on `sys.path` for `freqhub_common`).
+    The class is imported once per process.
+    """
+    if package.path in _classes:
+        return _classes[package.path]
+
+    for path in (str(REPO_ROOT), str(package.folder)):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    spec = importlib.util.spec_from_file_location(package.class_name, package.path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    _classes[package.path] = getattr(module, package.class_name)
+    return _classes[package.path]
+
+
+def offline_config(package: StrategyPackage, indicator_cache: Optional[str] = None) -> dict:
+    """
+    The package's example config for offline analysis: the indicator cache
+    is only enabled when a directory is given.
+    """
+    config = copy.deepcopy(package.load_config(prefer_example=True))
+    freqhub = config.setdefault("freqhub", {})
+    if indicator_cache:
+        freqhub["indicator_cache"] = {"enabled": True, "directory": indicator_cache}
+    else:
+        freqhub.pop("indicator_cache", None)
+    return config
+
+
+def create_strategy(
+    package: StrategyPackage,
+    config: Optional[dict] = None,
+    runmode: RunMode = RunMode.BACKTEST,
+    dp=None,
+    bot_start: bool = True,
+) -> IStrategy:
+    """
+    Instantiate a strategy outside of a running bot.
+
+    `config` defaults to the package's own config. Parameters keep their
+    defaults (or the values from a parameter file next to the strategy).
+    """
+    if config is None:
+        config = package.load_config()
+    config = dict(config)
+    config["runmode"] = runmode
+    config.setdefault("candle_type_def", CandleType.SPOT)
+    config.setdefault("stake_currency", "USDT")
+
+    strategy = load_strategy_class(package)(config)
+    for key in STRATEGY_OVERRIDES:
+        if key in config:
+            setattr(strategy, key, config[key])
+    if dp is not None:
+        strategy.dp = dp
+    if bot_start:
+        strategy.ft_bot_start()
+    return strategy
+
+
+def strategy_timeframes(strategy: IStrategy, pair: str) -> List[str]:
+    """
+    The strategy timeframe followed by the informative timeframes it
+    requests for `pair` (needs `strategy.dp`).
+    """
+    timeframes = [strategy.timeframe]
+    for informative_pair, timeframe, *_ in strategy.gather_informative_pairs():
+        if informative_pair == pair and timeframe not in timeframes:
+            timeframes.append(timeframe)
+    return timeframes
+
+
+def analyze(strategy: IStrategy, candles: Dict[Tuple[str, str], DataFrame], pair: str) -> DataFrame:
+    """
+    Indicators and entry/exit signals for `pair`, like Freqtrade's
+    backtesting computes them. `strategy.dp` should serve `candles`.
+    """
+    metadata = {"pair": pair}
+    dataframe = candles[(pair, strategy.timeframe)].copy()
+    return strategy.ft_advise_signals(strategy.advise_indicators(dataframe, metadata), metadata)
+
+
+def sample_parameters(
+    strategy: IStrategy, rng: np.random.Generator, spaces: Optional[List[str]] = None
+) -> Dict[str, object]:
+    """
+    One random draw from the hyperopt range of every parameter (in
+    `spaces`, default all), rounded like the parameters round them.
+    """
+    values = {}
+    for space in spaces or [None]:
+        for name, p in strategy.enumerate_parameters(space):
+            if hasattr(p, "decimals"):
+                values[name] = round(float(rng.uniform(p.low, p.high)), p.decimals)
+            elif isinstance(p, IntParameter):
+                values[name] = int(rng.integers(p.low, p.high + 1))
+            elif hasattr(p, "high"):
+                values[name] = float(rng.uniform(p.low, p.high))
+            elif hasattr(p, "opt_range"):
+                values[name] = p.opt_range[int(rng.integers(len(p.opt_range)))]
+    return values
+
+
+def set_parameters(strategy: IStrategy, values: Dict[str, object]) -> None:
+    for name, value in values.items():
+        getattr(strategy, name).value = value
@@ -0,0 +1,629 @@
+"""
+Multi-pair vectorized backtest kernel, validated against Freqtrade's backtesting.
+
+`SignalMatrix` aligns the analyzed candles of all pairs on one time axis
+((pair, step) price matrices and Freqtrade's shifted entry/exit signals).
+`backtest` then runs the whole pairlist at once: at every step with entry
+signals a slot allocator opens trades in pairlist order up to
+`max_open_trades`, and the trades it opens are scanned forward in blocks
+of candles, with ROI, stoploss and trailing stop rules applied to all of
+them at once. Python only loops over the steps that have entry signals;
+nothing is done per pair and candle.
+
+The kernel follows Freqtrade's backtesting for long-only strategies with
+one trade per pair and without callbacks (`ExitRules.from_strategy`
+rejects strategies that use them):
+
+- a trade opens at the open after its entry signal; a pair whose trade
+  closed on a candle cannot open another one on that candle,
+- exits are checked in Freqtrade's order (exit signal, stoploss, ROI,
+  trailing stop), on the entry candle too, with its close rate rules,
+- trades closing on a candle free their slot for pairs later in the
+  pairlist on the same candle; open trades are force-exited at the last
+  candle's open,
+- with `price_ticks`, stoplosses and exit rates are rounded to the pair's
+  price tick, and an exit whose rounded rate lies outside the candle stays
+  unfilled (the trade remains open, and the order is assumed cancelled by
+  the next candle).
+
+Not modeled: stake amounts and the wallet (every entry gets a slot-sized
+stake, so a wallet too small to fund an entry diverges), protections,
+position stacking and `timeframe_detail`.
+
+The command validates the kernel on `--strategies`: it writes candles
+(synthetic, or `--datadir`) to a temporary data directory, runs
+Freqtrade's `Backtesting.backtest` in-process against the
+`tools.replay_exchange` stand-in for markets, runs the kernel on the same
+analyzed dataframes and requires the same trades (open/close dates, exit
+reasons, rates and profits up to rounding) and rejected entries. Exits
+with status 1 on a mismatch. `--no-freqtrade` only times the kernel
+(e.g. on hundreds of `--synthetic-pairs`).
+
+    python -m tools.vector_backtest
+    python -m tools.vector_backtest --strategies BinHV45 --candles 35040 --max-open-trades 3
+    python -m tools.vector_backtest --synthetic-pairs 100 --candles 10000 --no-freqtrade
+"""
+
+import argparse
+import io
+import json
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from freqhub_common.parameters import RoiTable
+from freqhub_common.sessions import epoch_seconds
+from freqtrade.exchange import timeframe_to_minutes
+from freqtrade.strategy import IStrategy
+
+from tools.simulate import DEFAULT_FEE, TRADE_COLUMNS, roi_targets, trade_metrics
+from tools.strategy_loader import StrategyPackage, discover
+
+DEFAULT_STRATEGIES = ["RSIEMA50", "EMACrossover", "BinHV45"]
+DEFAULT_PAIRS = [
+    "BTC/USDT", "ETH/USDT", "BNB/USDT", "SOL/USDT", "XRP/USDT", "ADA/USDT",
+    "DOT/USDT", "LTC/USDT", "LINK/USDT", "AVAX/USDT", "ATOM/USDT", "ETC/USDT",
+]
+# Callbacks the kernel does not call; strategies overriding them are rejected.
+CALLBACKS = (
+    "confirm_trade_entry",
+    "confirm_trade_exit",
+    "custom_entry_price",
+    "custom_exit_price",
+    "custom_exit",
+    "custom_stake_amount",
+    "adjust_trade_position",
+    "order_filled",
+)
+# Candles scanned per block for open trades: most trades close within the
+# first block, long ones get growing blocks.
+FIRST_BLOCK = 32
+MAX_BLOCK = 2048
+PROFIT_DECIMALS = 8
+# By reason code of _scan.
+EXIT_REASONS = ("", "exit_signal", "stop_loss", "roi", "trailing_stop_loss")
+
+
+@dataclass(frozen=True)
+class ExitRules:
+    """
+    A strategy's exit settings, as the kernel applies them.
+    """
+
+    roi: RoiTable
+    stoploss: float
+    timeframe_minutes: int
+    trailing_stop: bool = False
+    trailing_stop_positive: Optional[float] = None
+    trailing_stop_positive_offset: float = 0.0
+    trailing_only_offset_is_reached: bool = False
+    use_exit_signal: bool = True
+    exit_profit_only: bool = False
+    exit_profit_offset: float = 0.0
+    ignore_roi_if_entry_signal: bool = False
+
+    @classmethod
+    def from_strategy(cls, strategy: IStrategy) -> "ExitRules":
+        """
+        Raises ValueError for strategies the kernel cannot reproduce
+        (shorts, custom stoploss/ROI, position adjustment, callbacks).
+        """
+        unsupported = [name for name in CALLBACKS if getattr(type(strategy), name) is not getattr(IStrategy, name)]
+        for flag in ("can_short", "use_custom_stoploss", "use_custom_roi", "position_adjustment_enable"):
+            if getattr(strategy, flag, False):
+                unsupported.append(flag)
+        if unsupported:
+            raise ValueError(f"{type(strategy).__name__} uses {', '.join(unsupported)}, which the kernel does not model")
+        return cls(
+            roi=RoiTable(strategy.minimal_roi),
+            stoploss=float(strategy.stoploss),
+            timeframe_minutes=timeframe_to_minutes(strategy.timeframe),
+            trailing_stop=bool(strategy.trailing_stop),
+            trailing_stop_positive=strategy.trailing_stop_positive,
+            trailing_stop_positive_offset=float(strategy.trailing_stop_positive_offset or 0.0),
+            trailing_only_offset_is_reached=bool(strategy.trailing_only_offset_is_reached),
+            use_exit_signal=bool(strategy.use_exit_signal),
+            exit_profit_only=bool(strategy.exit_profit_only),
+            exit_profit_offset=float(strategy.exit_profit_offset or 0.0),
+            ignore_roi_if_entry_signal=bool(strategy.ignore_roi_if_entry_signal),
+        )
+
+
+def _signal(dataframe: DataFrame, column: str) -> np.ndarray:
+    """
+    The signal as Freqtrade's backtesting reads it: from the previous row.
+    """
+    if column not in dataframe.columns:
+        return np.zeros(len(dataframe), dtype=bool)
+    values = dataframe[column].fillna(0).to_numpy() == 1
+    return np.concatenate(([False], values[:-1])) if len(values) else values
+
+
+class SignalMatrix:
+    """
+    Analyzed candles of several pairs on one time axis.
+
+    `open`, `high` and `low` are (pair, step) matrices, NaN where a pair has
+    no candle (and on its first candle, which Freqtrade skips), `enter` and
+    `exit` the shifted long signals, `entries` the steps where a pair may
+    open a trade (entry signal without exit signal, never the last step).
+    Pairs keep the order of `analyzed`, the pairlist order.
+
+    `price_ticks` are per-pair tick sizes over time, as Freqtrade's
+    backtesting infers them from the candles (`Backtesting.price_pair_prec`,
+    `get_tick_size_over_time`); with them, stoplosses and exit rates are
+    rounded like Freqtrade rounds them. Without, rates are not rounded.
+    """
+
+    def __init__(self, analyzed: Dict[str, DataFrame], price_ticks: Optional[Dict[str, pd.Series]] = None):
+        self.pairs = list(analyzed)
+        frames = [analyzed[pair] for pair in self.pairs]
+        seconds = [epoch_seconds(frame["date"]) for frame in frames]
+        self.seconds = np.unique(np.concatenate(seconds)) if frames else np.zeros(0, dtype="int64")
+        self.dates = pd.to_datetime(self.seconds, unit="s", utc=True)
+        self.minutes = self.seconds // 60
+        shape = (len(self.pairs), len(self.seconds))
+        self.open = np.full(shape, np.nan)
+        self.high = np.full(shape, np.nan)
+        self.low = np.full(shape, np.nan)
+        self.enter = np.zeros(shape, dtype=bool)
+        self.exit = np.zeros(shape, dtype=bool)
+        self.last = np.full(len(self.pairs), -1, dtype="int64")
+
+        for row, frame in enumerate(frames):
+            if frame.empty:
+                continue
+            steps = np.searchsorted(self.seconds, seconds[row])[1:]
+            self.open[row, steps] = frame["open"].to_numpy(dtype="float64")[1:]
+            self.high[row, steps] = frame["high"].to_numpy(dtype="float64")[1:]
+            self.low[row, steps] = frame["low"].to_numpy(dtype="float64")[1:]
+            self.enter[row, steps] = _signal(frame, "enter_long")[1:]
+            self.exit[row, steps] = _signal(frame, "exit_long")[1:]
+            self.last[row] = steps[-1] if len(steps) else -1
+
+        self.entries = self.enter & ~self.exit
+        if shape[1]:
+            self.entries[:, -1] = False
+
+        # Tick of every pair from the start of each period on (Series.asof).
+        ticks = {pair: series.dropna() for pair, series in (price_ticks or {}).items()}
+        starts = [epoch_seconds(series.index.to_series()) for series in ticks.values()]
+        self.tick_starts = np.unique(np.concatenate(starts)) if starts else np.zeros(0, dtype="int64")
+        self.ticks = np.full((len(self.pairs), len(self.tick_starts)), np.nan)
+        for row, pair in enumerate(self.pairs):
+            if pair in ticks and len(ticks[pair]):
+                series = ticks[pair]
+                periods = np.searchsorted(epoch_seconds(series.index.to_series()), self.tick_starts, side="right") - 1
+                self.ticks[row] = np.where(periods >= 0, series.to_numpy()[np.maximum(periods, 0)], np.nan)
+
+    def tick(self, pairs: np.ndarray, step: int) -> np.ndarray:
+        """
+        Price tick of `pairs` for a trade opened at `step` (NaN: none).
+        """
+        period = int(np.searchsorted(self.tick_starts, self.seconds[step], side="right")) - 1
+        if period < 0:
+            return np.full(len(pairs), np.nan)
+        return self.ticks[pairs, period]
+
+    def __len__(self) -> int:
+        return len(self.seconds)
+
+
+@dataclass
+class BacktestResult:
+    trades: DataFrame
+    rejected_signals: int
+
+
+def _to_tick(values: np.ndarray, ticks: np.ndarray, up: bool = False) -> np.ndarray:
+    """
+    Rates rounded to the trade's price tick (NaN: not rounded) like
+    Freqtrade's `price_to_precision`: half up, or up for stops. Freqtrade
+    rounds the shortest decimal repr of a rate, so a rate is on the tick, or
+    halfway between two, when that tick or midpoint converts to the same
+    float. Scaled in extended precision, as inferred ticks can be as fine as
+    the float resolution of the price.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        per_tick = 1 / ticks
+        whole = np.round(per_tick)
+        # Decimal ticks scale by an exact integer.
+        decimal = np.abs(per_tick - whole) <= 1e-9 * whole
+        scale = np.where(decimal, whole, per_tick).astype(np.longdouble)
+        scaled = values.astype(np.longdouble) * scale
+
+        def rate(units):
+            return np.where(decimal, units / scale, units * ticks).astype("float64")
+
+        nearest = np.rint(scaled)
+        if up:
+            units = np.ceil(scaled)
+        else:
+            lower = np.floor(scaled)
+            units = np.where(rate(lower + 0.5) == values, lower + 1, nearest)
+        rounded = np.where(rate(nearest) == values, values, rate(units))
+    return np.where(np.isnan(ticks), values, rounded)
+
+
+class _Positions:
+    """
+    Trades being scanned: pair row, entry step, open rate, price tick and
+    the stoploss after the candles scanned so far.
+    """
+
+    def __init__(self, matrix: "SignalMatrix", pairs: np.ndarray, step: int, rules: ExitRules):
+        self.pairs = pairs
+        self.entry = np.full(len(pairs), step, dtype="int64")
+        self.rates = matrix.open[pairs, step]
+        self.ticks = matrix.tick(pairs, step)
+        self.initial_stop = _to_tick(self.rates * (1 - abs(rules.stoploss)), self.ticks, up=True)
+        self.stop = self.initial_stop.copy()
+        self.scanned = self.entry.copy()
+
+    def take(self, keep: np.ndarray) -> "_Positions":
+        taken = object.__new__(_Positions)
+        for name in ("pairs", "entry", "rates", "ticks", "initial_stop", "stop", "scanned"):
+            setattr(taken, name, getattr(self, name)[keep])
+        return taken
+
+
+def _profit(rates: np.ndarray, close: np.ndarray, fee: float) -> np.ndarray:
+    return np.round(close * (1 - fee) / (rates * (1 + fee)) - 1, PROFIT_DECIMALS)
+
+
+def _roi_entry(roi: RoiTable, durations: np.ndarray) -> np.ndarray:
+    """
+    Minutes key of the ROI step in effect for every duration (-1 before the first).
+    """
+    minutes = np.asarray(roi.minutes, dtype="int64")
+    index = np.searchsorted(minutes, durations, side="right") - 1
+    return np.where(index >= 0, minutes[np.maximum(index, 0)], -1)
+
+
+def _scan(
+    matrix: "SignalMatrix", rules: ExitRules, fee: float, positions: _Positions, width: int
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Check the next `width` candles of every position for an exit, the way
+    Freqtrade's `should_exit` and exit order fill do candle by candle.
+    Returns which positions are done and, for those, the close step, rate
+    and exit reason. The other positions advance their scanned step and
+    stoploss.
+    """
+    count = len(positions.pairs)
+    steps = positions.scanned[:, None] + np.arange(width)
+    inside = steps <= matrix.last[positions.pairs][:, None]
+    steps = np.minimum(steps, len(matrix) - 1)
+    rows = positions.pairs[:, None]
+    open_, high, low = matrix.open[rows, steps], matrix.high[rows, steps], matrix.low[rows, steps]
+    enter, exit_ = matrix.enter[rows, steps], matrix.exit[rows, steps]
+    rates, ticks = positions.rates[:, None], positions.ticks[:, None]
+    duration = matrix.minutes[steps] - matrix.minutes[positions.entry][:, None]
+
+    # Profit at the high: what ROI and the trailing stop see on each candle.
+    high_profit = _profit(rates, high, fee)
+    stop_before = np.broadcast_to(positions.stop[:, None], (count, width))
+    stop_after = stop_before
+    trailing = np.full_like(high, abs(rules.stoploss))
+    if rules.trailing_stop:
+        offset = rules.trailing_stop_positive_offset
+        if rules.trailing_stop_positive is not None:
+            trailing = np.where(high_profit > offset, abs(rules.trailing_stop_positive), trailing)
+        candidate = _to_tick(high * (1 - trailing), ticks, up=True)
+        if rules.trailing_only_offset_is_reached:
+            candidate = np.where(high_profit < offset, np.nan, candidate)
+        # Stoplosses only move up; NaN (no candle, offset not reached) keeps the stop.
+        running = np.fmax.accumulate(np.concatenate((positions.stop[:, None], candidate), axis=1), axis=1)
+        stop_before, stop_after = running[:, :-1], running[:, 1:]
+    # The stop is only moved on candles that do not already reach it.
+    stop = np.where(stop_before >= low, stop_before, stop_after)
+    stopped = stop >= low
+    trailed = stop > positions.initial_stop[:, None]
+
+    roi = roi_targets(rules.roi, duration)
+    roi_reached = high_profit > roi
+    if rules.ignore_roi_if_entry_signal:
+        roi_reached &= ~enter
+    signalled = np.zeros_like(stopped)
+    if rules.use_exit_signal:
+        signalled = exit_ & ~enter
+        if rules.exit_profit_only:
+            signalled &= _profit(rates, open_, fee) > rules.exit_profit_offset
+
+    # Close rates (Backtesting._get_close_rate).
+    stop_rate = np.where(stop > high, open_, stop)
+    trailing_rate = stop_rate
+    if rules.trailing_stop:
+        if (
+            rules.trailing_only_offset_is_reached
+            and rules.trailing_stop_positive
+            and rules.trailing_stop_positive_offset is not None
+        ):
+            worst = open_ * (1 + abs(rules.trailing_stop_positive_offset) - abs(rules.trailing_stop_positive))
+        else:
+            worst = open_ * (1 - trailing)
+        # Trailing within the entry candle: it moved just enough to arm the stop, then fell.
+        trailing_rate = np.where((duration == 0) & (stop <= high), np.maximum(low, worst), stop_rate)
+    target = rates * (1 + roi) * (1 + fee) / (1 - fee)
+    minutes = _roi_entry(rules.roi, duration)
+    new_step = (duration > 0) & (duration == minutes) & (minutes % rules.timeframe_minutes == 0) & (open_ > target)
+    roi_rate = np.where(new_step, open_, np.minimum(np.maximum(target, low), high))
+
+    # The first exit in Freqtrade's order places the exit order ...
+    conditions = [signalled, stopped & ~trailed, roi_reached, stopped & trailed]
+    reason = np.select(conditions, [1, 2, 3, 4], 0)
+    close_rate = _to_tick(np.select(conditions, [open_, stop_rate, roi_rate, trailing_rate], np.nan), ticks)
+    # ... which only fills within the candle; otherwise the trade stays open.
+    event = (reason > 0) & (low <= close_rate) & (close_rate <= high) & inside
+    closed = event.any(axis=1)
+    done = closed | ~inside[:, -1]
+
+    positions.stop = np.fmax(positions.stop, stop_after[:, -1])
+    positions.scanned = positions.scanned + width
+
+    index = np.argmax(event, axis=1)
+    pick = np.arange(count), index
+    close_step = positions.scanned - width + index
+    rate = close_rate[pick]
+    reasons = np.asarray(EXIT_REASONS, dtype=object)[reason[pick]]
+    # Trades still open after the pair's last candle: force-exited at its open.
+    forced = done & ~closed
+    last = matrix.last[positions.pairs[forced]]
+    close_step[forced] = last
+    rate[forced] = _to_tick(matrix.open[positions.pairs[forced], last], positions.ticks[forced])
+    reasons[forced] = "force_exit"
+    return done, {"step": close_step, "rate": rate, "reason": reasons}
+
+
+def backtest(
+    matrix: SignalMatrix, rules: ExitRules, max_open_trades: float, fee: float = DEFAULT_FEE
+) -> BacktestResult:
+    """
+    Trades of all pairs of `matrix`, at most `max_open_trades` open at a
+    time (<= 0 or inf: unlimited). Trade rows use `tools.simulate`'s
+    TRADE_COLUMNS; `rejected_signals` counts entries refused for lack of a
+    slot, like Freqtrade's.
+    """
+    unlimited = max_open_trades <= 0 or np.isinf(max_open_trades)
+    busy_until = np.full(len(matrix.pairs), -1, dtype="int64")
+    open_closes = np.zeros(0, dtype="int64")
+    records: List[Tuple[np.ndarray, ...]] = []
+    rejected = 0
+
+    for step in np.flatnonzero(matrix.entries.any(axis=0)):
+        candidates = np.flatnonzero(matrix.entries[:, step] & (busy_until < step))
+        if not len(candidates):
+            continue
+        open_closes = open_closes[open_closes > step]
+        free = np.inf if unlimited else max_open_trades - len(open_closes)
+        if free <= 0:
+            rejected += len(candidates)
+            continue
+
+        positions = _Positions(matrix, candidates, step, rules)
+        finished = []
+        pending = positions
+        if len(candidates) > free:
+            # Entry candle first: a trade that also closes on it frees its
+            # slot again before the next pair in the pairlist is processed.
+            done, closes = _scan(matrix, rules, fee, positions, 1)
+            staying = ~done
+            accepted = np.cumsum(staying) - staying < free
+            rejected += int(np.count_nonzero(~accepted))
+            finished.append((positions.take(done & accepted), {k: v[done & accepted] for k, v in closes.items()}))
+            pending = positions.take(staying & accepted)
+        width = FIRST_BLOCK
+        while len(pending.pairs):
+            done, closes = _scan(matrix, rules, fee, pending, width)
+            finished.append((pending.take(done), {k: v[done] for k, v in closes.items()}))
+            pending = pending.take(~done)
+            width = min(width * 4, MAX_BLOCK)
+
+        for closed, close in finished:
+            if not len(closed.pairs):
+                continue
+            busy_until[closed.pairs] = close["step"]
+            open_closes = np.concatenate((open_closes, close["step"][close["step"] > step]))
+            records.append((closed.pairs, closed.entry, closed.rates, close["step"], close["rate"], close["reason"]))
+
+    return BacktestResult(_trades(matrix, records, fee), rejected)
+
+
+def _trades(matrix: SignalMatrix, records: list, fee: float) -> DataFrame:
+    if not records:
+        return DataFrame(columns=list(TRADE_COLUMNS))
+    pairs, entry, rates, close, close_rate, reason = (np.concatenate(parts) for parts in zip(*records))
+    order = np.lexsort((pairs, entry))
+    pairs, entry, rates, close, close_rate, reason = (
+        values[order] for values in (pairs, entry, rates, close, close_rate, reason)
+    )
+    return DataFrame(
+        {
+            "pair": np.asarray(matrix.pairs, dtype=object)[pairs],
+            "open_date": matrix.dates[entry],
+            "close_date": matrix.dates[close],
+            "open_rate": rates,
+            "close_rate": close_rate,
+            "profit_ratio": _profit(rates, close_rate, fee),
+            "exit_reason": reason,
+            "candles": close - entry,
+        }
+    )
+
+
+# --- validation against Freqtrade -------------------------------------------
+
+
+def _write_candles(
+    datadir: Path, pairs: List[str], timeframes: List[str], candles: int, source: Optional[Path], seed: int
+) -> None:
+    from freqtrade.data.history import get_datahandler, load_pair_history
+    from freqtrade.enums import CandleType
+
+    from tools.fixtures import synthetic_ohlcv
+
+    handler = get_datahandler(datadir, "feather")
+    base_minutes = timeframe_to_minutes(timeframes[0])
+    for pair in pairs:
+        for timeframe in timeframes:
+            count = max(candles * base_minutes // timeframe_to_minutes(timeframe), 1)
+            stored = load_pair_history(pair, timeframe, source) if source else DataFrame()
+            frame = stored.tail(count) if not stored.empty else synthetic_ohlcv(pair, timeframe, candles=count, seed=seed)
+            handler.ohlcv_store(pair, timeframe, frame.reset_index(drop=True), CandleType.SPOT)
+
+
+def _freqtrade_config(package: StrategyPackage, workdir: Path, pairs: List[str], url: str, args) -> dict:
+    from freqtrade.configuration import Configuration
+    from freqtrade.configuration.directory_operations import create_userdata_dir
+    from freqtrade.enums import RunMode
+
+    from tools.replay_exchange import replay_config
+
+    config = replay_config(package.load_config(prefer_example=True), "vector-backtest", url)
+    config.pop("freqhub", None)
+    config["exchange"]["pair_whitelist"] = pairs
+    config["pairlists"] = [{"method": "StaticPairList"}]
+    config["fee"] = args.fee
+    if args.max_open_trades is not None:
+        config["max_open_trades"] = args.max_open_trades
+    (workdir / "config.json").write_text(json.dumps(config))
+    create_userdata_dir(str(workdir), create_dir=True)
+    return Configuration(
+        {
+            "config": [str(workdir / "config.json")],
+            "strategy": package.class_name,
+            "strategy_path": str(package.folder),
+            "user_data_dir": str(workdir),
+            "datadir": str(workdir / "data"),
+            "export": "none",
+        },
+        RunMode.BACKTEST,
+    ).get_config()
+
+
+def _compare(expected: DataFrame, actual: DataFrame) -> Optional[str]:
+    """
+    First difference between Freqtrade's and the kernel's trades.
+    """
+    keys = ["pair", "open_date"]
+    want = expected.assign(open_date=pd.to_datetime(expected["open_date"], utc=True),
+                           close_date=pd.to_datetime(expected["close_date"], utc=True))
+    merged = want.merge(actual, on=keys, how="outer", suffixes=("_ft", "_kernel"), indicator=True)
+    merged = merged.sort_values("open_date")
+    for _, trade in merged.iterrows():
+        label = f"{trade['pair']} opened {trade['open_date']}"
+        if trade["_merge"] != "both":
+            return f"{label}: only in {'freqtrade' if trade['_merge'] == 'left_only' else 'kernel'}"
+        if trade["close_date_ft"] != trade["close_date_kernel"] or trade["exit_reason_ft"] != trade["exit_reason_kernel"]:
+            return (
+                f"{label}: freqtrade closed {trade['close_date_ft']} ({trade['exit_reason_ft']}), "
+                f"kernel {trade['close_date_kernel']} ({trade['exit_reason_kernel']})"
+            )
+        for column, tolerance in (("open_rate", 1e-8), ("close_rate", 1e-8)):
+            if abs(trade[f"{column}_ft"] - trade[f"{column}_kernel"]) > tolerance * abs(trade[f"{column}_ft"]):
+                return f"{label}: {column} {trade[f'{column}_ft']!r} != {trade[f'{column}_kernel']!r}"
+        if abs(trade["profit_ratio_ft"] - trade["profit_ratio_kernel"]) > 1e-6:
+            return f"{label}: profit_ratio {trade['profit_ratio_ft']!r} != {trade['profit_ratio_kernel']!r}"
+    return None
+
+
+def run(package: StrategyPackage, pairs: List[str], url: str, args) -> int:
+    from freqtrade.data import history
+    from freqtrade.data.converter import trim_dataframes
+    from freqtrade.optimize.backtesting import Backtesting
+
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        config = _freqtrade_config(package, workdir, pairs, url, args)
+        bt = Backtesting(config)
+        strategy = bt.strategylist[0]
+        bt._set_strategy(strategy)
+        timeframes = [strategy.timeframe] + sorted(
+            {tf for _, tf, *_ in strategy.gather_informative_pairs()} - {strategy.timeframe}
+        )
+        _write_candles(workdir / "data", pairs, timeframes, args.candles,
+                       Path(args.datadir) if args.datadir else None, args.seed)
+        data, timerange = bt.load_bt_data()
+        processed = strategy.advise_all_indicators(data)
+        start, end = history.get_timerange(trim_dataframes(processed, timerange, bt.required_startup))
+        rules = ExitRules.from_strategy(strategy)
+        max_open_trades = strategy.max_open_trades
+
+        if args.no_freqtrade:
+            analyzed = {
+                pair: strategy.ft_advise_signals(trim_dataframes({pair: frame}, timerange, bt.required_startup)[pair],
+                                                 {"pair": pair})
+                for pair, frame in processed.items()
+            }
+        else:
+            started = time.perf_counter()
+            expected = bt.backtest(processed=processed, start_date=start, end_date=end)
+            freqtrade_seconds = time.perf_counter() - started
+            # Backtesting leaves the trimmed dataframes with their signals in `processed`.
+            analyzed = processed
+        price_ticks = bt.price_pair_prec
+
+    started = time.perf_counter()
+    matrix = SignalMatrix(analyzed, price_ticks)
+    result = backtest(matrix, rules, max_open_trades, fee=args.fee)
+    kernel_seconds = time.perf_counter() - started
+    metrics = trade_metrics(result.trades)
+    summary = (
+        f"{package.name}: {len(pairs)} pairs x {len(matrix)} candles, max_open_trades {max_open_trades:g}: "
+        f"{metrics['trades']} trades, profit {metrics['profit']:.2%} of stake, "
+        f"{result.rejected_signals} rejected entries; kernel {kernel_seconds:.2f}s"
+    )
+    if args.no_freqtrade:
+        print(summary)
+        return 0
+
+    mismatch = _compare(expected["results"], result.trades)
+    if mismatch is None and expected["rejected_signals"] != result.rejected_signals:
+        mismatch = f"rejected entries: freqtrade {expected['rejected_signals']}, kernel {result.rejected_signals}"
+    if mismatch:
+        print(f"{package.name}: {mismatch}")
+        return 1
+    print(f"{summary}, freqtrade {freqtrade_seconds:.2f}s ({freqtrade_seconds / kernel_seconds:.0f}x); trades agree")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--strategies", nargs="+", default=DEFAULT_STRATEGIES)
+    parser.add_argument("--pairs", nargs="+", default=DEFAULT_PAIRS)
+    parser.add_argument("--synthetic-pairs", type=int, default=0, help="Additional synthetic pairs (SYN0001/USDT, ...)")
+    parser.add_argument("--candles", type=int, default=20000, help="Candles per pair in the strategy timeframe")
+    parser.add_argument("--max-open-trades", type=int, default=None, help="Default: the strategy config's")
+    parser.add_argument("--fee", type=float, default=DEFAULT_FEE)
+    parser.add_argument("--datadir", default=None, help="Use stored candles (feather/json) instead of synthetic ones")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-freqtrade", action="store_true", help="Only run and time the kernel")
+    args = parser.parse_args(argv)
+
+    from tools.replay_exchange import ReplayData, ReplayServer
+
+    pairs = list(dict.fromkeys(args.pairs + [f"SYN{i:04d}/USDT" for i in range(1, args.synthetic_pairs + 1)]))
+    # Backtesting only loads markets; the stand-in serves them for `pairs`.
+    data = ReplayData(pairs, pd.Timestamp("2024-01-01", tz="UTC"), 1, None)
+    server = ReplayServer(("127.0.0.1", 0), data, 1.0, io.StringIO(), 0.0, 1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        status = 0
+        for package in discover(args.strategies):
+            status = max(status, run(package, pairs, url, args))
+        return status
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,363 @@
+"""
+Walk-forward optimization on indicator banks computed once per pair.
+
+Runs `populate_indicators` over the whole history of every pair, then rolls
+train/test windows over it. Each train window is optimized by random
+search over the strategy's hyperopt parameters (the defaults and the
+previous window's best are always tried), re-running only the entry/exit
+signals on the window's rows; the best parameters are then evaluated on
+the following test window (out of sample) next to the defaults.
+
+Optimized parameters that `populate_indicators` reads (indicator periods,
+state thresholds; found with `indicator_fingerprint`) get their own banks:
+one per combination of their values, computed the first time a trial uses
+it, the `--bank-size` most recently used kept. Without such parameters the
+banks are computed once and cost grows with windows x trials x signal
+evaluation only.
+
+    python -m tools.walk_forward --strategies Markov
+    python -m tools.walk_forward --strategies Markov MarkovRSI --train-days 90 --test-days 30 --trials 200
+    python -m tools.walk_forward --datadir user_data/data/binance --pairs BTC/USDT ETH/USDT --json
+
+Trades come from `tools.simulate`, an
+approximation of Freqtrade's backtesting (one trade per pair, trailing
+stops without Freqtrade's price rounding); confirm the chosen parameters
+with `freqtrade backtesting`.
+"""
+
+import argparse
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from freqhub_common.indicator_cache import indicator_fingerprint
+from freqhub_common.parameters import RoiTable
+from freqtrade.exchange import timeframe_to_minutes
+
+from tools.fixtures import FixtureDataProvider, load_candles
+from tools.simulate import TrailingStop, concat_trades, simulate_trades, trade_metrics
+from tools.strategy_loader import (
+    StrategyPackage,
+    create_strategy,
+    discover,
+    offline_config,
+    sample_parameters,
+    set_parameters,
+    strategy_timeframes,
+)
+
+OBJECTIVES = ("sharpe", "profit")
+DEFAULT_BANK_SIZE = 16
+
+
+class IndicatorBank:
+    """
+    One pair's analyzed history: indicators for every candle, computed once.
+    Windows are row ranges into it.
+    """
+
+    def __init__(self, pair: str, dataframe: DataFrame):
+        self.pair = pair
+        self.dataframe = dataframe
+        self.dates = dataframe["date"].to_numpy()
+
+    def rows(self, start: pd.Timestamp, end: pd.Timestamp) -> tuple:
+        """
+        Row range [first, last) of the candles opening in [start, end).
+        """
+        first, last = np.searchsorted(self.dates, np.array([start, end], dtype=self.dates.dtype))
+        return int(first), int(last)
+
+
+def indicator_parameters(strategy, spaces: Optional[List[str]] = None) -> List[str]:
+    """
+    The hyperopt parameters of `spaces` that `populate_indicators` reads.
+    """
+    read = indicator_fingerprint(strategy, strategy.populate_indicators)["params"]
+    return [name for space in spaces or [None] for name, _ in strategy.enumerate_parameters(space) if name in read]
+
+
+class IndicatorBanks:
+    """
+    The indicator banks of every pair for each combination of values of the
+    indicator parameters, computed when a combination is first used; the
+    `size` most recently used combinations are kept.
+    """
+
+    def __init__(
+        self,
+        strategy,
+        data: Dict[Tuple[str, str], DataFrame],
+        pairs: List[str],
+        parameters: List[str],
+        size: int = DEFAULT_BANK_SIZE,
+    ):
+        self.strategy = strategy
+        self.data = data
+        self.pairs = pairs
+        self.parameters = parameters
+        self.size = max(int(size), 1)
+        self.computed = 0
+        self.seconds = 0.0
+        self._banks: "OrderedDict[tuple, List[IndicatorBank]]" = OrderedDict()
+
+    def current(self) -> List[IndicatorBank]:
+        """
+        Every pair's bank for the strategy's current parameter values.
+        """
+        key = tuple(getattr(self.strategy, name).value for name in self.parameters)
+        banks = self._banks.get(key)
+        if banks is not None:
+            self._banks.move_to_end(key)
+            return banks
+
+        started = time.perf_counter()
+        timeframe = self.strategy.timeframe
+        banks = [
+            IndicatorBank(pair, self.strategy.advise_indicators(self.data[(pair, timeframe)].copy(), {"pair": pair}))
+            for pair in self.pairs
+        ]
+        self.seconds += time.perf_counter() - started
+        self.computed += 1
+        self._banks[key] = banks
+        if len(self._banks) > self.size:
+            self._banks.popitem(last=False)
+        return banks
+
+
+def _windows(first: pd.Timestamp, last: pd.Timestamp, train: int, test: int, step: int) -> List[dict]:
+    windows = []
+    start = first
+    while start + pd.Timedelta(days=train + test) <= last:
+        train_end = start + pd.Timedelta(days=train)
+        windows.append({"train": (start, train_end), "test": (train_end, train_end + pd.Timedelta(days=test))})
+        start += pd.Timedelta(days=step)
+    return windows
+
+
+def evaluate(
+    strategy,
+    banks: List[IndicatorBank],
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    warmup: int,
+    timeframe_minutes: int,
+    fee: float,
+) -> DataFrame:
+    """
+    Trades of the current parameters over [start, end) on every pair: the
+    signals are computed on the window plus `warmup` earlier candles only.
+    """
+    trades = []
+    for bank in banks:
+        first, last = bank.rows(start, end)
+        offset = max(first - warmup, 0)
+        # Copy-on-write: the slice shares the bank's indicator columns and
+        # only the signal columns the strategy writes are allocated.
+        window = bank.dataframe.iloc[offset:last]
+        window = strategy.ft_advise_signals(window, {"pair": bank.pair})
+        trades.append(
+            simulate_trades(
+                window,
+                RoiTable(strategy.minimal_roi),
+                strategy.stoploss,
+                timeframe_minutes,
+                pair=bank.pair,
+                fee=fee,
+                start=first - offset,
+                trailing=TrailingStop.from_strategy(strategy),
+            )
+        )
+    return concat_trades(*trades)
+
+
+def _score(metrics: dict, objective: str, min_trades: int) -> float:
+    if metrics["trades"] < min_trades:
+        return float("-inf")
+    return metrics[objective]
+
+
+def walk_forward(
+    package: StrategyPackage,
+    pairs: List[str],
+    days: int,
+    train_days: int,
+    test_days: int,
+    step_days: int,
+    trials: int,
+    spaces: Optional[List[str]] = None,
+    objective: str = "sharpe",
+    min_trades: int = 5,
+    fee: float = 0.001,
+    datadir: Optional[str] = None,
+    data_format: Optional[str] = None,
+    seed: int = 0,
+    bank_size: int = DEFAULT_BANK_SIZE,
+) -> dict:
+    config = offline_config(package)
+    probe = create_strategy(package, config, dp=FixtureDataProvider({}, whitelist=pairs))
+    timeframe = probe.timeframe
+    minutes = timeframe_to_minutes(timeframe)
+    warmup = int(config.get("startup_candle_count", probe.startup_candle_count) or 0)
+    candles = days * 1440 // minutes + warmup
+
+    data = {}
+    for pair in pairs:
+        data.update(
+            load_candles(
+                pair, strategy_timeframes(probe, pair), candles, datadir=datadir, data_format=data_format, seed=seed
+            )
+        )
+    strategy = create_strategy(package, config, dp=FixtureDataProvider(data, whitelist=pairs))
+    defaults = {name: p.value for space in spaces or [None] for name, p in strategy.enumerate_parameters(space)}
+
+    banks = IndicatorBanks(strategy, data, pairs, indicator_parameters(strategy, spaces), size=bank_size)
+
+    frames = [bank.dataframe for bank in banks.current()]
+    first = max(frame["date"].iloc[min(warmup, len(frame) - 1)] for frame in frames)
+    last = min(frame["date"].iloc[-1] for frame in frames) + pd.Timedelta(minutes=minutes)
+    windows = _windows(first, last, train_days, test_days, step_days)
+    if not windows:
+        raise ValueError(f"{package.name}: {days} days are too short for {train_days}+{test_days} day windows")
+
+    def run(values: Dict[str, object], period: tuple) -> dict:
+        set_parameters(strategy, values)
+        return trade_metrics(evaluate(strategy, banks.current(), *period, warmup, minutes, fee))
+
+    rng = np.random.default_rng(seed)
+    started = time.perf_counter()
+    indicator_seconds = banks.seconds
+    best = dict(defaults)
+    results = []
+    for window in windows:
+        candidates = [dict(defaults), dict(best)]
+        candidates += [sample_parameters(strategy, rng, spaces) for _ in range(max(trials - 2, 0))]
+        scored = [(_score(run(values, window["train"]), objective, min_trades), values) for values in candidates]
+        score, best = max(scored, key=lambda item: item[0])
+        train = run(best, window["train"])
+        results.append(
+            {
+                "train": [str(date) for date in window["train"]],
+                "test": [str(date) for date in window["test"]],
+                "parameters": best,
+                "train_score": score,
+                "train_metrics": train,
+                "test_metrics": run(best, window["test"]),
+                "default_test_metrics": run(defaults, window["test"]),
+            }
+        )
+    signal_seconds = time.perf_counter() - started - (banks.seconds - indicator_seconds)
+    set_parameters(strategy, defaults)
+
+    def total(key: str) -> dict:
+        profits = [result[key]["profit"] for result in results]
+        return {
+            "trades": sum(result[key]["trades"] for result in results),
+            "profit": float(sum(profits)),
+            "profitable_windows": int(sum(profit > 0 for profit in profits)),
+        }
+
+    return {
+        "strategy": package.name,
+        "pairs": pairs,
+        "timeframe": timeframe,
+        "objective": objective,
+        "trials": trials,
+        "windows": results,
+        "out_of_sample": total("test_metrics"),
+        "defaults_out_of_sample": total("default_test_metrics"),
+        "indicator_parameters": banks.parameters,
+        "indicator_sets": banks.computed,
+        "seconds": {"indicators": banks.seconds, "signals": signal_seconds},
+    }
+
+
+def _print_result(result: dict) -> None:
+    seconds = result["seconds"]
+    if result["indicator_parameters"]:
+        indicators = f"{result['indicator_sets']} sets of {', '.join(result['indicator_parameters'])}"
+    else:
+        indicators = "once"
+    print(
+        f"{result['strategy']} {result['timeframe']} {', '.join(result['pairs'])}: "
+        f"{len(result['windows'])} windows x {result['trials']} trials, objective {result['objective']}  "
+        f"[indicators {seconds['indicators']:.1f}s {indicators}, signals {seconds['signals']:.1f}s]"
+    )
+    print(
+        f"  {'test window':<23} {'train':>7} {'trades':>6} {'profit':>8} {'win':>5} {'sharpe':>7} {'dd':>7}"
+        f"  {'defaults':>8}  parameters"
+    )
+    for window in result["windows"]:
+        test, default = window["test_metrics"], window["default_test_metrics"]
+        parameters = " ".join(f"{name}={value}" for name, value in window["parameters"].items())
+        print(
+            f"  {window['test'][0][:10]} - {window['test'][1][:10]} {window['train_score']:>7.2f} "
+            f"{test['trades']:>6} {test['profit']:>8.2%} {test['win_rate']:>5.0%} {test['sharpe']:>7.2f} "
+            f"{test['drawdown']:>7.2%}  {default['profit']:>8.2%}  {parameters}"
+        )
+    oos, defaults = result["out_of_sample"], result["defaults_out_of_sample"]
+    print(
+        f"  out of sample: {oos['trades']} trades, {oos['profit']:.2%} "
+        f"({oos['profitable_windows']}/{len(result['windows'])} windows profitable); "
+        f"defaults: {defaults['trades']} trades, {defaults['profit']:.2%}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--strategies", nargs="*", help="Strategy names (default: all)")
+    parser.add_argument("--pairs", nargs="+", default=["BTC/USDT", "ETH/USDT"])
+    parser.add_argument("--days", type=int, default=365, help="History to load, in days")
+    parser.add_argument("--train-days", type=int, default=90)
+    parser.add_argument("--test-days", type=int, default=30)
+    parser.add_argument("--step-days", type=int, help="Days between windows (default: --test-days)")
+    parser.add_argument("--trials", type=int, default=100, help="Parameter sets tried per train window")
+    parser.add_argument("--spaces", nargs="+", default=["buy", "sell"], help="Hyperopt spaces to optimize")
+    parser.add_argument("--objective", choices=OBJECTIVES, default="sharpe")
+    parser.add_argument("--min-trades", type=int, default=5, help="Train trades a parameter set needs to count")
+    parser.add_argument("--fee", type=float, default=0.001, help="Fee ratio per side")
+    parser.add_argument("--datadir", help="Use downloaded candles instead of synthetic ones")
+    parser.add_argument("--data-format", help="Candle format in --datadir (default: feather)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for synthetic candles and parameter draws")
+    parser.add_argument(
+        "--bank-size", type=int, default=DEFAULT_BANK_SIZE,
+        help="Indicator parameter combinations kept computed (with indicator parameters)",
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    for package in discover(args.strategies):
+        result = walk_forward(
+            package,
+            args.pairs,
+            args.days,
+            args.train_days,
+            args.test_days,
+            args.step_days or args.test_days,
+            args.trials,
+            spaces=args.spaces,
+            objective=args.objective,
+            min_trades=args.min_trades,
+            fee=args.fee,
+            datadir=args.datadir,
+            data_format=args.data_format,
+            seed=args.seed,
+            bank_size=args.bank_size,
+        )
+        results.append(result)
+        if not args.json:
+            _print_result(result)
+
+    if args.json:
+        print(json.dumps(results, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())